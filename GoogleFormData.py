@@ -1,5 +1,7 @@
 import streamlit as st
 
+from survey import perf, scheduler, warmup
+
 st.set_page_config(
     page_title="Traffic Congestion Dashboard",
     layout="wide"
@@ -42,4 +44,12 @@ navigation = st.navigation(
     }
 )
 
-navigation.run()
+# Sources are polled and rebuilt in the background; reruns only read
+scheduler.start()
+# Every page's data is loaded concurrently at server start, not by its first visitor
+warmup.start()
+st.sidebar.caption(f"{warmup.describe()} · {scheduler.describe()}")
+
+# Every rerun is timed by section (add ?perf=1 to the URL for the panel)
+with perf.page_run(navigation.title):
+    navigation.run()
@@ -8,6 +8,9 @@ import plotly.express as px
 import plotly.graph_objects as go
 import numpy as np
 
+from survey import load_dataset, payload, perf
+from survey.style import background_gradient
+
 # ---------------------------------------------------------
 # 1. PAGE CONFIGURATION
 # ---------------------------------------------------------
@@ -20,16 +23,16 @@ st.set_page_config(
 # ---------------------------------------------------------
 # 2. DATA LOADING & PROCESSING FUNCTIONS
 # ---------------------------------------------------------
+perf.section("Data loading")
 # Set page configuration
 st.set_page_config(page_title="Likert Data Viewer", layout="wide")
 
 # 1. DATA LOADING FUNCTION (Matches CSV exactly)
-@st.cache_data
+# Every chart below reads the same disagree_summary(Ain).csv, so they all
+# share this one loader (parsed once per data version by survey.datasets).
 def load_raw_data():
     try:
-        url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/disagree_summary(Ain).csv"
-        df = pd.read_csv(url)
-        return df, None
+        return load_dataset("ain_summary"), None
     except Exception as e:
         return None, str(e)
 
@@ -81,6 +84,7 @@ st.markdown("""
 # ---------------------------------------------------------
 # 4. HEADER SECTION
 # ---------------------------------------------------------
+perf.section("Header")
 st.markdown('<div class="center-title">Disagreement (Likert 1–2) Responses across Area Types</div>', unsafe_allow_html=True)
 st.markdown('<div class="subtitle">Nurul Ain Maisarah Binti Hamidin | S22A0064</div>', unsafe_allow_html=True)
 
@@ -90,6 +94,7 @@ st.markdown('<div class="aesthetic-divider"></div>', unsafe_allow_html=True)
 # ---------------------------------------------------------
 # 5. DATA VISUALIZATION TABLE
 # ---------------------------------------------------------
+perf.section("Disagreement table")
 # 1. Load Data
 df, error = load_raw_data()
 
@@ -113,7 +118,7 @@ with st.expander("Table of Counting Disagreement Likert Scale Across Type Areas"
 
         # --- DATA TABLE SECTION ---
         # Displays the raw data exactly like the CSV
-        st.dataframe(df, use_container_width=True)
+        payload.dataframe(df, use_container_width=True)
 
         # --- EXPLANATION SECTION (Bottom of Expander) ---
         st.markdown(
@@ -141,6 +146,7 @@ with st.expander("Table of Counting Disagreement Likert Scale Across Type Areas"
 # ---------------------------------------------------------
 # 5. SUMMARY METRICS BOX
 # ---------------------------------------------------------
+perf.section("Summary metrics")
 st.markdown("""
     <style>
         .matrix-title {
@@ -210,41 +216,6 @@ st.markdown(
     unsafe_allow_html=True
 )
 
-# ---------------------------------------------------------
-# 2. DATA LOADING & PROCESSING
-# ---------------------------------------------------------
-@st.cache_data
-def load_and_process_data():
-    try:
-        df = pd.read_csv("cleaned_data.csv")
-        likert_cols = df.columns[3:28].tolist()
-        
-        factor_cols = [col for col in likert_cols if 'Factor' in col]
-        effect_cols = [col for col in likert_cols if 'Effect' in col]
-        step_cols   = [col for col in likert_cols if 'Step' in col]
-        
-        heatmap_list = []
-        for area in df['Area Type'].unique():
-            for col in likert_cols:
-                count_sd = df[(df['Area Type'] == area) & (df[col] == 1)].shape[0]
-                count_d  = df[(df['Area Type'] == area) & (df[col] == 2)].shape[0]
-                total = count_sd + count_d
-                
-                cat = 'Factor' if col in factor_cols else 'Effect' if col in effect_cols else 'Step'
-                if col == 'Students Not Sharing Vehicles': cat = 'Special'
-                
-                heatmap_list.append({
-                    'Area Type': area, 'Likert Item': col, 'Total': total,
-                    'SD': count_sd, 'D': count_d, 'Category': cat
-                })
-        
-        return pd.DataFrame(heatmap_list)
-    except Exception as e:
-        st.error(f"Error processing data: {e}")
-        return None
-
-heatmap_df = load_and_process_data()
-
 st.markdown("""
     <style>
         .matrix-title {
@@ -275,6 +246,7 @@ st.markdown("""
 # ---------------------------------------------------------
 # HEATMAP & HORIZONTAL BAR CHART WITH TABLE
 # ---------------------------------------------------------
+perf.section("Heatmap & horizontal bar chart")
 # --- 1. DATA PREPARATION ---
 data = {
     'Area': ['Rural', 'Rural', 'Rural', 'Suburban', 'Suburban', 'Suburban', 'Urban', 'Urban', 'Urban'],
@@ -336,7 +308,7 @@ with st.expander("HEATMAP & HORIZONTAL BAR CHART", expanded=False):
         customdata=np.stack((pivot_high.values, pivot_low.values, pivot_raw.values), axis=-1)
     )
     fig_heat.update_layout(title="Interactive Disagreement Heatmap: Contribution % by Area", template="plotly_white")
-    st.plotly_chart(fig_heat, use_container_width=True)
+    payload.plotly_chart(fig_heat, use_container_width=True)
 
     # --- BAR CHART ---
     plot_data = []
@@ -361,11 +333,11 @@ with st.expander("HEATMAP & HORIZONTAL BAR CHART", expanded=False):
         hovertemplate="<b>%{y}</b><br>Min Conflict: %{hovertext}<extra></extra>"
     ))
     fig_bar.update_layout(title="Highest vs. Lowest Disagreement Percentages", barmode='group', template="plotly_white", height=500)
-    st.plotly_chart(fig_bar, use_container_width=True)
+    payload.plotly_chart(fig_bar, use_container_width=True)
 
     # --- SUMMARY TABLE ---
     st.markdown("### Disagreement Summary Table")
-    st.dataframe(df_summary, use_container_width=True, hide_index=True)
+    payload.dataframe(df_summary, use_container_width=True, hide_index=True)
 
     # --- INSIGHTS & EXPLANATIONS ---
     st.markdown("---")
@@ -394,6 +366,7 @@ with st.expander("HEATMAP & HORIZONTAL BAR CHART", expanded=False):
 # ---------------------------------------------------------
 # STACKED BAR CHART WITH TABLE
 # ---------------------------------------------------------
+perf.section("Stacked bar chart")
 # --- 1. DATA PREPARATION ---
 # Unified data for both graph and table
 data = {
@@ -450,7 +423,7 @@ with st.expander("STACKED BAR CHART", expanded=False):
         margin=dict(t=50, b=50)
     )
 
-    st.plotly_chart(fig, use_container_width=True)
+    payload.plotly_chart(fig, use_container_width=True)
 
     # --- STYLED TABLE SECTION ---
     st.markdown("### Disagreement Distribution Matrix")
@@ -465,9 +438,9 @@ with st.expander("STACKED BAR CHART", expanded=False):
     final_table = final_table[['Factor', 'Effect', 'Step']]
     
     # Using Pandas Styling for the heatmap effect in the table
-    styled_table = final_table.style.background_gradient(cmap='YlOrRd', axis=None).format("{:.0f}")
+    styled_table = background_gradient(final_table.style, cmap='YlOrRd', axis=None).format("{:.0f}")
     
-    st.table(styled_table)
+    payload.table(styled_table)
 
     # --- INSIGHTS SECTION ---
     st.markdown("---")
@@ -495,17 +468,7 @@ with st.expander("STACKED BAR CHART", expanded=False):
 # ---------------------------------------------------------
 # BUBBLE CHART WITH TABLE
 # ---------------------------------------------------------
-
-# 1. DATA LOADING FUNCTION
-@st.cache_data
-def load_raw_data():
-    try:
-        # Using the GitHub URL provided
-        url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/disagree_summary(Ain).csv"
-        df = pd.read_csv(url)
-        return df, None
-    except Exception as e:
-        return None, str(e)
+perf.section("Bubble chart")
 
 # Load the data
 df_raw, error = load_raw_data()
@@ -570,7 +533,7 @@ elif df_raw is not None:
             margin=dict(l=50, r=50, t=80, b=50)
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        payload.plotly_chart(fig, use_container_width=True)
 
         # 3. RURAL DETAILED TABLE
         st.markdown("### **Data Breakdown: Rural Areas**")
@@ -594,8 +557,8 @@ elif df_raw is not None:
             df_rural['Percentage of Total'] = ((df_rural['Total (SD+D)'] / total_rural_vol) * 100).round(2).astype(str) + '%'
 
             # Display styled table
-            st.dataframe(
-                df_rural.style.background_gradient(subset=['Total (SD+D)'], cmap='Reds'),
+            payload.dataframe(
+                background_gradient(df_rural.style, subset=['Total (SD+D)'], cmap='Reds'),
                 use_container_width=True,
                 hide_index=True
             )
@@ -632,20 +595,10 @@ elif df_raw is not None:
 # ---------------------------------------------------------
 # GROUPED HORIZONTAL BAR CHART WITH TABLE
 # ---------------------------------------------------------
-
-# 1. DATA LOADING FUNCTION
-@st.cache_data
-def load_urban_data():
-    try:
-        # Using your GitHub repository URL
-        url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/disagree_summary(Ain).csv"
-        df = pd.read_csv(url)
-        return df, None
-    except Exception as e:
-        return None, str(e)
+perf.section("Grouped horizontal bar chart")
 
 # Load the data
-df_raw, error = load_urban_data()
+df_raw, error = load_raw_data()
 
 if error:
     st.error(f"Error loading data: {error}")
@@ -713,7 +666,7 @@ elif df_raw is not None:
             margin=dict(l=200, r=50, t=80, b=50)
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        payload.plotly_chart(fig, use_container_width=True)
 
         # 3. URBAN DETAILED TABLE
         st.markdown("### **Data Breakdown: Urban Respondents**")
@@ -724,9 +677,11 @@ elif df_raw is not None:
         df_table['Contribution to Total'] = (df_table['Count'] / total_urban_sum * 100).round(2).astype(str) + '%'
         
         # Display professional table
-        st.dataframe(
-            df_table[['Likert Item', 'Category', 'Count', 'Percentage', 'Contribution to Total']]
-            .style.background_gradient(subset=['Count'], cmap='Oranges'),
+        payload.dataframe(
+            background_gradient(
+                df_table[['Likert Item', 'Category', 'Count', 'Percentage', 'Contribution to Total']].style,
+                subset=['Count'], cmap='Oranges'
+            ),
             use_container_width=True,
             hide_index=True
         )
@@ -760,24 +715,14 @@ elif df_raw is not None:
 # ---------------------------------------------------------
 # RADAR CHART WITH TABLE
 # ---------------------------------------------------------
+perf.section("Radar chart")
             
 import streamlit as st
 import pandas as pd
 import plotly.graph_objects as go
 
-# 1. DATA LOADING FUNCTION
-@st.cache_data
-def load_suburban_data():
-    try:
-        # Using the GitHub URL for consistency
-        url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/disagree_summary(Ain).csv"
-        df = pd.read_csv(url)
-        return df, None
-    except Exception as e:
-        return None, str(e)
-
 # Load the data
-df_raw, error = load_suburban_data()
+df_raw, error = load_raw_data()
 
 if error:
     st.error(f"Error loading data: {error}")
@@ -845,7 +790,7 @@ elif df_raw is not None:
             margin=dict(l=100, r=100, t=50, b=50)
         )
 
-        st.plotly_chart(fig, use_container_width=True)
+        payload.plotly_chart(fig, use_container_width=True)
 
         # 3. SUBURBAN DETAILED TABLE
         st.markdown("### **Data Breakdown: Suburban Respondents**")
@@ -854,9 +799,11 @@ elif df_raw is not None:
         df_table = df_sub.copy()
         df_table['Percentage'] = df_table['Percentage'].astype(str) + '%'
         
-        st.dataframe(
-            df_table[['Likert Item', 'Category', 'Count', 'Percentage']]
-            .style.background_gradient(subset=['Count'], cmap='Purples'),
+        payload.dataframe(
+            background_gradient(
+                df_table[['Likert Item', 'Category', 'Count', 'Percentage']].style,
+                subset=['Count'], cmap='Purples'
+            ),
             use_container_width=True,
             hide_index=True
         )
@@ -1,26 +1,27 @@
-import pandas as pd
 import plotly.express as px
 import streamlit as st
-import numpy as np
+
+from survey import analytics, charts, columns, load_dataset, payload, perf
+from survey.correlation import get_correlation_stats
+from survey.cube import get_cube
+from survey.regression import get_regressions
 
 # 1. Page Configuration
 st.set_page_config(page_title="Analysis of Traffic Congestion", layout="wide")
 
-# 2. Data URL
-DATA_URL = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/project_dataSV(Fatin).csv"
-
-@st.cache_data
+# 2. Data (shared loader: local CSV first, GitHub otherwise)
 def load_data():
-    df = pd.read_csv(DATA_URL)
-    return df
+    return load_dataset("fatin")
 
 try:
+    perf.section("Data loading")
     data = load_data()
+    cube = get_cube("fatin")
 
     # --- DATA PREPARATION ---
-    factor_cols = [col for col in data.columns if 'factor' in col.lower()]
-    kesan_cols = [col for col in data.columns if 'impact' in col.lower()]
-    measure_cols = [col for col in data.columns if 'measure' in col.lower()]
+    factor_cols = columns.fatin_factors(data.columns)
+    kesan_cols = columns.fatin_impacts(data.columns)
+    measure_cols = columns.fatin_measures(data.columns)
 
     if not factor_cols or not kesan_cols:
         st.error("⚠️ Error: Could not find columns containing 'Factor' or 'Impact'.")
@@ -36,10 +37,11 @@ try:
 
     # --- SUMMARY OVERVIEW ---
     with st.container():
+        perf.section("Summary overview")
         st.subheader("📌 Summary Overview")
-        avg_factors = data[factor_cols].mean()
+        avg_factors = analytics.mean_scores(cube, factor_cols)
         top_factor_name = avg_factors.idxmax().replace(' Factor', '').replace(' factor', '')
-        avg_impacts = data[kesan_cols].mean()
+        avg_impacts = analytics.mean_scores(cube, kesan_cols)
         top_impact_name = avg_impacts.idxmax().replace(' Impact', '').replace(' impact', '')
         
         col_m1, col_m2 = st.columns(2)
@@ -48,8 +50,9 @@ try:
     st.markdown("---")
 
     # --- SECTION 1: AVERAGE SCORES ---
+    perf.section("1. Average factor scores")
     st.subheader("1. Average Factor Scores (Percentage)")
-    factor_means = data[factor_cols].mean().sort_values(ascending=True).reset_index()
+    factor_means = avg_factors.sort_values(ascending=True).reset_index()
     factor_means.columns = ['Factor', 'Score']
     factor_means['Percentage'] = (factor_means['Score'] / 5) * 100
     factor_means['Factor'] = factor_means['Factor'].str.replace(' Factor', '', case=False)
@@ -60,7 +63,7 @@ try:
         color='Percentage', color_continuous_scale='Viridis', text_auto='.1f'
     )
     fig1.update_layout(xaxis_ticksuffix="%")
-    st.plotly_chart(fig1, use_container_width=True)
+    payload.plotly_chart(fig1, use_container_width=True)
     
     st.write(f"""The graph above shows the percentage importance of factors that contribute to traffic congestion. 
     Factor **{factor_means.iloc[-1]['Factor']}** recorded the highest percentage of 
@@ -68,15 +71,19 @@ try:
     st.markdown("---")
 
     # --- SECTION 2: DEMOGRAPHIC COMPARISON ---
+    perf.section("2. Demographic comparison")
     st.subheader("City Demographic Analysis")
     if 'Area Type' in data.columns:
-        melted_data = data.melt(id_vars=['Area Type'], value_vars=factor_cols, var_name='Factor', value_name='Score')
-        melted_data['Percentage'] = (melted_data['Score'] / 5) * 100
-        comparison_data = melted_data.groupby(['Area Type', 'Factor'])['Percentage'].mean().reset_index()
+        area_means = analytics.mean_percent(cube, factor_cols, by='Area Type')
+        comparison_data = (
+            area_means.reset_index()
+            .melt(id_vars=['Area Type'], var_name='Factor', value_name='Percentage')
+            .sort_values(['Area Type', 'Factor'])
+        )
         
         fig2 = px.bar(comparison_data, x='Percentage', y='Factor', color='Area Type', barmode='group', orientation='h', text_auto='.1f')
         fig2.update_layout(xaxis_ticksuffix="%")
-        st.plotly_chart(fig2, use_container_width=True)
+        payload.plotly_chart(fig2, use_container_width=True)
     
     st.write("""The graph illustrates the varying perceptions of congestion factors across Urban, Suburban, and Rural areas. 
     Urban respondents highlighted parking shortages and aggressive driving as prominent issues, suggesting these lead to 
@@ -88,12 +95,12 @@ try:
     st.markdown("---")
 
     # --- SECTION 3: HEATMAP ---
+    perf.section("3. Heatmap")
     st.subheader("🌡️ Heatmap Analysis")
     if 'Status' in data.columns:
-        heatmap_df = data.groupby('Status')[factor_cols].mean()
-        heatmap_perc = (heatmap_df / 5) * 100
+        heatmap_perc = analytics.mean_percent(cube, factor_cols, by='Status')
         fig3 = px.imshow(heatmap_perc, text_auto=".1f", aspect="auto", color_continuous_scale='YlGnBu')
-        st.plotly_chart(fig3, use_container_width=True)
+        payload.plotly_chart(fig3, use_container_width=True)
         
     st.write("""The heatmap displays average scores on congestion factors regarding respondents' status, highlighting 
     that university students and residents are most affected by traffic congestion near schools. This is reflected 
@@ -105,6 +112,7 @@ try:
     st.markdown("---")
 
     # --- SECTION 4: RELATIONSHIP ---
+    perf.section("4. Relationship")
     st.subheader("🔗 Relationship Analysis")
     c1, c2 = st.columns(2)
     with c1:
@@ -112,8 +120,14 @@ try:
     with c2:
         k_select = st.selectbox("Select Impact (Y):", kesan_cols)
     
-    fig5 = px.scatter(data, x=f_select, y=k_select, trendline="ols")
-    st.plotly_chart(fig5, use_container_width=True)
+    grid_mode = st.radio("Show responses as:", ["Bubbles", "Heat grid"], horizontal=True)
+
+    # All factor x impact fits and answer-pair counts are precomputed once per
+    # data version; a selection change only looks them up (25 cells, any N).
+    fit = get_regressions("fatin", factor_cols, kesan_cols).loc[(f_select, k_select)]
+    grid = get_correlation_stats("fatin", factor_cols, kesan_cols).joint_counts(f_select, k_select)
+    fig5 = charts.count_grid_figure(grid, fit, mode="heat" if grid_mode == "Heat grid" else "bubble")
+    payload.plotly_chart(fig5, use_container_width=True)
     
     st.write("""This Regression Graph shows the relationship between factors and effects and for example there 
     is a positive relationship between rainy weather and the impact of accidents, which shows that an increase 
@@ -121,24 +135,25 @@ try:
     st.markdown("---")
 
     # --- SECTION 5: SUMMARY CHARTS ---
+    perf.section("5. Causes vs. solution steps")
     st.subheader("💡 Summary: Main Causes vs. Solution Steps")
     col_a, col_b = st.columns(2)
     
     with col_a:
-        f_plot = data[factor_cols].mean().sort_values(ascending=True).reset_index()
+        f_plot = avg_factors.sort_values(ascending=True).reset_index()
         f_plot.columns = ['Factor', 'Score']
         f_plot['Percentage'] = (f_plot['Score'] / 5) * 100
         fig6 = px.bar(f_plot, x='Percentage', y='Factor', orientation='h', 
                       title='<b>Main Causes (%)</b>', color_discrete_sequence=['#e74c3c'], text_auto='.1f')
-        st.plotly_chart(fig6, use_container_width=True)
+        payload.plotly_chart(fig6, use_container_width=True)
 
     with col_b:
-        m_plot = data[measure_cols].mean().sort_values(ascending=True).reset_index()
+        m_plot = cube.mean(measure_cols).sort_values(ascending=True).reset_index()
         m_plot.columns = ['Measure', 'Score']
         m_plot['Percentage'] = (m_plot['Score'] / 5) * 100
         fig7 = px.bar(m_plot, x='Percentage', y='Measure', orientation='h', 
                       title='<b>Main Solutions (%)</b>', color_discrete_sequence=['#2ecc71'], text_auto='.1f')
-        st.plotly_chart(fig7, use_container_width=True)
+        payload.plotly_chart(fig7, use_container_width=True)
         
     st.write("""The diagram illustrates a bar chart detailing factors contributing to traffic congestion in front of schools 
     and suggests solutions. Key issues include lack of parking, narrow roads, and behavioral factors like undisciplined 
@@ -1,10 +1,12 @@
 # To explore the relationship between traffic factors and congestion effect from rural perspectives.
 
 import streamlit as st
-import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+
+from survey import analytics, columns, load_dataset, payload, perf
+from survey.correlation import get_correlation_stats
+from survey.cube import get_cube
 
 st.header("Exploring Traffic Factors and Congestion Effects Infront School of Rural Areas")
 st.write(
@@ -27,44 +29,27 @@ col4.metric("Gender Distribution", "F: 26 | M: 12", help="Number of respondents
     border=True)
 
           
-# Load Dataset
-url = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/cleaned_data%20(Izzati).csv"
+# --- Grouping columns (survey/columns.py, shared with the startup warm-up) ---
+factors_columns = columns.IZZATI_FACTORS
+effect_columns = columns.EFFECTS
 
-# Read the dataset
-df_clean = pd.read_csv(url)
+# Load Dataset (shared, parsed once per data version; only the columns above)
+perf.section("Data loading")
+page_columns = columns.IZZATI_COLUMNS
+df_clean = load_dataset("izzati", columns=page_columns)
+cube = get_cube("izzati", columns=page_columns)
 
 #------------------------------------------------------------ 
 # Bar Chart: Ranking of factor that caused trafic congestion.
 #------------------------------------------------------------
 
 # --- Title Graph ---
+perf.section("1. Bar Chart")
 st.subheader("1. Bar Chart: Ranking of Factor That Caused Trafic Congestion.")
 
-# --- Grouping columns ---
-factors_columns = [
-    "Lack of Parking Space Factor",
-    "Rainy Weather Factor",
-    "Single Gate Factor",
-    "Leaving Work Late Factor",
-    "Increasing Population Factor",
-    "Students Not Sharing Vehicles",
-    "Lack of Pedestrian Bridge Factor",
-    "Damaged Road Factor",
-    "Construction/Roadworks Factor",
-    "Late Drop-off/Pick-up Factor",
-    "Narrow Road Factor",
-    "Undisciplined Driver Factor"
-]
-
 # --- Calculate % agree ---
-ranking_df = (
-    df_clean[factors_columns]
-    .apply(lambda x: x.isin([4,5]).mean() * 100)
-    .sort_values(ascending=False)
-    .reset_index()
-)
+ranking_df = analytics.percent_agree_ranking(cube, factors_columns).reset_index()
 ranking_df.columns = ["Traffic Factor", "Percent Agree"]
-ranking_df["Percent Agree"] = ranking_df["Percent Agree"].round(1)
 
 # --- Plotly bar chart ---
 custom_colors = [[0, "green"], [0.5, "yellow"], [1, "purple"]]
@@ -84,7 +69,7 @@ fig.update_layout(yaxis={'categoryorder':'total ascending'})
 fig.update_traces(texttemplate="%{text}%", textposition='inside')
 
 # --- Streamlit Display ---
-st.plotly_chart(fig, use_container_width=True)
+payload.plotly_chart(fig, use_container_width=True)
 
 # ---  Interpretation ---
 st.markdown(
@@ -101,29 +86,13 @@ st.markdown(
 #--------------------------------------------------------------------------
 
 # --- Title Graph ---
+perf.section("2. Pie Chart")
 st.subheader("2. Pie Chart: Percentage Distribution of Effect From The Traffic Congestion.")
 
-# --- Grouping columns ---
-effect_columns = [
-    "Unintended Road Accidents Effect",
-    "Time Wastage Effect",
-    "Pressure on Road Users Effect",
-    "Students Late to School Effect",
-    "Environmental Pollution Effect",
-    "Fuel Wastage Effect",
-]
-
 # --- Calculate Percentage ---
 # Count values and convert to percentages
-pie_df = (
-    df_clean[effect_columns]
-    .apply(lambda x: x.isin([4,5]).mean() * 100)
-    .sort_values(ascending=False)
-    .reset_index()
-)
+pie_df = analytics.percent_agree_ranking(cube, effect_columns).reset_index()
 pie_df.columns = ["Effect Congestion", "Percentage"]
-pie_df["Percentage"] = pd.to_numeric(pie_df["Percentage"], errors='coerce')  # convert to numeric
-pie_df["Percentage"] = pie_df["Percentage"].round(1)  # round to 1 decimal place
 
 # --- Plotly Visualization ---
 fig = px.pie(
@@ -139,7 +108,7 @@ fig.update_traces(textinfo='percent', hoverinfo='label+percent')
 fig.update_layout(legend=dict(orientation="h", y=-0.1))
 
 # --- Show figure in Streamlit ---
-st.plotly_chart(fig, use_container_width=True)
+payload.plotly_chart(fig, use_container_width=True)
 
 # ---  Interpretation ---
 st.markdown(
@@ -156,12 +125,13 @@ st.markdown(
 #------------------------------------------------
 
 # --- Title Graph ---
+perf.section("3. Rectangular Correlation Matrix")
 st.subheader("3. Rectangular Correlation Matrix: Traffic Factors Vs Congestion Effects")
 
 # --- Define values ---
-heatmap_cols = factors_columns + effect_columns
-heatmap_corr = df_clean[heatmap_cols].corr(method="spearman")
-heatmap_rect = heatmap_corr.loc[factors_columns, effect_columns]
+# Only the factor x effect block is computed, from cached rank tables
+stats = get_correlation_stats("izzati", factors_columns, effect_columns, columns=page_columns)
+heatmap_rect = analytics.correlation_block(stats, factors_columns, effect_columns, method="spearman")
 
 # Round values for display
 z_values = heatmap_rect.round(2).values
@@ -192,7 +162,7 @@ fig.update_layout(
 fig.data[0].hovertemplate = "Factor: %{y}<br>Effect: %{x}<br>Correlation = %{z}<extra></extra>"
 
 # --- Show figure in Streamlit ---
-st.plotly_chart(fig, use_container_width=True)
+payload.plotly_chart(fig, use_container_width=True)
 
 # ---  Interpretation ---
 st.markdown(
@@ -209,25 +179,15 @@ st.markdown(
 #---------------------------------------------------------
 
 # --- Title Graph ---
+perf.section("4. Radar Chart")
 st.subheader("4. Radar Chart: Percentage Score of Effect From One Factor.")
 
 # --- Define values ---
 selected_factor = "Narrow Road Factor"
-agree = df_clean[df_clean[selected_factor].isin([4,5])]
 disagree = df_clean[df_clean[selected_factor].isin([1,2,3])]
 disagree
 
-agree_effect = agree[effect_columns].isin([4,5]).mean() * 100
-disagree_effect = disagree[effect_columns].isin([4,5]).mean() * 100
-
-
-compare_df = (
-    pd.DataFrame({
-        "Agree (4–5)": agree_effect,
-        "Disagree (1–2)": disagree_effect
-    })
-    .round(1)
-)
+compare_df = analytics.radar_split(df_clean, selected_factor, effect_columns)
 
 labels = compare_df.index.tolist()
 labels += [labels[0]]  # close the loop
@@ -285,7 +245,7 @@ fig.update_layout(
 )
 
 # --- Show figure in Streamlit ---
-st.plotly_chart(fig, use_container_width=True)
+payload.plotly_chart(fig, use_container_width=True)
 
 # ---  Interpretation ---
 st.markdown(
@@ -302,23 +262,15 @@ st.markdown(
 #----------------------------------------------------------------
 
 # --- Title Graph ---
+perf.section("5. Stacked Bar Chart")
 st.subheader("5. Stacked Bar Chart: Congestion Effect by Severity of a Key Traffic Factor.")
 
 # --- Define Values ---
 key_factor = "Narrow Road Factor"
 congestion_effect = "Time Wastage Effect"
 
-# Subset
-df_subset = df_clean[[key_factor, congestion_effect]].dropna().copy()
-
-# Recode factor into severity
-df_subset["Factor Severity"] = pd.cut(
-    df_subset[key_factor],
-    bins=[0, 2, 3, 5],
-    labels=["Low (1–2)", "Medium (3)", "High (4–5)"]
-)
-
-freq_df = df_subset.groupby(["Factor Severity", congestion_effect]).size().reset_index(name="Frequency")
+# Recode factor into severity and count answers per band
+freq_df = analytics.severity_frequencies(df_clean, key_factor, congestion_effect)
 
 # --- Plotly Visualization ---
 fig = px.bar(
@@ -337,7 +289,7 @@ fig = px.bar(
 )
 
 # --- Show figure in Streamlit ---
-st.plotly_chart(fig, use_container_width=True)
+payload.plotly_chart(fig, use_container_width=True)
 
 # ---  Interpretation ---
 st.markdown(
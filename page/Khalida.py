@@ -1,36 +1,30 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
-import numpy as np
+
+from survey import analytics, charts, columns, load_dataset, payload, perf
+from survey.correlation import get_correlation_stats
+from survey.cube import get_cube
+from survey.filters import get_filter_index
 
 st.set_page_config(layout="wide")
 
+# Column sets: survey/columns.py, shared with the startup warm-up
+effect_cols = columns.EFFECTS
+cause_cols = columns.KHALIDA_CAUSES
+
 # ================= DATA LOADING =================
-@st.cache_data
+perf.section("Data loading")
+filter_cols = columns.KHALIDA_FILTERS
+page_cols = columns.KHALIDA_COLUMNS
+
 def load_data():
-    df = pd.read_csv("traffic_survey(khalida).csv")
-    if "Unnamed: 0" in df.columns:
-        df = df.drop(columns=["Unnamed: 0"])
-    return df
+    # Only the columns this page uses are read from the column store
+    return load_dataset("khalida", columns=page_cols)
 
 df = load_data()
-
-effect_cols = [
-    "Unintended Road Accidents Effect",
-    "Time Wastage Effect",
-    "Pressure on Road Users Effect",
-    "Students Late to School Effect",
-    "Environmental Pollution Effect",
-    "Fuel Wastage Effect",
-]
-
-cause_cols = [
-    "Undisciplined Driver Factor",
-    "Narrow Road Factor",
-    "Single Gate Factor",
-    "Lack of Parking Space Factor",
-]
+cube = get_cube("khalida", columns=page_cols)
+filters = get_filter_index("khalida", filter_cols, projection=page_cols)
 
 # ================= TITLE =================
 st.title("🚦 Interactive Analysis of Traffic Congestion Around Schools")
@@ -50,6 +44,7 @@ time efficiency, stress, punctuality, environment, and fuel usage.
 """)
 
 # ================= SUMMARY METRICS =================
+perf.section("Summary metrics")
 c1, c2, c3, c4 = st.columns(4)
 
 with c1:
@@ -68,29 +63,29 @@ with c4:
 st.divider()
 
 # ================= FILTERS =================
+perf.section("Filters")
 st.subheader("🔍 Filters")
 
 f1, f2, f3 = st.columns(3)
 
 with f1:
-    gender = st.selectbox("Gender", ["All"] + sorted(df["Gender"].dropna().unique()))
+    gender = st.selectbox("Gender", ["All"] + filters.options["Gender"])
 
 with f2:
-    status = st.selectbox("Status", ["All"] + sorted(df["Status"].dropna().unique()))
+    status = st.selectbox("Status", ["All"] + filters.options["Status"])
 
 with f3:
-    area = st.selectbox("Area Type", ["All"] + sorted(df["Area Type"].dropna().unique()))
+    area = st.selectbox("Area Type", ["All"] + filters.options["Area Type"])
 
 chosen_effect = st.selectbox("Focus Effect", effect_cols)
 
-# Apply filters
-sub = df.copy()
-if gender != "All":
-    sub = sub[sub["Gender"] == gender]
-if status != "All":
-    sub = sub[sub["Status"] == status]
-if area != "All":
-    sub = sub[sub["Area Type"] == area]
+# Apply filters (bitmap intersection, no copy of the full frame)
+where = {
+    col: value
+    for col, value in (("Gender", gender), ("Status", status), ("Area Type", area))
+    if value != "All"
+}
+sub = filters.view(where)
 
 st.info(f"Responses after filtering: {len(sub)}")
 
@@ -99,9 +94,10 @@ if sub.empty:
     st.stop()
 
 # ================= 1. EFFECT RANKING =================
+perf.section("1. Effect ranking")
 st.subheader("1️⃣ Ranking of Congestion Effects")
 
-mean_effects = sub[effect_cols].mean().sort_values()
+mean_effects = analytics.mean_scores(cube, effect_cols, where=where).sort_values()
 
 fig1 = px.bar(
     mean_effects,
@@ -114,7 +110,7 @@ fig1 = px.bar(
 )
 
 fig1.update_layout(height=350)
-st.plotly_chart(fig1, use_container_width=True)
+payload.plotly_chart(fig1, use_container_width=True)
 
 with st.expander("📌 Interpretation (Ranking of Effects)"):
     st.markdown("""
@@ -130,33 +126,23 @@ Lower-ranked effects, while still relevant, are perceived as comparatively less
 """)
 
 # ================= 2. BOX PLOTS =================
+perf.section("2. Box plots")
 st.subheader(f"2️⃣ Distribution of {chosen_effect}")
 
 c1, c2 = st.columns(2)
 
 with c1:
     if sub["Gender"].nunique() > 1:
-        fig2 = px.box(
-            sub,
-            x="Gender",
-            y=chosen_effect,
-            points="all",
-            title="By Gender"
-        )
-        st.plotly_chart(fig2, use_container_width=True)
+        # Quartiles are computed here; only a bounded sample of points is sent
+        fig2 = charts.box_figure(sub, "Gender", chosen_effect, title="By Gender")
+        payload.plotly_chart(fig2, use_container_width=True)
     else:
         st.info("Only one gender available.")
 
 with c2:
     if sub["Status"].nunique() > 1:
-        fig3 = px.box(
-            sub,
-            x="Status",
-            y=chosen_effect,
-            points="all",
-            title="By Status"
-        )
-        st.plotly_chart(fig3, use_container_width=True)
+        fig3 = charts.box_figure(sub, "Status", chosen_effect, title="By Status")
+        payload.plotly_chart(fig3, use_container_width=True)
     else:
         st.info("Only one status available.")
 
@@ -174,6 +160,7 @@ roles and demographic factors influence how congestion impacts individuals.
 """)
 
 # ================= 3. GROUPED BAR =================
+perf.section("3. Grouped bar")
 st.subheader("3️⃣ Key Effects by Status")
 
 key_effects = [
@@ -182,7 +169,7 @@ key_effects = [
     "Unintended Road Accidents Effect",
 ]
 
-status_means = sub.groupby("Status")[key_effects].mean().reset_index()
+status_means = analytics.mean_scores(cube, key_effects, by="Status", where=where).dropna(how="all").reset_index()
 
 fig4 = px.bar(
     status_means,
@@ -192,7 +179,7 @@ fig4 = px.bar(
     labels={"value": "Mean Score", "variable": "Effect"},
 )
 
-st.plotly_chart(fig4, use_container_width=True)
+payload.plotly_chart(fig4, use_container_width=True)
 
 with st.expander("📌 Interpretation (Key Effects by Status)"):
     st.markdown("""
@@ -207,9 +194,11 @@ more directly exposed to congestion during school commuting hours.
 """)
 
 # ================= 4. HEATMAP =================
+perf.section("4. Heatmap")
 st.subheader("4️⃣ Cause–Effect Correlation Heatmap")
 
-corr = sub[cause_cols + effect_cols].corr().loc[cause_cols, effect_cols]
+stats = get_correlation_stats("khalida", cause_cols, effect_cols, columns=page_cols)
+corr = analytics.correlation_block(stats, cause_cols, effect_cols, where=where)
 
 fig5 = px.imshow(
     corr,
@@ -219,7 +208,7 @@ fig5 = px.imshow(
 )
 
 fig5.update_layout(height=400)
-st.plotly_chart(fig5, use_container_width=True)
+payload.plotly_chart(fig5, use_container_width=True)
 
 with st.expander("📌 Interpretation (Heatmap)"):
     st.markdown("""
@@ -235,15 +224,11 @@ school areas.
 """)
 
 # ================= 5. STACKED BAR =================
+perf.section("5. Stacked bar")
 st.subheader(f"5️⃣ Likert Distribution of {chosen_effect} by Gender")
 
 if sub["Gender"].nunique() > 1:
-    dist = (
-        sub.groupby("Gender")[chosen_effect]
-        .value_counts(normalize=True)
-        .rename("proportion")
-        .reset_index()
-    )
+    dist = analytics.level_distribution(sub, "Gender", chosen_effect)
 
     fig6 = px.bar(
         dist,
@@ -254,7 +239,7 @@ if sub["Gender"].nunique() > 1:
         labels={"proportion": "Proportion"},
     )
 
-    st.plotly_chart(fig6, use_container_width=True)
+    payload.plotly_chart(fig6, use_container_width=True)
 else:
     st.info("Only one gender available.")
 
@@ -271,17 +256,12 @@ the overall response pattern.
 """)
 
 # ================= 6. VIOLIN PLOT =================
+perf.section("6. Violin plot")
 st.subheader(f"6️⃣ Distribution of {chosen_effect} by Area Type")
 
-fig7 = px.violin(
-    sub,
-    x="Area Type",
-    y=chosen_effect,
-    box=True,
-    points="all"
-)
+fig7 = charts.violin_figure(sub, "Area Type", chosen_effect, box=True)
 
-st.plotly_chart(fig7, use_container_width=True)
+payload.plotly_chart(fig7, use_container_width=True)
 
 with st.expander("📌 Interpretation (Violin Plot)"):
     st.markdown("""
@@ -0,0 +1,6 @@
+# ---------------------------------------------------------
+# Shared survey data + analytics used by every dashboard page
+# ---------------------------------------------------------
+from survey.datasets import dataset_version, load_dataset, refresh
+
+__all__ = ["dataset_version", "load_dataset", "refresh"]
@@ -0,0 +1,182 @@
+# ---------------------------------------------------------
+# Command line entry point: python -m survey <command>
+# ---------------------------------------------------------
+import argparse
+from pathlib import Path
+
+import pandas as pd
+
+from survey import analytics, benchmark, cleaning, columnar, ingest, startup, synthetic, warmup
+from survey.datasets import SOURCES, get_source, ingest_report, load_dataset, resolve
+
+
+def cmd_columnar(args):
+    if not columnar.available():
+        print("pyarrow is not installed; columnar copies are disabled.")
+        return 1
+    for name, path in columnar.convert_all().items():
+        status = f"{path.name} ({path.stat().st_size:,} bytes)" if path else "not written"
+        print(f"{name}: {status}")
+    return 0
+
+
+def cmd_ingest(args):
+    saved = 0
+    for name in args.datasets or SOURCES:
+        if not get_source(name).typed:
+            continue
+        report = ingest_report(name)
+        saved += report.saved_bytes
+        print(report)
+    print(f"total saved: {saved:,} bytes")
+    return 0
+
+
+def cmd_imports(args):
+    reports = startup.report(args.scripts, args.budget)
+    for r in reports:
+        print(r)
+    return 1 if any(r.over_budget for r in reports) else 0
+
+
+def cmd_clean(args):
+    raw = pd.read_csv(args.export) if args.export else load_dataset("form_responses")
+    frame, report = cleaning.clean(raw)
+    print(report)
+    if args.out:
+        frame.to_csv(args.out, index=False)
+        print(f"{len(frame):,} rows -> {args.out}")
+    return 0
+
+
+def cmd_warmup(args):
+    unknown = sorted(set(args.pages) - set(warmup.PAGES))
+    if unknown:
+        print(f"unknown page(s): {', '.join(unknown)}")
+        return 2
+    result = warmup.run(args.pages)
+    for line in result.report():
+        print(line)
+    print(f"all ready in {result.seconds:.2f}s (sum of tasks {sum(t.seconds for t in result.tasks):.2f}s)")
+    return 1 if result.failed() else 0
+
+
+def iter_chunks(path, chunksize):
+    """Normalized frames of ``chunksize`` rows from a CSV or Parquet file."""
+    path = Path(path)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield ingest.normalize(batch.to_pandas(), path.stem)[0]
+        return
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        chunk = chunk.drop(columns=[c for c in chunk.columns if c.startswith("Unnamed: ")])
+        yield ingest.normalize(chunk, path.stem)[0]
+
+
+def cmd_analyze(args):
+    source = resolve(args.source) if args.source in SOURCES else Path(args.source)
+    cube, stats = analytics.analyze_chunks(iter_chunks(source, args.chunksize), by=args.by)
+    tables = analytics.summary_tables(cube, stats, by=args.by)
+    if args.out:
+        out = Path(args.out)
+        out.mkdir(parents=True, exist_ok=True)
+        for name, table in tables.items():
+            table.to_csv(out / f"{name}.csv")
+        print(f"{cube.size():,} responses -> {len(tables)} tables in {out}")
+    else:
+        with pd.option_context("display.width", 160, "display.max_columns", 12):
+            for name, table in tables.items():
+                print(f"== {name}")
+                print(table.round(3))
+    return 0
+
+
+def cmd_synth(args):
+    model = synthetic.get_model(args.source)
+    synthetic.write(model, args.rows, args.path, args.chunksize, args.seed)
+    print(f"{args.rows:,} respondents -> {args.path} ({Path(args.path).stat().st_size:,} bytes)")
+    return 0
+
+
+def cmd_bench(args):
+    frame = benchmark.synthetic_frame if args.data == "independent" else benchmark.copula_frame
+    results = []
+    for r in benchmark.run(args.sizes, args.repeat, args.seed, frame):
+        print(r)
+        results.append(r)
+    for rows, step, rerun, cold in benchmark.speedups(results):
+        print(f"{rows:>10,}  {step:<24} vs pandas: {rerun:8.1f}x per rerun  {cold:8.2f}x cold")
+    if args.save:
+        benchmark.save(results, args.save)
+    if args.baseline:
+        slower = benchmark.regressions(results, benchmark.load(args.baseline), args.tolerance)
+        for r, old in slower:
+            print(f"REGRESSION {r.rows:,} rows {r.step}: {old * 1000:.2f} -> {r.seconds * 1000:.2f} ms")
+        return 1 if slower else 0
+    return 0
+
+
+def _count(text):
+    return int(float(text))      # accepts 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m survey", description="Survey data tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("columnar", help="write typed Parquet copies of every local CSV")
+    p.set_defaults(func=cmd_columnar)
+
+    p = commands.add_parser("ingest", help="report memory saved by compact dtypes")
+    p.add_argument("datasets", nargs="*", help="dataset names (default: all)")
+    p.set_defaults(func=cmd_ingest)
+
+    p = commands.add_parser("imports", help="import time per page against a startup budget")
+    p.add_argument("scripts", nargs="*", help="page scripts (default: every page)")
+    p.add_argument("--budget", type=float, default=startup.BUDGET_SECONDS, help="seconds per page")
+    p.set_defaults(func=cmd_imports)
+
+    p = commands.add_parser("clean", help="build the cleaned dataset from the raw form export")
+    p.add_argument("--export", help="raw export CSV (default: fetch the Google Sheet)")
+    p.add_argument("--out", help="write the cleaned rows as CSV (e.g. cleaned_data.csv)")
+    p.set_defaults(func=cmd_clean)
+
+    p = commands.add_parser("warmup", help="load every page's data concurrently and time it")
+    p.add_argument("pages", nargs="*", help=f"page scripts (default: all of {', '.join(warmup.PAGES)})")
+    p.set_defaults(func=cmd_warmup)
+
+    p = commands.add_parser("analyze", help="compute every headline table over a file, in chunks")
+    p.add_argument("source", help="dataset name or path to a .csv/.parquet survey file")
+    p.add_argument("--by", help="demographic column to group by (e.g. 'Area Type')")
+    p.add_argument("--chunksize", type=int, default=200_000, help="rows per chunk")
+    p.add_argument("--out", help="write one CSV per table into this directory")
+    p.set_defaults(func=cmd_analyze)
+
+    p = commands.add_parser("synth", help="write synthetic respondents fitted on a dataset")
+    p.add_argument("rows", type=_count, help="number of respondents (e.g. 5e6)")
+    p.add_argument("path", help="output .csv or .parquet")
+    p.add_argument("--source", default="cleaned", help="dataset the generator is fitted on")
+    p.add_argument("--chunksize", type=int, default=synthetic.CHUNKSIZE, help="rows per chunk")
+    p.add_argument("--seed", type=int)
+    p.set_defaults(func=cmd_synth)
+
+    p = commands.add_parser("bench", help="time every page computation on synthetic surveys")
+    p.add_argument("--sizes", nargs="+", type=_count, help="respondent counts (default: 1e2 .. 1e7)")
+    p.add_argument("--repeat", type=int, default=benchmark.REPEAT, help="timed runs per step (best kept)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--data", choices=["copula", "independent"], default="copula",
+                   help="correlated answers fitted on cleaned_data.csv, or independent columns")
+    p.add_argument("--save", help="write the results as JSON")
+    p.add_argument("--baseline", help="JSON from an earlier --save; exit 1 on slowdowns")
+    p.add_argument("--tolerance", type=float, default=benchmark.TOLERANCE,
+                   help="slowdown ratio counted as a regression")
+    p.set_defaults(func=cmd_bench)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
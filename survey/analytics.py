@@ -0,0 +1,156 @@
+# ---------------------------------------------------------
+# Headless analytics: every metric the pages show, no Streamlit
+# ---------------------------------------------------------
+"""Pure pandas/numpy functions behind the dashboard charts.
+
+The pages only render what these return, so each metric can be called,
+cached, benchmarked or run in batch on its own.  Aggregate metrics accept
+either a raw frame or a ``LikertCube`` (use the cube when the same data
+is queried repeatedly); row-level ones (radar split, severity table) take
+the frame.
+
+``python -m survey analyze`` runs them over a whole file in chunks.
+"""
+import numpy as np
+import pandas as pd
+
+from survey.correlation import CorrelationStats
+from survey.cube import LikertCube
+from survey.likert import LEVELS, classify_item, likert_columns
+
+AGREE = (4, 5)
+
+
+def as_cube(data, items=None):
+    return data if isinstance(data, LikertCube) else LikertCube.from_frame(data, items)
+
+
+def factor_columns(columns):
+    return [c for c in likert_columns(columns) if classify_item(c) == "Factor"]
+
+
+def effect_columns(columns):
+    return [c for c in likert_columns(columns) if classify_item(c) == "Effect"]
+
+
+# ---- rankings ------------------------------------------------------------
+def percent_agree(data, items=None, by=None, where=None):
+    """% of respondents answering 4 or 5 (Series, or DataFrame per ``by`` group)."""
+    return as_cube(data, items).percent_agree(items, by, where)
+
+
+def percent_agree_ranking(data, items=None, where=None):
+    """Items sorted by % agree, highest first, rounded to 1 decimal."""
+    return percent_agree(data, items, where=where).sort_values(ascending=False).round(1)
+
+
+def mean_scores(data, items=None, by=None, where=None):
+    return as_cube(data, items).mean(items, by, where)
+
+
+def mean_percent(data, items=None, by=None, where=None):
+    """Mean Likert score expressed as % of the maximum (5)."""
+    return mean_scores(data, items, by, where) / LEVELS[-1] * 100
+
+
+# ---- disagreement ----------------------------------------------------------
+def disagreement_matrix(data, items=None, by="Area Type", where=None):
+    """Strongly Disagree + Disagree counts, one row per ``by`` group, one column per item.
+
+    Same layout as ``disagree_summary(Ain).csv``.
+    """
+    table = as_cube(data, items).disagreement_table(items, by, where)
+    return table.pivot(index=by, columns="Likert Item", values="Total")
+
+
+# ---- correlation -----------------------------------------------------------
+def correlation_block(data, rows, cols, method="pearson", where=None):
+    """rows x cols correlation block; ``data`` is a frame or ``CorrelationStats``."""
+    stats = data if isinstance(data, CorrelationStats) else CorrelationStats.from_frame(
+        data, rows, cols, ranks=(method == "spearman"))
+    if method == "spearman":
+        return stats.spearman(where)
+    if method == "pearson":
+        return stats.pearson(where)
+    raise ValueError(f"method must be 'pearson' or 'spearman', not {method!r}")
+
+
+# ---- row-level splits --------------------------------------------------------
+def radar_split(df, factor, effects, agree=AGREE):
+    """% agreeing with each effect among respondents who agree / do not agree with ``factor``."""
+    factor_values = df[factor].to_numpy(dtype=float, na_value=np.nan)
+    agrees = np.isin(factor_values, agree)
+    others = np.isin(factor_values, [level for level in LEVELS if level not in agree])
+    effect_agree = np.column_stack([
+        np.isin(df[col].to_numpy(dtype=float, na_value=np.nan), agree) for col in effects
+    ])
+    with np.errstate(invalid="ignore"):
+        agree_pct = effect_agree[agrees].mean(axis=0) * 100
+        other_pct = effect_agree[others].mean(axis=0) * 100
+    return pd.DataFrame(
+        {"Agree (4–5)": agree_pct, "Disagree (1–2)": other_pct}, index=list(effects)
+    ).round(1)
+
+
+def severity_frequencies(df, factor, effect, bins=(0, 2, 3, 5),
+                         labels=("Low (1–2)", "Medium (3)", "High (4–5)")):
+    """Respondent counts per (factor severity band, effect answer)."""
+    subset = df[[factor, effect]].dropna()
+    severity = pd.cut(subset[factor], bins=list(bins), labels=list(labels))
+    return (
+        subset.assign(**{"Factor Severity": severity})
+        .groupby(["Factor Severity", effect], observed=False)
+        .size()
+        .reset_index(name="Frequency")
+    )
+
+
+def level_distribution(df, by, item):
+    """Share of each answer to ``item`` within each ``by`` group (long format)."""
+    return (
+        df.groupby(by, observed=True)[item]
+        .value_counts(normalize=True)
+        .rename("proportion")
+        .reset_index()
+    )
+
+
+# ---- batch -------------------------------------------------------------------
+def analyze_chunks(chunks, by=None):
+    """Build the cube and factor x effect correlation stats from an iterable of frames.
+
+    Memory stays bounded by the chunk size.  Spearman tables use the 1-5
+    levels; fractional answers only count towards Pearson.
+    """
+    cube = None
+    stats = None
+    for chunk in chunks:
+        part = LikertCube.from_frame(chunk)
+        cube = part if cube is None else LikertCube.concat([cube, part])
+        if stats is None:
+            stats = CorrelationStats(
+                factor_columns(chunk.columns), effect_columns(chunk.columns),
+                [by] if by else [], LEVELS,
+            )
+        stats.update(chunk)
+    if cube is None:
+        raise ValueError("no rows to analyze")
+    return cube, stats
+
+
+def summary_tables(cube, stats, by=None):
+    """Every headline table, keyed by a short name (used by the batch CLI)."""
+    factors, effects = stats.rows, stats.cols
+    tables = {
+        "percent_agree": percent_agree(cube, by=by),
+        "mean_scores": mean_scores(cube, by=by),
+        "pearson": stats.pearson(),
+        "spearman": stats.spearman(),
+    }
+    if "Area Type" in cube.dims:
+        tables["disagreement"] = disagreement_matrix(cube)
+    if factors:
+        tables["factor_ranking"] = percent_agree_ranking(cube, factors)
+    if effects:
+        tables["effect_ranking"] = percent_agree_ranking(cube, effects)
+    return tables
@@ -0,0 +1,313 @@
+# ---------------------------------------------------------
+# Benchmarks: page computations on synthetic surveys
+# ---------------------------------------------------------
+"""How the dashboard's computations scale with the number of respondents.
+
+Inputs have the schema of ``cleaned_data.csv`` (same columns and order,
+answer levels, demographic values, ingest dtypes) at any size: by default
+from the correlated generator in ``survey.synthetic`` (``copula_frame``), or with
+``--data independent`` from ``synthetic_frame``, which draws every column
+from its observed distribution on its own.  Each
+``STEPS`` entry replays what one page does on every rerun, and ``run``
+reports wall time (best of ``repeat``), throughput and the peak memory
+allocated by the step (a separate ``tracemalloc`` pass, so tracing does
+not slow the timed runs).  The ``*_pandas`` steps replay the pandas code
+the pages ran before the shared engines, on the same frame, and
+``speedups`` sets each engine step against its baseline.  Those do not
+scale (Fathin's melt alone holds 11 rows per respondent): a baseline whose
+peak, scaled from the previous size, would not fit in the memory available
+is reported as skipped instead of being run.
+
+    python -m survey bench                                  # 1e2 .. 1e7 rows
+    python -m survey bench --sizes 1e2 1e3 1e4             # a quick run
+    python -m survey bench --save bench.json
+    python -m survey bench --baseline bench.json            # exit 1 on slowdowns
+"""
+import json
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+from survey import analytics, synthetic
+from survey.correlation import CorrelationStats
+from survey.cube import LikertCube
+from survey.datasets import load_dataset
+from survey.filters import FilterIndex
+from survey.likert import likert_columns
+from survey.regression import regression_table
+
+SIZES = [10**k for k in range(2, 8)]
+REPEAT = 3
+# A step is a regression when it is this much slower than the baseline ...
+TOLERANCE = 1.5
+# ... and slower by more than this many seconds (timer noise on tiny sizes)
+NOISE_SECONDS = 0.005
+# Share of the available memory a pandas baseline's predicted peak may take
+MEMORY_HEADROOM = 0.8
+
+
+@dataclass
+class StepResult:
+    rows: int
+    step: str
+    seconds: float          # None: skipped, peak_bytes is the predicted peak
+    peak_bytes: int
+
+    @property
+    def rows_per_second(self):
+        return self.rows / self.seconds if self.seconds else float("inf")
+
+    def __str__(self):
+        if self.seconds is None:
+            return f"{self.rows:>10,}  {self.step:<24} skipped: needs about {self.peak_bytes / 2**30:.1f} GiB"
+        return (f"{self.rows:>10,}  {self.step:<24} {self.seconds * 1000:10.2f} ms  "
+                f"{self.rows_per_second:14,.0f} rows/s  {self.peak_bytes / 2**20:9.1f} MiB")
+
+
+def synthetic_frame(n, seed=0, template=None):
+    """``n`` respondents shaped like ``template`` (default: the cleaned dataset).
+
+    Columns are sampled independently, so the marginals match but the
+    factor/effect correlations do not.
+    """
+    template = load_dataset("cleaned") if template is None else template
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for col in template.columns:
+        counts = template[col].value_counts(sort=False, dropna=True)
+        p = counts.to_numpy(dtype=float) / counts.sum()
+        codes = rng.choice(len(counts), size=n, p=p).astype(np.int32)
+        if isinstance(template[col].dtype, pd.CategoricalDtype):
+            columns[col] = pd.Categorical.from_codes(codes, dtype=template[col].dtype)
+        else:
+            columns[col] = counts.index.to_numpy()[codes].astype(template[col].dtype)
+    return pd.DataFrame(columns)
+
+
+def copula_frame(n, seed=0):
+    """``n`` correlated respondents, sampled in chunks to bound the latent draws."""
+    return pd.concat(synthetic.get_model().generate(n, seed=seed), ignore_index=True)
+
+
+# ---- steps ------------------------------------------------------------------
+# Each step takes a context dict holding the frame and whatever earlier
+# steps built (cube, correlation stats), exactly as the pages share them.
+def _items(ctx):
+    if "factors" not in ctx:
+        columns = ctx["df"].columns
+        ctx["factors"] = analytics.factor_columns(columns)
+        ctx["effects"] = analytics.effect_columns(columns)
+    return ctx["factors"], ctx["effects"]
+
+
+def step_cube(ctx):
+    ctx["cube"] = LikertCube.from_frame(ctx["df"])
+
+
+def step_correlation(ctx):
+    factors, effects = _items(ctx)
+    ctx["stats"] = CorrelationStats.from_frame(ctx["df"], factors, effects)
+
+
+def step_izzati_ranking(ctx):
+    factors, effects = _items(ctx)
+    analytics.percent_agree_ranking(ctx["cube"], factors)
+    analytics.percent_agree_ranking(ctx["cube"], effects)
+
+
+def step_izzati_spearman(ctx):
+    ctx["stats"].spearman()
+
+
+def step_izzati_radar(ctx):
+    factors, effects = _items(ctx)
+    analytics.radar_split(ctx["df"], factors[0], effects)
+    analytics.severity_frequencies(ctx["df"], factors[0], effects[0])
+
+
+def step_ain_disagreement(ctx):
+    cube = ctx["cube"]
+    cube.disagreement_table(likert_columns(cube.items), by="Area Type", other="Special")
+
+
+def step_khalida_filters(ctx):
+    index = FilterIndex(ctx["df"], ["Gender", "Status", "Area Type"])
+    where = {"Gender": index.options["Gender"][0], "Area Type": index.options["Area Type"][0]}
+    factors, effects = _items(ctx)
+    sub = index.view(where)
+    ctx["cube"].mean(effects, where=where)
+    ctx["cube"].mean(effects, by="Status", where=where)
+    ctx["stats"].pearson(where)
+    analytics.level_distribution(sub, "Gender", effects[0])
+
+
+def step_fathin_means(ctx):
+    factors, _ = _items(ctx)
+    area = analytics.mean_percent(ctx["cube"], factors, by="Area Type")
+    area.reset_index().melt(id_vars=["Area Type"], var_name="Factor", value_name="Percentage")
+    analytics.mean_percent(ctx["cube"], factors, by="Status")
+
+
+def step_fathin_regression(ctx):
+    regression_table(ctx["stats"])
+
+
+# ---- pandas baselines ---------------------------------------------------------
+# What the pages computed before the shared engines, kept as written there
+# (over the same items as the engine steps) so speedups are measured, not assumed.
+def step_ain_disagreement_pandas(ctx):
+    df = ctx["df"]
+    rows = []
+    for area in df["Area Type"].unique():
+        for col in likert_columns(df.columns):
+            count_sd = df[(df["Area Type"] == area) & (df[col] == 1)].shape[0]
+            count_d = df[(df["Area Type"] == area) & (df[col] == 2)].shape[0]
+            rows.append({"Area Type": area, "Likert Item": col, "Total": count_sd + count_d,
+                         "SD": count_sd, "D": count_d})
+    pd.DataFrame(rows)
+
+
+def step_izzati_ranking_pandas(ctx):
+    for columns in _items(ctx):
+        ranking = (
+            ctx["df"][columns]
+            .apply(lambda x: x.isin([4, 5]).mean() * 100)
+            .sort_values(ascending=False)
+            .reset_index()
+        )
+        ranking.columns = ["Item", "Percent Agree"]
+
+
+def step_izzati_spearman_pandas(ctx):
+    factors, effects = _items(ctx)
+    ctx["df"][factors + effects].corr(method="spearman").loc[factors, effects]
+
+
+def step_fathin_means_pandas(ctx):
+    factors, _ = _items(ctx)
+    df = ctx["df"]
+    melted = df.melt(id_vars=["Area Type"], value_vars=factors, var_name="Factor", value_name="Score")
+    melted["Percentage"] = (melted["Score"] / 5) * 100
+    melted.groupby(["Area Type", "Factor"], observed=True)["Percentage"].mean().reset_index()
+    (df.groupby("Status", observed=True)[factors].mean() / 5) * 100
+
+
+STEPS = {
+    "cube": step_cube,
+    "correlation": step_correlation,
+    "izzati_ranking": step_izzati_ranking,
+    "izzati_spearman": step_izzati_spearman,
+    "izzati_radar": step_izzati_radar,
+    "ain_disagreement": step_ain_disagreement,
+    "khalida_filters": step_khalida_filters,
+    "fathin_means": step_fathin_means,
+    "fathin_regression": step_fathin_regression,
+    "ain_disagreement_pandas": step_ain_disagreement_pandas,
+    "izzati_ranking_pandas": step_izzati_ranking_pandas,
+    "izzati_spearman_pandas": step_izzati_spearman_pandas,
+    "fathin_means_pandas": step_fathin_means_pandas,
+}
+# engine step -> the pandas step it replaced
+BASELINES = {name[:-len("_pandas")]: name for name in STEPS if name.endswith("_pandas")}
+# engine step -> the step building what it reads (once per data version)
+BUILT_FROM = {
+    "izzati_ranking": "cube",
+    "izzati_spearman": "correlation",
+    "ain_disagreement": "cube",
+    "fathin_means": "cube",
+}
+
+
+def _timed(fn, ctx, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(ctx)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _peak(fn, ctx):
+    tracemalloc.start()
+    try:
+        fn(ctx)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _available_bytes():
+    """Memory the system can still hand out, or None where it is not known."""
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def run(sizes=None, repeat=REPEAT, seed=0, frame=synthetic_frame):
+    """Time every step at every size, yielding each result as it is measured.
+
+    ``frame(n, seed)`` builds the input.
+    """
+    per_row = {}        # step -> peak bytes per row at the previous size
+    for n in sorted(sizes or SIZES):
+        ctx = {"df": frame(n, seed=seed)}
+        for name, fn in STEPS.items():
+            need = int(per_row.get(name, 0) * n)
+            available = _available_bytes()
+            if name in BASELINES.values() and available is not None and need > available * MEMORY_HEADROOM:
+                yield StepResult(n, name, None, need)
+                continue
+            seconds = _timed(fn, ctx, repeat)
+            peak = _peak(fn, ctx)
+            per_row[name] = peak / n
+            yield StepResult(n, name, seconds, peak)
+        del ctx
+
+
+def speedups(results):
+    """``(rows, step, rerun, cold)`` speedups over the pandas baselines.
+
+    ``rerun`` compares the step alone (the cube or correlation stats are
+    already cached, as on every rerun after the first); ``cold`` adds the
+    time to build them, as on the first run after the data changes.
+    """
+    seconds = {(r.rows, r.step): r.seconds for r in results}
+    ratios = []
+    for r in results:
+        baseline = seconds.get((r.rows, BASELINES.get(r.step)))
+        if baseline is None or not r.seconds:
+            continue
+        build = seconds.get((r.rows, BUILT_FROM[r.step]), 0.0)
+        ratios.append((r.rows, r.step, baseline / r.seconds, baseline / (r.seconds + build)))
+    return ratios
+
+
+def save(results, path):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump([asdict(r) for r in results], fh, indent=1)
+
+
+def load(path):
+    with open(path, encoding="utf-8") as fh:
+        return [StepResult(**r) for r in json.load(fh)]
+
+
+def regressions(results, baseline, tolerance=TOLERANCE, noise=NOISE_SECONDS):
+    """``(result, baseline_seconds)`` for steps slower than the baseline run."""
+    before = {(r.rows, r.step): r.seconds for r in baseline}
+    slower = []
+    for r in results:
+        old = before.get((r.rows, r.step))
+        if None in (old, r.seconds):
+            continue
+        if r.seconds > old * tolerance and r.seconds - old > noise:
+            slower.append((r, old))
+    return slower
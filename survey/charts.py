@@ -0,0 +1,254 @@
+# ---------------------------------------------------------
+# Distribution charts from summary statistics
+# ---------------------------------------------------------
+"""Distribution figures whose payload does not grow with the survey.
+
+``px.box(points="all")`` and ``px.violin(points="all")`` serialise every
+respondent's answer into the chart JSON, and the browser recomputes the
+quartiles and density on each render.  Here one group-by reduces the rows
+to answer counts per group (Likert answers take a handful of values), and
+the quartiles, whiskers, outliers and violin outline are computed from
+those counts and sent precomputed.  Up to ``POINTS_THRESHOLD`` answers per
+group are still drawn as points; above that a fixed-size random sample is
+shown instead, so the figure stays the same size however many responses
+come in.
+
+Likert-vs-Likert relationships are drawn the same way: a levels x levels
+count grid (bubbles or heat cells) with the fitted line on top, instead of
+one overlapping marker per respondent.
+"""
+import numpy as np
+import pandas as pd
+
+POINTS_THRESHOLD = 300     # draw every point up to this many answers per group
+SAMPLE_POINTS = 150        # points per group above the threshold
+KDE_GRID = 60
+VIOLIN_WIDTH = 0.4         # half-width of the widest violin, in category units
+MARKER_COLOR = "#636efa"   # first colour of plotly's default sequence, as px uses
+
+
+def answer_counts(df, by, value):
+    """Answer counts, one row per ``by`` group, one column per distinct answer."""
+    counts = df.groupby([by, value], observed=True).size().unstack(value, fill_value=0)
+    return counts.sort_index(axis=1)
+
+
+def _quantile(values, counts, p):
+    """Quantile of answers given as counts, the way plotly's box traces compute it.
+
+    plotly's default ``quartilemethod="linear"`` interpolates at position
+    ``n * p - 0.5`` of the sorted answers (Hyndman & Fan method 5), not at
+    numpy's ``(n - 1) * p``; using the same rule keeps the boxes identical
+    to the ``px.box`` / ``px.violin`` charts they replace.
+    """
+    n = counts.sum()
+    cum = np.cumsum(counts)
+    h = min(max(n * p - 0.5, 0), n - 1)
+    lo = values[np.searchsorted(cum, np.floor(h), side="right")]
+    hi = values[np.searchsorted(cum, np.ceil(h), side="right")]
+    return lo + (hi - lo) * (h - np.floor(h))
+
+
+def box_summary(counts):
+    """n, mean, quartiles and Tukey whiskers per group from ``answer_counts``."""
+    values = counts.columns.to_numpy(dtype=float)
+    rows = []
+    for group, row in counts.iterrows():
+        c = row.to_numpy(dtype=float)
+        present = values[c > 0]
+        q1, median, q3 = (_quantile(values, c, p) for p in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        inside = present[(present >= q1 - 1.5 * iqr) & (present <= q3 + 1.5 * iqr)]
+        rows.append({
+            "group": group,
+            "n": int(c.sum()),
+            "mean": float((values * c).sum() / c.sum()),
+            "q1": q1, "median": median, "q3": q3,
+            # as plotly: a whisker never ends inside the box
+            "lowerfence": min(q1, inside.min()), "upperfence": max(q3, inside.max()),
+        })
+    return pd.DataFrame(rows).set_index("group")
+
+
+def density(counts, grid):
+    """Gaussian KDE of each group's answers on ``grid`` (Silverman bandwidth)."""
+    values = counts.columns.to_numpy(dtype=float)
+    shapes = {}
+    for group, row in counts.iterrows():
+        c = row.to_numpy(dtype=float)
+        n = c.sum()
+        mean = (values * c).sum() / n
+        std = np.sqrt((c * (values - mean) ** 2).sum() / max(n - 1, 1))
+        q1, q3 = _quantile(values, c, 0.25), _quantile(values, c, 0.75)
+        spread = min(std, (q3 - q1) / 1.349) or std or 0.5
+        bandwidth = 0.9 * spread * n ** -0.2
+        z = (grid[:, None] - values[None, :]) / bandwidth
+        shapes[group] = (np.exp(-0.5 * z * z) * c).sum(axis=1) / (n * bandwidth * np.sqrt(2 * np.pi))
+    return shapes
+
+
+def point_sample(df, by, value, threshold=POINTS_THRESHOLD, sample=SAMPLE_POINTS, seed=0):
+    """Answers drawn as points: every answer of small groups, a random sample otherwise."""
+    rows = df[[by, value]].dropna()
+    sizes = rows.groupby(by, observed=True)[value].transform("size")
+    small = rows[sizes <= threshold]
+    large = rows[sizes > threshold]
+    if len(large):
+        large = large.groupby(by, observed=True, group_keys=False).sample(n=sample, random_state=seed)
+    return pd.concat([small, large])
+
+
+def _outliers(counts, summary):
+    xs, ys, hover = [], [], []
+    values = counts.columns.to_numpy(dtype=float)
+    for group, row in counts.iterrows():
+        stats = summary.loc[group]
+        for v, c in zip(values, row.to_numpy()):
+            if c and (v < stats["lowerfence"] or v > stats["upperfence"]):
+                xs.append(group)
+                ys.append(v)
+                hover.append(f"{group}: {v:g} ({c} responses)")
+    return xs, ys, hover
+
+
+def box_figure(df, by, value, title=None, points="auto", threshold=POINTS_THRESHOLD,
+               sample=SAMPLE_POINTS, seed=0):
+    """Box plot of ``value`` per ``by`` group from precomputed statistics.
+
+    ``points``: "auto" (all points up to ``threshold`` per group, a sample
+    above), "sample" (always sample) or False (no point overlay).
+    """
+    import plotly.graph_objects as go
+
+    counts = answer_counts(df, by, value)
+    summary = box_summary(counts)
+    groups = [str(g) for g in summary.index]
+    fig = go.Figure(go.Box(
+        x=groups, q1=summary["q1"], median=summary["median"], q3=summary["q3"],
+        lowerfence=summary["lowerfence"], upperfence=summary["upperfence"],
+        mean=summary["mean"], name=value, marker_color=MARKER_COLOR, boxpoints=False,
+    ))
+    if points == "sample":
+        threshold = 0
+    if points:
+        shown = point_sample(df, by, value, threshold, sample, seed)
+        fig.add_trace(go.Box(
+            x=shown[by].astype(str), y=shown[value], boxpoints="all", jitter=0.3, pointpos=0,
+            fillcolor="rgba(0,0,0,0)", line_color="rgba(0,0,0,0)", marker_color=MARKER_COLOR,
+            hoveron="points", name=value,
+        ))
+    if not points or summary["n"].max() > threshold:
+        # Outliers hidden by sampling are still marked, once per distinct answer
+        xs, ys, hover = _outliers(counts, summary)
+        fig.add_trace(go.Scatter(
+            x=[str(x) for x in xs], y=ys, mode="markers", marker_color=MARKER_COLOR,
+            hovertext=hover, hoverinfo="text", name="outliers",
+        ))
+    fig.update_layout(title=title, showlegend=False, xaxis_title=by, yaxis_title=value)
+    return fig
+
+
+def violin_figure(df, by, value, title=None, points="auto", threshold=POINTS_THRESHOLD,
+                  sample=SAMPLE_POINTS, seed=0, box=True):
+    """Violin plot drawn from a server-side KDE of each group's answer counts."""
+    import plotly.graph_objects as go
+
+    counts = answer_counts(df, by, value)
+    values = counts.columns.to_numpy(dtype=float)
+    pad = max((values.max() - values.min()) * 0.15, 0.5)
+    grid = np.linspace(values.min() - pad, values.max() + pad, KDE_GRID)
+    shapes = density(counts, grid)
+    positions = {group: i for i, group in enumerate(counts.index)}
+
+    fig = go.Figure()
+    for group, shape in shapes.items():
+        half = shape / shape.max() * VIOLIN_WIDTH       # same width per group, as px does
+        keep = shape > shape.max() * 1e-3
+        x0 = positions[group]
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([x0 + half[keep], (x0 - half[keep])[::-1]]),
+            y=np.concatenate([grid[keep], grid[keep][::-1]]),
+            fill="toself", mode="lines", line_color=MARKER_COLOR, opacity=0.6,
+            name=str(group), hoverinfo="name",
+        ))
+    if box:
+        summary = box_summary(counts)
+        fig.add_trace(go.Box(
+            x=[positions[g] for g in summary.index], q1=summary["q1"], median=summary["median"],
+            q3=summary["q3"], lowerfence=summary["lowerfence"], upperfence=summary["upperfence"],
+            width=0.08, marker_color=MARKER_COLOR, fillcolor="white", boxpoints=False, name="box",
+        ))
+    if points:
+        if points == "sample":
+            threshold = 0
+        shown = point_sample(df, by, value, threshold, sample, seed)
+        rng = np.random.default_rng(seed)
+        x = shown[by].map(positions).to_numpy(dtype=float) + rng.uniform(-0.25, 0.25, len(shown))
+        fig.add_trace(go.Scatter(
+            x=x, y=shown[value], mode="markers", marker=dict(color=MARKER_COLOR, size=4),
+            name="responses", hoverinfo="y",
+        ))
+    fig.update_layout(
+        title=title, showlegend=False, yaxis_title=value,
+        xaxis=dict(title=by, tickvals=list(positions.values()),
+                   ticktext=[str(g) for g in positions]),
+    )
+    return fig
+
+
+def fit_line(fit, x, y, confidence=95):
+    """Fitted regression line trace for a ``survey.regression`` table row."""
+    import plotly.graph_objects as go
+
+    line_x = np.array([fit["x_min"], fit["x_max"]])
+    return go.Scatter(
+        x=line_x, y=fit["intercept"] + fit["slope"] * line_x,
+        mode="lines", name="OLS trendline", showlegend=False,
+        hovertemplate=(
+            f"<b>OLS trendline</b><br>{y} = {fit['slope']:.4f} * {x} + {fit['intercept']:.4f}"
+            f"<br>R<sup>2</sup>={fit['r2']:.6f}"
+            f"<br>{confidence}% CI (slope): {fit['slope_low']:.3f} to {fit['slope_high']:.3f}"
+            "<extra></extra>"
+        ),
+    )
+
+
+def count_grid_figure(grid, fit=None, mode="bubble", title=None, max_size=45):
+    """Answer-pair counts (``CorrelationStats.joint_counts``) as bubbles or heat cells.
+
+    Bubble areas are proportional to counts; ``fit`` adds the regression line.
+    """
+    import plotly.graph_objects as go
+
+    x, y = grid.index.name, grid.columns.name
+    xs = grid.index.to_numpy(dtype=float)
+    ys = grid.columns.to_numpy(dtype=float)
+    counts = grid.to_numpy()
+    if mode == "heat":
+        trace = go.Heatmap(
+            x=xs, y=ys, z=counts.T, text=counts.T, texttemplate="%{text}", colorscale="Blues",
+            colorbar_title="Responses",
+            hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<br>%{{z}} responses<extra></extra>",
+        )
+    elif mode == "bubble":
+        gx, gy = np.meshgrid(xs, ys, indexing="ij")
+        keep = counts > 0
+        trace = go.Scatter(
+            x=gx[keep], y=gy[keep], mode="markers+text", text=counts[keep],
+            textposition="middle center",
+            marker=dict(
+                size=counts[keep], sizemode="area", sizemin=3, color=MARKER_COLOR, opacity=0.6,
+                sizeref=2.0 * max(counts.max(), 1) / max_size**2,
+            ),
+            hovertemplate=f"{x}=%{{x}}<br>{y}=%{{y}}<br>%{{text}} responses<extra></extra>",
+            showlegend=False,
+        )
+    else:
+        raise ValueError(f"mode must be 'bubble' or 'heat', not {mode!r}")
+    fig = go.Figure(trace)
+    if fit is not None:
+        fig.add_trace(fit_line(fit, x, y))
+    fig.update_layout(
+        title=title, xaxis=dict(title=x, tickvals=xs), yaxis=dict(title=y, tickvals=ys),
+    )
+    return fig
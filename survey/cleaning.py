@@ -0,0 +1,174 @@
+# ---------------------------------------------------------
+# Cleaning pipeline: raw form export -> cleaned dataset
+# ---------------------------------------------------------
+"""Build the cleaned dataset from the raw Google Form export.
+
+``cleaned_data.csv`` used to be produced offline and committed by hand.
+``clean`` reproduces it from the export in vectorized steps:
+
+1. rename + language merge + Likert coding: ``survey.form.unify``;
+2. drop incomplete responses (any canonical answer missing);
+3. drop duplicate submissions: same Timestamp and same answers, i.e. a
+   row the sheet holds twice.  Identical answers at different times are
+   different respondents and are kept;
+4. drop the Timestamp / Language columns and code the result to compact
+   dtypes with ``survey.ingest.normalize``.
+
+The result is cached by a hash of the export's content, in memory and as
+a Parquet file in ``.survey_cache/``, so a refresh that fetches the same
+rows again, or a server restart, does not clean again.  The frame itself
+is served from a memory map shared by every server process
+(``survey.shared``, named after the export's content hash).  When a refresh
+only brought new submissions, ``extend`` cleans just those and appends
+them.  ``survey.datasets``
+serves it as the ``cleaned`` dataset; ``python -m survey clean`` prints
+the report and can write the CSV.
+"""
+import hashlib
+import json
+import threading
+from dataclasses import asdict, dataclass, field
+
+import pandas as pd
+
+from survey import columnar, datasets, form, incremental, ingest, shared
+
+FORMAT = 1      # bump when the pipeline's output changes so old copies are ignored
+PREFIX = "pipeline"
+NAME = "cleaned"    # dataset name of the shared (memory-mapped) copy
+
+_lock = threading.Lock()
+_cache = {}     # content hash -> (DataFrame, CleaningReport); the latest export cleaned, published or not
+
+
+@dataclass
+class CleaningReport:
+    content_hash: str
+    raw_rows: int
+    responses: int              # rows with either language half answered
+    incomplete: int             # responses dropped for missing answers
+    duplicates: int             # repeated submissions dropped
+    rows: int
+    languages: dict = field(default_factory=dict)   # language -> kept rows
+
+    def __str__(self):
+        langs = ", ".join(f"{lang} {n}" for lang, n in self.languages.items())
+        return (
+            f"{self.rows} clean rows from {self.responses} responses "
+            f"({self.incomplete} incomplete, {self.duplicates} duplicate submissions dropped; "
+            f"{langs}) [export {self.content_hash[:12]}]"
+        )
+
+
+def content_hash(raw):
+    """Hash of the export's headers and cell values (row order included)."""
+    digest = hashlib.sha256("\x1f".join(map(str, raw.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(raw, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def clean(raw, digest=None):
+    """``(cleaned_frame, CleaningReport)`` for the raw export ``raw``."""
+    unified = form.unify(raw)
+    fields = list(form.QUESTIONS)
+
+    complete = unified[fields].notna().all(axis=1).to_numpy()
+    kept = unified[complete]
+    if "Timestamp" in kept.columns:
+        repeated = kept.duplicated(subset=["Timestamp"] + fields).to_numpy()
+        kept = kept[~repeated]
+    duplicates = int(complete.sum()) - len(kept)
+
+    frame = kept[fields].reset_index(drop=True)
+    frame[form.LIKERT_FIELDS] = frame[form.LIKERT_FIELDS].astype("int64")
+    frame, _ = ingest.normalize(frame, "cleaned")
+    report = CleaningReport(
+        content_hash=digest or content_hash(raw),
+        raw_rows=len(raw),
+        responses=len(unified),
+        incomplete=int((~complete).sum()),
+        duplicates=duplicates,
+        rows=len(frame),
+        languages=kept["Language"].value_counts().to_dict(),
+    )
+    return frame, report
+
+
+def _path(digest):
+    return columnar.CACHE_DIR / f"{PREFIX}-{digest[:32]}-f{FORMAT}.parquet"
+
+
+def _load(path):
+    if not (columnar.available() and path.exists()):
+        return None
+    try:
+        report = CleaningReport(**json.loads(path.with_suffix(".json").read_text(encoding="utf-8")))
+    except (OSError, ValueError, TypeError):
+        return None
+    return pd.read_parquet(path), report
+
+
+def _store(path, frame, report):
+    if not columnar.available():
+        return
+    try:
+        columnar.CACHE_DIR.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        frame.to_parquet(tmp, compression=columnar.COMPRESSION, index=False)
+        path.with_suffix(".json").write_text(json.dumps(asdict(report)), encoding="utf-8")
+        tmp.replace(path)
+        for old in columnar.CACHE_DIR.glob(f"{PREFIX}-*"):
+            if old.stem != path.stem:
+                old.unlink()
+    except OSError:
+        pass        # the on-disk copy is only an accelerator
+
+
+def build(raw):
+    """``(cleaned_frame, CleaningReport)`` for ``raw``, cleaned at most once per export content."""
+    digest = content_hash(raw)
+    with _lock:
+        cached = _cache.get(digest)
+        if cached is None:
+            path = _path(digest)
+            cached = _load(path)
+            if cached is None:
+                cached = clean(raw, digest)
+                _store(path, *cached)
+            cached = (shared.share(NAME, digest, cached[0]), cached[1])
+            _cache.clear()
+            _cache[digest] = cached
+    return cached[0].copy(deep=False), cached[1]
+
+
+def extend(cleaned, report, raw_rows):
+    """``(frame, CleaningReport)``: ``cleaned`` followed by the cleaned ``raw_rows``.
+
+    ``report`` is the one ``cleaned`` was built with; ``raw_rows`` are the
+    new submissions only.  Duplicates of earlier rows cannot be among them:
+    a repeated submission carries an old Timestamp, and ``survey.incremental``
+    only passes on rows after its high-water mark.
+    """
+    if not len(raw_rows):
+        return cleaned, report
+    new, added = clean(raw_rows)
+    languages = dict(report.languages)
+    for lang, n in added.languages.items():
+        languages[lang] = languages.get(lang, 0) + n
+    frame = incremental.append_rows(cleaned, new)
+    report = CleaningReport(
+        content_hash=hashlib.sha256((report.content_hash + added.content_hash).encode()).hexdigest(),
+        raw_rows=report.raw_rows + added.raw_rows,
+        responses=report.responses + added.responses,
+        incomplete=report.incomplete + added.incomplete,
+        duplicates=report.duplicates + added.duplicates,
+        rows=len(frame),
+        languages=languages,
+    )
+    # The chained hash names the whole frame, not just the new rows
+    return shared.share(NAME, report.content_hash, frame).copy(deep=False), report
+
+
+def last_report():
+    """``CleaningReport`` of the cleaned dataset sessions are served, or None."""
+    return datasets.build_report(NAME)
@@ -0,0 +1,81 @@
+# ---------------------------------------------------------
+# Columnar (Parquet) copies of the survey CSVs
+# ---------------------------------------------------------
+"""Typed, compressed column store with column projection.
+
+The first time a local CSV is parsed, ``survey.datasets`` writes a Parquet
+copy into ``.survey_cache/`` named after the CSV's data version.  Later
+cold starts read that file instead, and only the columns the page asks
+for.  The frame written is the output of ``survey.ingest.normalize``, so
+Likert items are stored as ``int8`` (``float32`` when the export holds
+fractional answers) and demographics as categoricals.
+
+Parquet support comes from pyarrow (in requirements.txt); if
+it is missing every function here degrades to "not available" and the
+CSV path is used.
+
+Run ``python -m survey columnar`` to convert every local dataset up front.
+"""
+from pathlib import Path
+
+import pandas as pd
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".survey_cache"
+COMPRESSION = "zstd"
+FORMAT = 1      # bump when the stored dtypes change so old copies are ignored
+
+
+def available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def path_for(name, version):
+    return CACHE_DIR / f"{name}-{version}-f{FORMAT}.parquet"
+
+
+def read(name, version, columns=None):
+    """Projected frame from the columnar copy, or None if there is none."""
+    path = path_for(name, version)
+    if not available() or not path.exists():
+        return None
+    return pd.read_parquet(path, columns=list(columns) if columns is not None else None)
+
+
+def write(name, version, df):
+    """Store ``df`` as the columnar copy for ``version``; old versions are removed.
+
+    Failures (read-only checkout, no pyarrow) are ignored: the columnar
+    copy is only an accelerator.
+    """
+    if not available():
+        return None
+    path = path_for(name, version)
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        df.to_parquet(tmp, compression=COMPRESSION, index=False)
+        tmp.replace(path)
+        for old in CACHE_DIR.glob(f"{name}-*.parquet"):
+            if old != path:
+                old.unlink()
+    except OSError:
+        return None
+    return path
+
+
+def convert_all():
+    """Write the columnar copy of every local dataset; returns {name: path or None}."""
+    from survey.datasets import SOURCES, dataset_version, load_dataset, resolve
+
+    written = {}
+    for name in SOURCES:
+        if not isinstance(resolve(name), Path):
+            continue
+        load_dataset(name)
+        path = path_for(name, dataset_version(name))
+        written[name] = path if path.exists() else None
+    return written
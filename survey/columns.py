@@ -0,0 +1,57 @@
+# ---------------------------------------------------------
+# Column sets each page loads and aggregates
+# ---------------------------------------------------------
+"""The columns every page declares, defined once.
+
+The pages load, project and aggregate these columns, and
+``survey.warmup`` prepares exactly the same frames and derived objects at
+server start.  Both import them from here, so a page that changes its
+columns changes what is warmed with it.
+"""
+# Izzati: rural factors vs effects
+IZZATI_FACTORS = [
+    "Lack of Parking Space Factor",
+    "Rainy Weather Factor",
+    "Single Gate Factor",
+    "Leaving Work Late Factor",
+    "Increasing Population Factor",
+    "Students Not Sharing Vehicles",
+    "Lack of Pedestrian Bridge Factor",
+    "Damaged Road Factor",
+    "Construction/Roadworks Factor",
+    "Late Drop-off/Pick-up Factor",
+    "Narrow Road Factor",
+    "Undisciplined Driver Factor",
+]
+EFFECTS = [
+    "Unintended Road Accidents Effect",
+    "Time Wastage Effect",
+    "Pressure on Road Users Effect",
+    "Students Late to School Effect",
+    "Environmental Pollution Effect",
+    "Fuel Wastage Effect",
+]
+IZZATI_COLUMNS = IZZATI_FACTORS + EFFECTS
+
+# Khalida: filters, causes and effects
+KHALIDA_FILTERS = ["Gender", "Status", "Area Type"]
+KHALIDA_CAUSES = [
+    "Undisciplined Driver Factor",
+    "Narrow Road Factor",
+    "Single Gate Factor",
+    "Lack of Parking Space Factor",
+]
+KHALIDA_COLUMNS = KHALIDA_FILTERS + KHALIDA_CAUSES + EFFECTS
+
+
+# Fatin: found by keyword in the dataset's own headers
+def fatin_factors(columns):
+    return [col for col in columns if "factor" in col.lower()]
+
+
+def fatin_impacts(columns):
+    return [col for col in columns if "impact" in col.lower()]
+
+
+def fatin_measures(columns):
+    return [col for col in columns if "measure" in col.lower()]
@@ -0,0 +1,196 @@
+# ---------------------------------------------------------
+# Correlation blocks from sufficient statistics
+# ---------------------------------------------------------
+"""Pearson and Spearman factor x effect blocks without touching raw rows.
+
+For every demographic combination (the same combinations as the cube)
+and every (row item, column item) pair the engine keeps:
+
+* pairwise-complete moment sums n, Sx, Sy, Sxx, Syy, Sxy -> Pearson;
+* a joint count table over answer levels -> Spearman.  Likert answers take
+  only a handful of values, so the average ranks of a subgroup follow from
+  its level counts, and Spearman is the Pearson correlation of those ranks
+  weighted by the joint table.
+
+Both agree with ``DataFrame.corr`` on the same rows (pairwise complete
+observations, average ranks for ties).  Any filtered subgroup is answered
+by summing the combinations it covers, and ``update`` folds in new
+responses without recomputing the old ones.
+"""
+import copy
+
+import numpy as np
+import pandas as pd
+
+from survey.datasets import derived
+from survey.ingest import DEMOGRAPHIC_COLUMNS
+from survey.likert import item_values
+
+# More distinct answer values than this and Spearman tables are not kept
+MAX_LEVELS = 20
+# ``update`` folds larger frames in slices of this many rows, so its float
+# and bin temporaries stay bounded however many responses arrive at once
+CHUNK_ROWS = 500_000
+
+
+class CorrelationStats:
+    def __init__(self, rows, cols, dims, levels):
+        self.rows = list(rows)
+        self.cols = list(cols)
+        self.dims = list(dims)
+        self.levels = None if levels is None else np.asarray(levels, dtype=float)
+        self.combos = []                # list of tuples, index = combination id
+        self._combo_index = {}
+        p, q = len(self.rows), len(self.cols)
+        self.moments = np.zeros((0, 6, p, q))       # n, Sx, Sy, Sxx, Syy, Sxy
+        n_levels = 0 if self.levels is None else len(self.levels)
+        self.joint = np.zeros((0, p, q, n_levels, n_levels), dtype=np.int32)
+
+    @classmethod
+    def from_frame(cls, df, rows, cols, dims=None, ranks=True):
+        """Build from ``df``; ``ranks=False`` skips the Spearman tables."""
+        if dims is None:
+            dims = [c for c in DEMOGRAPHIC_COLUMNS if c in df.columns]
+        levels = None
+        if ranks:
+            values = np.unique(np.concatenate([np.unique(item_values(df, c)) for c in list(rows) + list(cols)]))
+            values = values[~np.isnan(values)]
+            levels = values if len(values) <= MAX_LEVELS else None
+        stats = cls(rows, cols, dims, levels)
+        stats.update(df)
+        return stats
+
+    # ---- accumulation --------------------------------------------------
+    def _codes(self, df):
+        """Combination id per row, registering new combinations."""
+        if not self.dims:
+            keys = pd.Series([()] * len(df))
+        else:
+            # Missing demographics become None so they hash to one combination
+            parts = (df[d].astype(object).where(df[d].notna(), None) for d in self.dims)
+            keys = pd.Series(list(zip(*parts)))
+        new = [k for k in pd.unique(keys) if k not in self._combo_index]
+        for key in new:
+            self._combo_index[key] = len(self.combos)
+            self.combos.append(key)
+        if new:
+            grow = len(new)
+            self.moments = np.concatenate([self.moments, np.zeros((grow,) + self.moments.shape[1:])])
+            self.joint = np.concatenate(
+                [self.joint, np.zeros((grow,) + self.joint.shape[1:], dtype=self.joint.dtype)]
+            )
+        return keys.map(self._combo_index).to_numpy(dtype=np.int64)
+
+    def _level_index(self, values):
+        idx = np.searchsorted(self.levels, values)
+        idx = np.clip(idx, 0, len(self.levels) - 1)
+        known = ~np.isnan(values) & (self.levels[idx] == values)
+        return np.where(known, idx, -1)
+
+    def update(self, df):
+        """Add the responses in ``df`` to the running statistics.
+
+        Answer values outside the level grid fixed at build time still count
+        towards Pearson but are left out of the Spearman tables.
+        """
+        if not len(df):
+            return self
+        if len(df) > CHUNK_ROWS:
+            for start in range(0, len(df), CHUNK_ROWS):
+                self.update(df.iloc[start:start + CHUNK_ROWS])
+            return self
+        codes = self._codes(df)
+        X = np.column_stack([item_values(df, c) for c in self.rows])
+        Y = np.column_stack([item_values(df, c) for c in self.cols])
+        Mx, My = (~np.isnan(X)).astype(float), (~np.isnan(Y)).astype(float)
+        X0, Y0 = np.nan_to_num(X), np.nan_to_num(Y)
+
+        order = np.argsort(codes, kind="stable")
+        bounds = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(self.combos)))])
+        for g in range(len(self.combos)):
+            sel = order[bounds[g]:bounds[g + 1]]
+            if not len(sel):
+                continue
+            x, y, mx, my = X0[sel], Y0[sel], Mx[sel], My[sel]
+            self.moments[g] += np.stack([
+                mx.T @ my, x.T @ my, mx.T @ y, (x * x).T @ my, mx.T @ (y * y), x.T @ y,
+            ])
+
+        if self.levels is not None:
+            L = len(self.levels)
+            lx, ly = self._level_index(X), self._level_index(Y)
+            p, q = len(self.rows), len(self.cols)
+            size = len(self.combos) * p * q * L * L
+            flat = np.zeros(size, dtype=np.int64)
+            for i in range(p):
+                both = (lx[:, [i]] >= 0) & (ly >= 0)
+                bins = (((codes[:, None] * p + i) * q + np.arange(q)) * L + lx[:, [i]]) * L + ly
+                flat += np.bincount(bins[both], minlength=size)
+            self.joint += flat.reshape(self.joint.shape).astype(self.joint.dtype)
+        return self
+
+    # ---- queries -------------------------------------------------------
+    def _mask(self, where):
+        mask = np.ones(len(self.combos), dtype=bool)
+        for dim, value in (where or {}).items():
+            values = set(value) if isinstance(value, (list, tuple, set)) else {value}
+            pos = self.dims.index(dim)
+            mask &= np.array([combo[pos] in values for combo in self.combos], dtype=bool)
+        return mask
+
+    def _frame(self, r):
+        return pd.DataFrame(r, index=self.rows, columns=self.cols)
+
+    def totals(self, where=None):
+        """Summed moments (n, Sx, Sy, Sxx, Syy, Sxy), each rows x cols."""
+        return self.moments[self._mask(where)].sum(axis=0)
+
+    def pearson(self, where=None):
+        n, sx, sy, sxx, syy, sxy = self.totals(where)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = sxy - sx * sy / n
+            var_x = sxx - sx * sx / n
+            var_y = syy - sy * sy / n
+            r = cov / np.sqrt(var_x * var_y)
+        r[~np.isfinite(r) | (var_x <= 1e-12) | (var_y <= 1e-12)] = np.nan
+        return self._frame(np.clip(r, -1, 1))
+
+    def joint_counts(self, row, col, where=None):
+        """Respondents per (row answer, col answer) pair: levels x levels counts."""
+        if self.levels is None:
+            raise ValueError("joint tables are not kept for items with more than "
+                             f"{MAX_LEVELS} distinct answer values")
+        i, j = self.rows.index(row), self.cols.index(col)
+        table = self.joint[self._mask(where), i, j].sum(axis=0)
+        levels = pd.Index(self.levels)
+        return pd.DataFrame(table, index=levels.rename(row), columns=levels.rename(col))
+
+    def spearman(self, where=None):
+        if self.levels is None:
+            raise ValueError("Spearman tables are not kept for items with more than "
+                             f"{MAX_LEVELS} distinct answer values")
+        table = self.joint[self._mask(where)].sum(axis=0).astype(float)   # (p, q, L, L)
+        rx, ry = table.sum(axis=3), table.sum(axis=2)                      # (p, q, L)
+        n = rx.sum(axis=2, keepdims=True)
+        rank_x = np.cumsum(rx, axis=2) - rx + (rx + 1) / 2                 # average ranks
+        rank_y = np.cumsum(ry, axis=2) - ry + (ry + 1) / 2
+        mean = (n + 1) / 2
+        dx, dy = rank_x - mean, rank_y - mean
+        cov = np.einsum("pqab,pqa,pqb->pq", table, dx, dy)
+        var_x = (rx * dx * dx).sum(axis=2)
+        var_y = (ry * dy * dy).sum(axis=2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r = cov / np.sqrt(var_x * var_y)
+        r[~np.isfinite(r) | (var_x <= 1e-12) | (var_y <= 1e-12)] = np.nan
+        return self._frame(np.clip(r, -1, 1))
+
+
+def get_correlation_stats(name, rows, cols, columns=None):
+    """Correlation statistics for a rows x cols block of dataset ``name``, per data version."""
+    rows, cols = tuple(rows), tuple(cols)
+    return derived(
+        name, ("correlation", rows, cols),
+        lambda df: CorrelationStats.from_frame(df, rows, cols), columns,
+        # Sessions may still read the old statistics: update a copy
+        update=lambda stats, new: copy.deepcopy(stats).update(new),
+    )
@@ -0,0 +1,191 @@
+# ---------------------------------------------------------
+# Likert aggregate cube
+# ---------------------------------------------------------
+"""Materialized (demographic combination x item x level) counts.
+
+A survey with a few hundred thousand respondents still has only a few
+hundred distinct Age Group / Status / Gender / Race / Area Type
+combinations.  The cube is built once per data version; means, % agree,
+disagreement counts and any group-by over the demographic columns are
+then answered by summing cube slices, in time proportional to the number
+of cells rather than the number of respondents.
+
+Besides the level counts the cube keeps, per combination and item, the
+sum of answers and the number of answers, so means stay exact even for
+fractional values (Khalida's ``2.5``) that fall outside the 1-5 levels.
+"""
+import numpy as np
+import pandas as pd
+
+from survey.datasets import derived
+from survey.likert import (
+    DEMOGRAPHICS, LEVELS, LevelCounts, count_levels, disagreement_frame, item_values, likert_columns,
+)
+
+
+class LikertCube:
+    """Count cube over ``combos`` (one row per demographic combination)."""
+
+    def __init__(self, combos, items, counts, sums, answered, sizes):
+        self.combos = combos          # DataFrame, one row per combination
+        self.items = list(items)
+        self.counts = counts          # int32 (combos, items, levels)
+        self.sums = sums              # float64 (combos, items)
+        self.answered = answered      # int32 (combos, items) non-missing answers
+        self.sizes = sizes            # int32 (combos,) respondents
+
+    @classmethod
+    def from_frame(cls, df, items=None, dims=None):
+        items = likert_columns(df.columns) if items is None else list(items)
+        if dims is None:
+            # Fatin's export calls the Race column "Ethnicity"
+            dims = [c for c in DEMOGRAPHICS + ["Ethnicity"] if c in df.columns]
+
+        if dims:
+            grouped = df.groupby(dims, dropna=False, sort=True, observed=True)
+            codes = grouped.ngroup().to_numpy()
+            combos = grouped.size().index.to_frame(index=False)
+        else:
+            codes = np.zeros(len(df), dtype=np.int64)
+            combos = pd.DataFrame(index=range(1 if len(df) else 0))
+        n = len(combos)
+
+        counts = count_levels(df, items, codes, n).astype(np.int32)
+        sums = np.empty((n, len(items)))
+        answered = np.empty((n, len(items)), dtype=np.int32)
+        for j, col in enumerate(items):
+            values = item_values(df, col)
+            ok = ~np.isnan(values)
+            sums[:, j] = np.bincount(codes[ok], weights=values[ok], minlength=n)
+            answered[:, j] = np.bincount(codes[ok], minlength=n)
+        sizes = np.bincount(codes, minlength=n).astype(np.int32)
+        return cls(combos, items, counts, sums, answered, sizes)
+
+    @classmethod
+    def concat(cls, cubes):
+        """Merge cubes over the same items (e.g. built from chunks of one file)."""
+        cubes = list(cubes)
+        items = cubes[0].items
+        if any(c.items != items for c in cubes):
+            raise ValueError("cubes must cover the same items")
+        combos = pd.concat([c.combos for c in cubes], ignore_index=True)
+        dims = list(combos.columns)
+        if dims:
+            grouped = combos.astype(object).groupby(dims, dropna=False, sort=True)
+            codes = grouped.ngroup().to_numpy()
+            merged = grouped.size().index.to_frame(index=False)
+        else:
+            codes = np.zeros(len(combos), dtype=np.int64)
+            merged = pd.DataFrame(index=range(1))
+
+        def add(attr):
+            stacked = np.concatenate([getattr(c, attr) for c in cubes])
+            out = np.zeros((len(merged),) + stacked.shape[1:], dtype=stacked.dtype)
+            np.add.at(out, codes, stacked)
+            return out
+
+        return cls(merged, items, add("counts"), add("sums"), add("answered"), add("sizes"))
+
+    @property
+    def dims(self):
+        return list(self.combos.columns)
+
+    @property
+    def nbytes(self):
+        return self.counts.nbytes + self.sums.nbytes + self.answered.nbytes + self.sizes.nbytes
+
+    # ---- slicing -------------------------------------------------------
+    def _mask(self, where):
+        mask = np.ones(len(self.combos), dtype=bool)
+        for dim, value in (where or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            mask &= self.combos[dim].isin(values).to_numpy()
+        return mask
+
+    def _item_index(self, items):
+        if items is None:
+            return slice(None), self.items
+        items = [items] if isinstance(items, str) else list(items)
+        return [self.items.index(col) for col in items], items
+
+    def _reduce(self, array, by, mask):
+        """Sum ``array`` (first axis = combos) over selected combos, per ``by`` group."""
+        if by is None:
+            return pd.Index([None]), array[mask].sum(axis=0, keepdims=True)
+        codes, groups = pd.factorize(self.combos[by], sort=True)
+        keep = mask & (codes >= 0)
+        out = np.zeros((len(groups),) + array.shape[1:], dtype=array.dtype)
+        np.add.at(out, codes[keep], array[keep])
+        return groups, out
+
+    def _frame(self, groups, values, items, by):
+        if by is None:
+            return pd.Series(values[0], index=items)
+        return pd.DataFrame(values, index=pd.Index(groups, name=by), columns=items)
+
+    # ---- metrics -------------------------------------------------------
+    def size(self, where=None, by=None):
+        """Respondent count (Series per group when ``by`` is given)."""
+        groups, sizes = self._reduce(self.sizes, by, self._mask(where))
+        if by is None:
+            return int(sizes[0])
+        return pd.Series(sizes, index=pd.Index(groups, name=by))
+
+    def level_counts(self, items=None, by=None, where=None):
+        idx, items = self._item_index(items)
+        groups, counts = self._reduce(self.counts[:, idx, :], by, self._mask(where))
+        return LevelCounts(groups, items, counts.astype(np.int64))
+
+    def mean(self, items=None, by=None, where=None):
+        """Mean answer per item, skipping missing answers (as ``DataFrame.mean``)."""
+        idx, items = self._item_index(items)
+        mask = self._mask(where)
+        groups, sums = self._reduce(self.sums[:, idx], by, mask)
+        _, answered = self._reduce(self.answered[:, idx], by, mask)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / answered
+        return self._frame(groups, means, items, by)
+
+    def percent(self, levels, items=None, by=None, where=None):
+        """% of respondents answering one of ``levels`` (missing answers count as not)."""
+        idx, items = self._item_index(items)
+        mask = self._mask(where)
+        level_idx = [LEVELS.index(level) for level in levels]
+        hits = self.counts[:, idx, :][:, :, level_idx].sum(axis=2)
+        groups, hits = self._reduce(hits, by, mask)
+        _, sizes = self._reduce(self.sizes, by, mask)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            pct = hits / sizes[:, None] * 100
+        return self._frame(groups, pct, items, by)
+
+    def percent_agree(self, items=None, by=None, where=None):
+        return self.percent((4, 5), items, by, where)
+
+    def distribution(self, item, by=None, where=None, normalize=True):
+        """Level frequencies of one item (rows: groups, columns: Likert levels)."""
+        result = self.level_counts([item], by, where)
+        table = result.counts[:, 0, :].astype(float if normalize else np.int64)
+        if normalize:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                table = table / table.sum(axis=1, keepdims=True)
+        frame = pd.DataFrame(table, columns=list(LEVELS))
+        if by is None:
+            return frame.iloc[0]
+        frame.index = pd.Index(result.groups, name=by)
+        return frame
+
+    def disagreement_table(self, items=None, by=None, where=None, other="Other"):
+        return disagreement_frame(self.level_counts(items, by, where), by, other)
+
+
+def get_cube(name, columns=None):
+    """Cube for dataset ``name``, rebuilt only when its data version changes.
+
+    ``columns`` limits the columns loaded to build it (items + demographics).
+    """
+    return derived(name, "cube", LikertCube.from_frame, columns, update=_extend)
+
+
+def _extend(cube, rows):
+    """``cube`` plus new responses, without recounting the old ones."""
+    return LikertCube.concat([cube, LikertCube.from_frame(rows, cube.items, cube.dims)])
@@ -0,0 +1,418 @@
+# ---------------------------------------------------------
+# Data access layer shared by every dashboard page
+# ---------------------------------------------------------
+"""One place that knows where each survey dataset lives.
+
+Every source resolves local-first (the CSVs committed next to ``app.py``)
+and falls back to the GitHub / Google Sheets URL.  Each dataset is parsed
+once per data version and kept in this module, so all Streamlit sessions
+in the server process share the same frame; callers receive a shallow
+copy whose column buffers are shared and protected by pandas
+copy-on-write.  Local files are also kept as typed Parquet copies (see
+``survey.columnar``) so later cold starts skip CSV parsing, and
+respondent-level frames are served from copy-on-write memory maps shared by
+every server process (``survey.shared``).  Remote sources are read through
+``survey.fetch`` (disk snapshot, conditional GETs, offline fallback).
+
+The ``cleaned`` dataset is not read from a file: it is built from the raw
+form export by ``survey.cleaning`` and follows that export's version.  The
+committed ``cleaned_data.csv`` is only used when the export cannot be
+fetched or no longer matches the question dictionary.  While the form is
+collecting, a refresh only processes new submissions: the export is
+folded into an append log (``survey.incremental``), only the new rows are
+cleaned, and ``derived`` objects given an ``update`` function are updated
+with them instead of rebuilt.
+"""
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+from survey import columnar, fetch, incremental, ingest, perf, shared
+
+if int(pd.__version__.split(".")[0]) == 2:
+    # pandas 3 always copies on write; on 2.x it has to be switched on so a
+    # page that writes into its frame never touches the shared buffers.
+    pd.set_option("mode.copy_on_write", True)
+
+ROOT = Path(__file__).resolve().parent.parent
+GITHUB_RAW = "https://raw.githubusercontent.com/wannurizzatiwanabdazizktb-arch/SV-Project/refs/heads/main/"
+FORM_URL = "https://docs.google.com/spreadsheets/d/e/2PACX-1vS8nPPwgVKnGxpQLQFTH6EQLpO6l1l2BlEAdGqmb0Bq7FGQzViLwKbb78NMjJSA1-eHl-Ebq5Wl4LRU/pub?gid=745446698&single=true&output=csv"
+
+
+@dataclass(frozen=True)
+class Source:
+    name: str
+    filename: str = None
+    url: str = None
+    drop_columns: tuple = ()
+    typed: bool = True      # respondent-level data: normalized by survey.ingest
+    built_from: str = None  # raw dataset this one is cleaned from (survey.cleaning)
+    appends: bool = False   # export that grows by new Timestamped rows (survey.incremental)
+
+    @property
+    def path(self):
+        return ROOT / self.filename if self.filename else None
+
+    @property
+    def remote(self):
+        if self.url:
+            return self.url
+        return GITHUB_RAW + quote(self.filename)
+
+
+SOURCES = {
+    s.name: s
+    for s in (
+        # Raw form export: long question headers, in both languages
+        Source("form_responses", url=FORM_URL, typed=False, appends=True),
+        # Cleaned in-app from the export; the committed CSV is the fallback
+        Source("cleaned", "cleaned_data.csv", built_from="form_responses"),
+        Source("izzati", "cleaned_data (Izzati).csv"),
+        Source("fatin", "project_dataSV(Fatin).csv"),
+        Source("khalida", "traffic_survey(khalida).csv", drop_columns=("Unnamed: 0",)),
+        Source("ain_summary", "disagree_summary(Ain).csv", typed=False),
+    )
+}
+
+_lock = threading.Lock()
+_name_locks = {}
+_frames = {}        # (name, columns) -> (version, DataFrame)
+_generation = {}    # name -> refresh counter for remote-only sources
+_derived = {}       # (name, kind) -> (version, object built from the frame)
+_reports = {}       # name -> ingest.IngestReport of the last CSV parse
+_fallbacks = {}     # name -> why the last build used the committed file instead, or None
+_built = {}         # name -> (version of the raw dataset, frame built from it, build report)
+_published = {}     # name -> version pinned by the refresh scheduler (survey.scheduler)
+_recipes = {}       # derived key -> (build, update), to rebuild what sessions use
+_staging = threading.local()    # .stage: the Stage being prepared by this thread
+
+
+class Stage:
+    """Frames and derived objects for new data versions, prepared off the request path.
+
+    Inside ``with staging(stage):`` the calling thread sees ``versions`` as
+    the current data versions and everything it loads or builds goes into
+    the stage, along with the state of built datasets (cleaning report,
+    fallback); sessions keep being served the published versions until
+    ``publish(stage)`` installs the lot under one lock.  A stage that is
+    dropped instead changes nothing sessions see.
+    """
+
+    def __init__(self, versions):
+        self.versions = dict(versions)
+        self.frames = {}
+        self.derived = {}
+        self.built = {}
+        self.fallbacks = {}
+
+    def cache(self, cache):
+        """The stage's counterpart of one of the module-level caches."""
+        if cache is _frames:
+            return self.frames
+        if cache is _derived:
+            return self.derived
+        return self.built if cache is _built else self.fallbacks
+
+
+@contextmanager
+def staging(stage):
+    _staging.stage = stage
+    try:
+        yield stage
+    finally:
+        _staging.stage = None
+
+
+def _stage():
+    return getattr(_staging, "stage", None)
+
+
+def publish(stage):
+    """Make the staged versions current for every session at once."""
+    with _lock:
+        _frames.update(stage.frames)
+        _derived.update(stage.derived)
+        _built.update(stage.built)
+        _fallbacks.update(stage.fallbacks)
+        for name, version in stage.versions.items():
+            _published[name] = version
+
+
+def get_source(name):
+    try:
+        return SOURCES[name]
+    except KeyError:
+        raise KeyError(f"Unknown dataset {name!r}; expected one of {sorted(SOURCES)}") from None
+
+
+def resolve(name):
+    """Return the local path if the file exists, otherwise the remote URL."""
+    source = get_source(name)
+    if source.path is not None and source.path.exists():
+        return source.path
+    return source.remote
+
+
+def dataset_version(name):
+    """Token that changes whenever the underlying data changes.
+
+    Local files are versioned by modification time and size; remote sources
+    by how many times ``refresh`` has been called for them.  Built datasets
+    follow the version of the dataset they are built from.  While the
+    refresh scheduler runs, sessions get the version it last published.
+    """
+    stage = _stage()
+    if stage is not None and name in stage.versions:
+        return stage.versions[name]
+    source = get_source(name)
+    if source.built_from:
+        return f"from-{dataset_version(source.built_from)}-{_generation.get(name, 0)}"
+    published = _published.get(name)
+    if published is not None:
+        return published
+    return live_version(name)
+
+
+def live_version(name):
+    """Version of the data at the source right now (ignores what is published)."""
+    location = resolve(name)
+    if isinstance(location, Path):
+        return _file_version(location)
+    return f"remote-{_generation.get(name, 0)}"
+
+
+def _file_version(path):
+    stat = path.stat()
+    return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+
+def _read(source, location, version, columns):
+    if source.built_from:
+        return _build(source, version, columns)
+    if source.appends and not isinstance(location, Path):
+        df = incremental.ingest(source.name, version, _read_csv(location))
+        return df if columns is None else df[list(columns)]
+    local = isinstance(location, Path)
+    if local and source.typed:
+        # One copy-on-write mapped copy per file version, for every process
+        frame = shared.read(source.name, version, columns)
+        if frame is None:
+            frame = shared.share(source.name, version, _read_file(source, location, version, None))
+        return frame if columns is None else frame[list(columns)]
+    return _read_file(source, location, version, columns)
+
+
+def _read_file(source, location, version, columns):
+    local = isinstance(location, Path)
+    if local:
+        frame = columnar.read(source.name, version, columns)
+        if frame is not None:
+            return frame
+    if columns is not None and not (local and columnar.available()):
+        # No column store to fill: parse only the requested columns
+        frame = _read_csv(location, usecols=list(columns))
+        return _ingest(source, frame[list(columns)])
+    df = _read_csv(location)
+    if source.drop_columns:
+        df = df.drop(columns=list(source.drop_columns), errors="ignore")
+    df = _ingest(source, df)
+    if local:
+        columnar.write(source.name, version, df)
+    return df if columns is None else df[list(columns)]
+
+
+def _read_csv(location, **kwargs):
+    if isinstance(location, Path):
+        return pd.read_csv(location, **kwargs)
+    # The scheduler has just revalidated what it stages: no second request
+    max_age = fetch.REUSE_SECONDS if _stage() is not None else 0
+    return fetch.read_csv(location, max_age=max_age, **kwargs)
+
+
+def fetch_status(name):
+    """``fetch.FetchResult`` of the last download of ``name``, or None if it is read locally."""
+    location = resolve(name)
+    return None if isinstance(location, Path) else fetch.last_fetch(location)
+
+
+def _build(source, version, columns):
+    from survey import cleaning     # cleaning -> form -> datasets
+
+    base = source.built_from
+    try:
+        base_version = dataset_version(base)
+        raw = load_dataset(base)
+        last = _cached(_built, source.name)
+        appended = incremental.since(base, last[0], raw) if last else None
+        if appended is not None:
+            df, report = cleaning.extend(last[1], last[2], appended)    # only the new submissions
+        else:
+            df, report = cleaning.build(raw)
+    except (OSError, ValueError) as exc:    # export unreachable, or form.HeaderError
+        if source.path is None or not source.path.exists():
+            raise
+        _store(_fallbacks, source.name, exc)
+        _store(_built, source.name, None)
+        local = replace(source, built_from=None)
+        df = _read(local, source.path, _file_version(source.path), None)
+        incremental.mark(source.name, version, len(df), reset=True)
+        return df if columns is None else df[list(columns)]
+    _store(_fallbacks, source.name, None)
+    _store(_built, source.name, (base_version, df, report))
+    incremental.mark(source.name, version, len(df), reset=appended is None)
+    return df if columns is None else df[list(columns)]
+
+
+def build_fallback(name):
+    """Why ``name`` was last loaded from its committed file instead of built, or None."""
+    return _cached(_fallbacks, name)
+
+
+def build_report(name):
+    """Report of the build ``name`` is served from (e.g. ``cleaning.CleaningReport``), or None."""
+    built = _cached(_built, name)
+    return built[2] if built else None
+
+
+def _ingest(source, df):
+    if not source.typed:
+        return df
+    df, report = ingest.normalize(df, source.name)
+    _reports[source.name] = report
+    return df
+
+
+def ingest_report(name):
+    """Memory report of the compact-dtype ingest for ``name``.
+
+    Parses the raw source again if this process only read the columnar copy.
+    """
+    source = get_source(name)
+    if name not in _reports:
+        df = _read_csv(resolve(name))
+        if source.drop_columns:
+            df = df.drop(columns=list(source.drop_columns), errors="ignore")
+        _ingest(source, df)
+    return _reports.get(name)
+
+
+def _name_lock(name):
+    if _stage() is not None:
+        name = ("staged", name)     # never make a session wait for the scheduler
+    with _lock:
+        return _name_locks.setdefault(name, threading.Lock())
+
+
+def _cached(cache, key):
+    stage = _stage()
+    if stage is not None and key in stage.cache(cache):
+        return stage.cache(cache)[key]
+    return cache.get(key)
+
+
+def _store(cache, key, entry):
+    stage = _stage()
+    if stage is not None:
+        cache = stage.cache(cache)
+    cache[key] = entry
+
+
+def load_dataset(name, columns=None):
+    """Return the shared frame for ``name``, parsing it at most once per version.
+
+    ``columns`` projects the frame: only those columns are read from the
+    columnar copy (or the CSV), and each projection is cached separately.
+    """
+    source = get_source(name)
+    version = dataset_version(name)
+    columns = tuple(columns) if columns is not None else None
+    key = (name, columns)
+    cached = _cached(_frames, key)
+    if cached is None or cached[0] != version:
+        # One lock per dataset: concurrent sessions wait for the first
+        # download instead of all fetching the same CSV.
+        with _name_lock(name):
+            version = dataset_version(name)     # a new version may have been published meanwhile
+            cached = _cached(_frames, key)
+            if cached is None or cached[0] != version:
+                full = _cached(_frames, (name, None))
+                if columns is not None and full is not None and full[0] == version:
+                    frame = full[1][list(columns)]
+                else:
+                    with perf.span(f"read {name}"):
+                        frame = _read(source, resolve(name), version, columns)
+                cached = (version, frame)
+                _store(_frames, key, cached)
+    return cached[1].copy(deep=False)
+
+
+def derived(name, kind, build, columns=None, update=None):
+    """Cache ``build(frame)`` for dataset ``name`` until its data version changes.
+
+    Used for anything computed from a dataset that every session can share
+    (aggregate cube, filter index, ...).  ``kind`` names the derived object;
+    ``columns`` is passed through to ``load_dataset``.  When the new version
+    only appended rows (``survey.incremental``), ``update(obj, rows)``
+    replaces the rebuild; it must return the updated object and leave
+    ``obj`` untouched, since other sessions may still be reading it.
+    """
+    version = dataset_version(name)
+    key = (name, kind, tuple(columns) if columns is not None else None)
+    _recipes.setdefault(key, (build, update))
+    cached = _cached(_derived, key)
+    if cached is None or cached[0] != version:
+        with _name_lock(key):
+            version = dataset_version(name)
+            cached = _cached(_derived, key)
+            if cached is None or cached[0] != version:
+                label = kind[0] if isinstance(kind, tuple) else kind
+                frame = load_dataset(name, columns)
+                rows = incremental.since(name, cached[0], frame) if update and cached else None
+                if rows is not None and not len(rows):
+                    cached = (version, cached[1])
+                elif rows is not None:
+                    with perf.span(f"update {name} {label} +{len(rows)} rows"):
+                        cached = (version, update(cached[1], rows))
+                else:
+                    with perf.span(f"build {name} {label}"):
+                        cached = (version, build(frame))
+                _store(_derived, key, cached)
+    return cached[1]
+
+
+def rebuild(names):
+    """Load and build, for the current versions, everything sessions used of ``names``.
+
+    Run inside ``staging`` by the scheduler; returns the number of frames
+    and derived objects prepared.
+    """
+    names = set(names)
+    done = 0
+    for name, columns in [k for k in list(_frames) if k[0] in names]:
+        load_dataset(name, columns)
+        done += 1
+    for key, (build, update) in [(k, r) for k, r in list(_recipes.items()) if k[0] in names]:
+        name, kind, columns = key
+        derived(name, kind, build, columns, update)
+        done += 1
+    return done
+
+
+def refresh(name=None):
+    """Forget cached frames so the next ``load_dataset`` re-reads the source."""
+    names = [name] if name else list(SOURCES)
+    with _lock:
+        for n in names:
+            get_source(n)
+            _published.pop(n, None)
+            _generation[n] = _generation.get(n, 0) + 1
+            for key in [k for k in _frames if k[0] == n]:
+                _frames.pop(key, None)
+            if incremental.tracked(n):
+                continue        # derived objects are updated with the new rows on next use
+            for key in [k for k in _derived if k[0] == n]:
+                _derived.pop(key, None)
@@ -0,0 +1,169 @@
+# ---------------------------------------------------------
+# HTTP fetch layer: disk cache, conditional GETs, snapshots
+# ---------------------------------------------------------
+"""Remote CSVs (GitHub raw, the published Google Sheet) behind a disk cache.
+
+Every URL has one snapshot in ``CACHE_DIR``: the last good body plus its
+``ETag`` / ``Last-Modified``.  ``fetch`` revalidates the snapshot with a
+conditional GET, so an unchanged export costs a ``304`` and no download.
+Requests go through one pooled ``requests.Session`` (keep-alive, a couple
+of retries on 5xx) with a ``TIMEOUT``, so a slow origin cannot stall a
+rerun for longer than that.  When the origin is unreachable or errors, the
+last snapshot is served and marked stale; only a URL that was never
+fetched raises ``FetchError``.
+
+The layer only knows URLs, so it can be pointed at a local stand-in
+server (``python -m http.server`` serves ETag-less files with
+``Last-Modified``, which is enough to exercise revalidation); the tests
+in ``tests/test_fetch.py`` run one on localhost.
+"""
+import hashlib
+import io
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from survey import columnar
+
+CACHE_DIR = columnar.CACHE_DIR / "http"
+TIMEOUT = (5, 30)           # connect, read seconds
+REUSE_SECONDS = 10          # staged loads read a snapshot confirmed this recently as it is
+RETRIES = 2
+POOL_SIZE = 8
+
+_session = None
+_session_lock = threading.Lock()
+_url_locks = {}
+_status = {}        # url -> FetchResult of the last fetch
+
+
+class FetchError(OSError):
+    """The origin failed and there is no snapshot to fall back to."""
+
+
+@dataclass
+class FetchResult:
+    url: str
+    path: Path                  # snapshot body on disk (None if it could not be written)
+    status: str                 # "downloaded", "not-modified" or "stale"
+    fetched_at: float           # when the snapshot was last confirmed by the origin
+    seconds: float = 0.0
+    error: str = None           # why the snapshot is stale
+    content: bytes = field(default=None, repr=False)    # body kept in memory when path is None
+
+    @property
+    def stale(self):
+        return self.status == "stale"
+
+    def __str__(self):
+        age = time.strftime("%Y-%m-%d %H:%M", time.localtime(self.fetched_at))
+        text = f"{self.status} in {self.seconds * 1000:.0f} ms (snapshot of {age})"
+        return f"{text}: {self.error}" if self.error else text
+
+
+def session():
+    """The process-wide pooled session."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            # No retry after a read timeout: a slow origin costs one TIMEOUT, not three
+            retry = Retry(total=RETRIES, read=0, backoff_factor=0.3,
+                          status_forcelist=(502, 503, 504), allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+            _session = requests.Session()
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _paths(url):
+    key = hashlib.sha256(url.encode("utf-8")).hexdigest()[:24]
+    return CACHE_DIR / f"{key}.body", CACHE_DIR / f"{key}.json"
+
+
+def _meta(meta_path):
+    try:
+        return json.loads(meta_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, data):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def _url_lock(url):
+    with _session_lock:
+        return _url_locks.setdefault(url, threading.Lock())
+
+
+def fetch(url, timeout=TIMEOUT, max_age=0):
+    """Revalidate (or download) ``url`` and return its ``FetchResult``.
+
+    A fetch confirmed by the origin less than ``max_age`` seconds ago is
+    returned as it is (e.g. the refresh scheduler's check, then its load).
+    """
+    import requests
+
+    body, meta_path = _paths(url)
+    with _url_lock(url):
+        last = _status.get(url)
+        if max_age and last is not None and not last.stale and time.time() - last.fetched_at < max_age:
+            return last
+        meta = _meta(meta_path) if body.exists() else None
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        start = time.perf_counter()
+        try:
+            response = session().get(url, headers=headers, timeout=timeout)
+            if response.status_code != 304:
+                response.raise_for_status()
+        except requests.RequestException as exc:
+            if meta is None:
+                raise FetchError(f"{url}: {exc}") from exc
+            result = FetchResult(url, body, "stale", meta["fetched_at"],
+                                 time.perf_counter() - start, error=str(exc))
+        else:
+            now = time.time()
+            result = FetchResult(url, body, "not-modified", now, time.perf_counter() - start)
+            if response.status_code != 304:
+                result.status = "downloaded"
+                meta = {"url": url, "etag": response.headers.get("ETag"),
+                        "last_modified": response.headers.get("Last-Modified")}
+            meta["fetched_at"] = now
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                if result.status == "downloaded":
+                    _write(body, response.content)
+                _write(meta_path, json.dumps(meta).encode("utf-8"))
+            except OSError:     # read-only deployment: serve this download, no snapshot
+                if result.status == "downloaded":
+                    result.path, result.content = None, response.content
+        _status[url] = result
+        return result
+
+
+def read_csv(url, max_age=0, **kwargs):
+    """``pd.read_csv`` of ``url`` through the snapshot cache."""
+    result = fetch(url, max_age=max_age)
+    source = result.path if result.path is not None else io.BytesIO(result.content)
+    return pd.read_csv(source, **kwargs)
+
+
+def last_fetch(url):
+    """``FetchResult`` of the last fetch of ``url`` in this process, or None."""
+    return _status.get(url)
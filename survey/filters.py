@@ -0,0 +1,68 @@
+# ---------------------------------------------------------
+# Bitmap-indexed categorical filters
+# ---------------------------------------------------------
+"""Precomputed bitmaps for the sidebar-style demographic filters.
+
+For every value of every indexed column the index keeps a packed bitmap
+(one bit per respondent, ``np.packbits``).  A filter combination is the
+bitwise AND of a few bitmaps, so a widget change costs n/8 bytes of work
+per active filter and never copies the frame: only the matching rows are
+gathered, and with no active filter the shared frame itself is returned.
+The index is built once per data version and shared by every session.
+"""
+import numpy as np
+import pandas as pd
+
+from survey.datasets import derived
+
+ALL = "All"
+
+
+class FilterIndex:
+    def __init__(self, df, columns):
+        self.frame = df
+        self.n_rows = len(df)
+        self.bitmaps = {}
+        self.options = {}
+        for col in columns:
+            codes, uniques = pd.factorize(df[col], sort=True)
+            bitmaps = {}
+            for i, value in enumerate(uniques):
+                bitmaps[value] = np.packbits(codes == i)
+            self.bitmaps[col] = bitmaps
+            self.options[col] = list(uniques)
+
+    def rows(self, where):
+        """Row positions matching every ``{column: value}`` filter ("All" = no filter)."""
+        bits = None
+        for col, value in where.items():
+            if value == ALL or value is None:
+                continue
+            bitmap = self.bitmaps[col].get(value)
+            if bitmap is None:
+                return np.empty(0, dtype=np.int64)
+            bits = bitmap.copy() if bits is None else np.bitwise_and(bits, bitmap, out=bits)
+        if bits is None:
+            return None
+        return np.flatnonzero(np.unpackbits(bits, count=self.n_rows))
+
+    def count(self, where):
+        rows = self.rows(where)
+        return self.n_rows if rows is None else len(rows)
+
+    def view(self, where, columns=None):
+        """Filtered frame; only the selected rows (and ``columns``) are gathered."""
+        frame = self.frame if columns is None else self.frame[columns]
+        rows = self.rows(where)
+        if rows is None:
+            return frame
+        return frame.take(rows)
+
+
+def get_filter_index(name, columns, projection=None):
+    """Filter index over ``columns`` of dataset ``name``, shared per data version.
+
+    ``projection`` is the column set loaded for the filtered views.
+    """
+    columns = tuple(columns)
+    return derived(name, ("filters",) + columns, lambda df: FilterIndex(df, columns), projection)
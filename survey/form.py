@@ -0,0 +1,229 @@
+# ---------------------------------------------------------
+# Google Form export: bilingual halves -> one canonical frame
+# ---------------------------------------------------------
+"""Unify the English and Malay halves of the raw form export.
+
+The form asks every question twice, once per language, so each response
+fills one half of the export and leaves the other empty.  ``unify`` maps
+both halves onto the canonical column names used by ``cleaned_data.csv``
+and coalesces them in one vectorized pass:
+
+* columns are matched by ``QUESTIONS``, a table of the full question text
+  in each language, not by position or keyword.  Header and question are
+  compared after normalisation (case, punctuation, spacing and pandas'
+  ``.1`` suffix for repeated headers), with a small tolerance for typos.
+  A header that matches more than one question, or a question that
+  matches no header, raises ``HeaderError`` naming them, instead of
+  silently shifting or swapping columns.  Headers that match no question
+  (``Timestamp``, ``Score``, the language question) are left out;
+* Malay answers are translated to the English codes (``VALUE_PATTERNS``),
+  Likert answers are coded 1-5;
+* the halves are coalesced column by column, and a ``Language`` column
+  records which half each respondent used.
+"""
+import re
+import unicodedata
+from difflib import get_close_matches
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from survey import incremental
+from survey.datasets import derived
+
+LANGUAGES = ("English", "Malay")
+META_COLUMNS = ["Timestamp"]
+# The export's columns that are not questions, left out of header errors
+OTHER_HEADERS = ["Timestamp", "Score", "What language do you prefer? Apakah bahasa pilihan anda?"]
+
+# canonical name -> (English question, Malay question), in form order.
+# The wording is the one the original fixed column mapping recorded for
+# each position of the export.  "Status" reads the same in both languages;
+# its two headers are told apart by order, English first as exported.
+QUESTIONS = {
+    "Age Group": ("Age Group", "Kumpulan Umur"),
+    "Status": ("Status", "Status"),
+    "Gender": ("Gender", "Jantina"),
+    "Race": ("Race", "Bangsa"),
+    "Area Type": ("Area Type", "Jenis Kawasan"),
+    "Rainy Weather Factor": ("Rainy Weather Factor", "Faktor Cuaca Hujan"),
+    "Increasing Population Factor": ("Increasing Population Factor", "Faktor Peningkatan Populasi"),
+    "Undisciplined Driver Factor": ("Undisciplined Driver Factor", "Faktor Pemandu Tidak Berdisiplin"),
+    "Damaged Road Factor": ("Damaged Road Factor", "Faktor Kerosakan Jalan"),
+    "Students Not Sharing Vehicles": ("Students Not Sharing Vehicles", "Faktor Pelajar Tidak Berkongsi Kenderaan"),
+    "Leaving Work Late Factor": ("Leaving Work Late Factor", "Faktor Bertolak Lewat ke Tempat Kerja"),
+    "Narrow Road Factor": ("Narrow Road Factor", "Faktor Jalan Sempit"),
+    "Single Gate Factor": ("Single Gate Factor", "Faktor Satu Pintu Masuk/Keluar"),
+    "Lack of Pedestrian Bridge Factor": ("Lack of Pedestrian Bridge Factor", "Faktor Kekurangan Jejambat Pejalan Kaki"),
+    "Lack of Parking Space Factor": ("Lack of Parking Space Factor", "Faktor Kekurangan Ruang Parkir"),
+    "Late Drop-off/Pick-up Factor": ("Late Drop-off/Pick-up Factor", "Faktor Ibu Bapa Lewat Hantar/Ambil Anak"),
+    "Construction/Roadworks Factor": ("Construction/Roadworks Factor", "Faktor Pembinaan / Kerja Jalan"),
+    "Unintended Road Accidents Effect": ("Unintended Road Accidents Effect", "Kesan Kemalangan Jalan Raya"),
+    "Time Wastage Effect": ("Time Wastage Effect", "Kesan Pembaziran Masa"),
+    "Pressure on Road Users Effect": ("Pressure on Road Users Effect", "Kesan Tekanan pada Pengguna Jalan"),
+    "Students Late to School Effect": ("Students Late to School Effect", "Kesan Pelajar Lewat ke Sekolah"),
+    "Environmental Pollution Effect": ("Environmental Pollution Effect", "Kesan Pencemaran Alam Sekitar"),
+    "Fuel Wastage Effect": ("Fuel Wastage Effect", "Kesan Pembaziran Bahan Api"),
+    "Pedestrian Bridge Step": ("Pedestrian Bridge Step", "Langkah Jejambat Pejalan Kaki"),
+    "Widening Road Step": ("Widening Road Step", "Langkah Melebarkan Jalan"),
+    "Vehicle Sharing Step": ("Vehicle Sharing Step", "Langkah Berkongsi Kenderaan"),
+    "Two Gates Step": ("Two Gates Step", "Langkah Dua Pintu Masuk/Keluar"),
+    "Arrive Early Step": ("Arrive Early Step", "Langkah Tiba Awal ke Sekolah"),
+    "Traffic Officers Step": ("Traffic Officers Step", "Langkah Menempatkan Pegawai Trafik"),
+    "Special Drop-off Area Step": ("Special Drop-off Area Step", "Langkah Kawasan Khas Hantar/Tunggu Anak"),
+}
+# Normalised texts at least this similar (difflib ratio) still match
+NEAR = 0.9
+DEMOGRAPHIC_FIELDS = ["Age Group", "Status", "Gender", "Race", "Area Type"]
+LIKERT_FIELDS = [name for name in QUESTIONS if name not in DEMOGRAPHIC_FIELDS]
+
+# Malay answer -> English code, first matching pattern wins.  Values that
+# are already English codes, or match nothing, are kept as they are.
+VALUE_PATTERNS = {
+    "Age Group": [
+        (r"bawah|kurang", "Below 18 years old"),
+        (r"18\s*[-–]\s*25", "18 – 25 years old"),
+        (r"26\s*[-–]\s*35", "26 – 35 years old"),
+        (r"36\s*[-–]\s*45", "36 – 45 years old"),
+        (r"46\s*[-–]\s*55", "46 – 55 years old"),
+        (r"atas|lebih", "Above 55 years old"),
+    ],
+    "Status": [
+        (r"universiti", "University Student"),
+        (r"pelajar|murid", "Student ( Primary / Secondary)"),
+        (r"ibu|bapa|penjaga", "Parents"),
+        (r"guru|cikgu", "Teacher"),
+        (r"penduduk|pengguna", "Resident / Road User"),
+    ],
+    "Gender": [(r"perempuan|wanita", "Female"), (r"lelaki", "Male")],
+    "Race": [(r"melayu", "Malay"), (r"cina", "Chinese"), (r"india", "Indian"), (r"lain", "Others")],
+    "Area Type": [
+        (r"luar bandar", "Rural areas"),
+        (r"pinggir", "Suburban areas"),
+        (r"bandar", "Urban areas"),
+    ],
+}
+
+
+class HeaderError(ValueError):
+    """The export's headers do not match the question dictionary."""
+
+
+def normalise(text):
+    """Lower-case words of ``text``, without punctuation or pandas' ``.1`` suffix."""
+    text = unicodedata.normalize("NFKC", str(text))
+    text = re.sub(r"\.\d+$", "", text.strip())
+    return " ".join(re.findall(r"[^\W_]+", text.lower()))
+
+
+def _questions():
+    """``{normalised text: [(language, canonical), ...]}`` for every question."""
+    table = {}
+    for name, texts in QUESTIONS.items():
+        for language, text in zip(LANGUAGES, texts):
+            table.setdefault(normalise(text), []).append((language, name))
+    return table
+
+
+def match_headers(columns):
+    """``{language: {column position: canonical}}`` for the raw export ``columns``.
+
+    Positions rather than names, because both halves may share a header
+    (e.g. "Status") and a frame built from the sheet keeps duplicates.
+    """
+    return _match(tuple(str(c) for c in columns))
+
+
+@lru_cache(maxsize=16)
+def _match(columns):
+    table = _questions()
+    hits = {}       # normalised question text -> header positions
+    unmatched, problems = [], []
+    for pos, header in enumerate(columns):
+        text = normalise(header)
+        found = [text] if text in table else get_close_matches(text, table, n=2, cutoff=NEAR)
+        if not found:
+            unmatched.append(header)
+        elif len({name for t in found for _, name in table[t]}) > 1:
+            names = ", ".join(repr(name) for t in found for _, name in table[t])
+            problems.append(f"header {header!r} matches more than one question: {names}")
+        else:
+            hits.setdefault(found[0], []).append(pos)
+
+    mapping = {language: {} for language in LANGUAGES}
+    for text, questions in table.items():
+        positions = hits.get(text, [])
+        if len(positions) < len(questions):
+            problems.extend(f"no header for {language} {name!r}" for language, name in questions[len(positions):])
+            continue
+        if len(positions) > len(questions):
+            headers = ", ".join(repr(columns[p]) for p in positions)
+            problems.append(f"question {questions[0][1]!r} matches more than one header: {headers}")
+            continue
+        # Questions worded alike in both languages are assigned in export order
+        for pos, (language, name) in zip(positions, questions):
+            mapping[language][pos] = name
+    if problems:
+        other = {normalise(h) for h in OTHER_HEADERS}
+        unmatched = [h for h in unmatched if normalise(h) not in other]
+        if unmatched:
+            problems.append("headers matching no question: " + ", ".join(map(repr, unmatched)))
+        raise HeaderError("; ".join(problems))
+    return mapping
+
+
+def _translate(series, patterns):
+    """Map answers to English codes, working on the distinct values only."""
+    codes, uniques = pd.factorize(series)
+    canonical = {code for _, code in patterns}
+    translated = []
+    for value in uniques:
+        text = str(value).strip()
+        if text not in canonical:
+            lowered = text.lower()
+            text = next((code for pattern, code in patterns if re.search(pattern, lowered)), text)
+        translated.append(text)
+    out = np.array(translated + [None], dtype=object)[codes]     # code -1 (missing) -> None
+    return pd.Series(out, index=series.index)
+
+
+def _likert(series):
+    """Likert answers as 1-5 floats, parsing each distinct answer once."""
+    if pd.api.types.is_numeric_dtype(series):
+        return series.astype(float)
+    codes, uniques = pd.factorize(series)
+    # Text answers such as "5 - Strongly agree" / "5 - Sangat setuju"
+    scores = [float(m.group(1)) if (m := re.match(r"\s*([1-5])", str(v))) else np.nan for v in uniques]
+    return pd.Series(np.array(scores + [np.nan])[codes], index=series.index)
+
+
+def unify(df):
+    """One canonical frame (one row per response) from the raw bilingual export."""
+    mapping = match_headers(list(df.columns))
+    halves = {}
+    for language, columns in mapping.items():
+        half = df.iloc[:, list(columns)].set_axis(list(columns.values()), axis=1)
+        for name in LIKERT_FIELDS:
+            half[name] = _likert(half[name])
+        if language != "English":
+            for name, patterns in VALUE_PATTERNS.items():
+                half[name] = _translate(half[name], patterns)
+        halves[language] = half
+
+    english, malay = halves["English"], halves["Malay"]
+    answered_en = english.notna().any(axis=1).to_numpy()
+    answered_my = malay.notna().any(axis=1).to_numpy()
+    unified = english.where(english.notna(), malay)
+    meta = [c for c in META_COLUMNS if c in df.columns]
+    unified = pd.concat([df[meta], unified], axis=1)
+    unified["Language"] = np.where(answered_en, "English", "Malay")
+    return unified[answered_en | answered_my].reset_index(drop=True)
+
+
+def get_responses():
+    """The unified form responses, shared per data version."""
+    return derived(
+        "form_responses", "unified", unify,
+        update=lambda unified, rows: incremental.append_rows(unified, unify(rows)),
+    )
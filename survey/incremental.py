@@ -0,0 +1,248 @@
+# ---------------------------------------------------------
+# Incremental ingestion of the live form export
+# ---------------------------------------------------------
+"""Append only new submissions while the form is collecting.
+
+The published sheet can only be downloaded whole, but between two
+refreshes almost every row is already known.  For each append-only source
+an ``AppendLog`` remembers
+
+* the high-water mark (HWM): the latest ``Timestamp`` seen,
+* how many rows are at or before it, and
+* a content hash of those rows (the wrapping sum of their row hashes, so
+  it is extended by adding the hashes of appended rows).
+
+A new export is checked against the log with one pass over the Timestamp
+column and one vectorized hash of the rows at or before the HWM, which is
+far cheaper than cleaning and aggregating them again.  If the same rows
+are still there, the rows after the HWM are the new submissions and only
+they are appended.  Anything else (a response edited, whether or not
+Google moved it to the edit time; a row deleted; headers changed;
+unparseable timestamps) resets the log and the export is taken whole,
+once.  Ingests of one source are serialized by a per-log lock, since a
+session and the refresh scheduler may fold exports in at the same time.
+
+The log is persisted as Parquet parts in ``.survey_cache/<name>-log/`` so
+a restarted server also appends instead of starting over.  Every dataset
+version records its row count (``mark``), so ``since`` returns exactly the
+rows appended after any earlier version.  ``survey.datasets.derived`` uses
+that to update aggregates (``LikertCube.concat``,
+``CorrelationStats.update``, ...) with the new rows instead of rebuilding
+them, so refresh cost follows the number of new responses.
+"""
+import json
+import shutil
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from survey import columnar
+
+TIMESTAMP = "Timestamp"
+# Google writes the timestamp in the sheet's locale; the first format that
+# parses every value is used, and kept for as long as it keeps working.
+TIMESTAMP_FORMATS = ("%d/%m/%Y %H:%M:%S", "%m/%d/%Y %H:%M:%S", "%Y-%m-%d %H:%M:%S")
+FORMAT = 2      # bump when the stored log layout changes
+
+_lock = threading.Lock()
+_log_locks = {}     # name -> lock held while an export is folded into its log
+_logs = {}      # name -> AppendLog
+_ends = {}      # name -> {version: rows in that version}; cleared when the rows are replaced
+
+
+@dataclass
+class AppendLog:
+    headers: list
+    time_format: str
+    frame: pd.DataFrame
+    hwm: pd.Timestamp
+    upto_hwm: int               # rows at or before the HWM
+    digest: int                 # content hash of those rows (prefix_hash)
+    parts: int = 0              # Parquet parts written
+    appended: list = field(default_factory=list)    # rows added by each ingest (last few)
+
+
+def parse_timestamps(series, formats=TIMESTAMP_FORMATS):
+    """``(datetimes, format)`` for the first format that parses every value, else ``(None, None)``."""
+    for fmt in formats:
+        parsed = pd.to_datetime(series, format=fmt, errors="coerce")
+        if not parsed.isna().any():
+            return parsed, fmt
+    return None, None
+
+
+def prefix_hash(df):
+    """Order-independent content hash of the rows of ``df``: the wrapping sum of row hashes."""
+    return int(pd.util.hash_pandas_object(df, index=False).to_numpy().sum(dtype=np.uint64))
+
+
+def _combine(*digests):
+    return int(np.array(digests, dtype=np.uint64).sum(dtype=np.uint64))
+
+
+def append_rows(frame, rows):
+    """``frame`` followed by ``rows``, keeping categoricals categorical."""
+    if not len(rows):
+        return frame
+    if not len(frame):
+        return rows.reset_index(drop=True)
+    out = pd.concat([frame, rows], ignore_index=True)
+    for i in range(frame.shape[1]):     # by position: headers may repeat
+        old, new = frame.iloc[:, i], rows.iloc[:, i]
+        if isinstance(old.dtype, pd.CategoricalDtype) and not isinstance(out.iloc[:, i].dtype, pd.CategoricalDtype):
+            # Different category sets: merge them instead of falling back to object
+            out.isetitem(i, pd.Categorical(union_categoricals([old, new], ignore_order=True)))
+    return out
+
+
+# ---- versions ------------------------------------------------------------------
+def mark(name, version, rows, reset=False):
+    """Record that ``version`` of ``name`` holds ``rows`` rows (``reset``: not an append)."""
+    with _lock:
+        ends = _ends.setdefault(name, {})
+        if reset:
+            ends.clear()
+        ends[version] = rows
+
+
+def since(name, version, frame):
+    """Rows of ``frame`` appended after ``version`` of ``name``, or None if unknown."""
+    with _lock:
+        start = _ends.get(name, {}).get(version)
+    if start is None or start > len(frame):
+        return None
+    return frame.iloc[start:]
+
+
+def tracked(name):
+    with _lock:
+        return bool(_ends.get(name))
+
+
+# ---- append log ----------------------------------------------------------------
+def _log_dir(name):
+    return columnar.CACHE_DIR / f"{name}-log"
+
+
+def _positional(df):
+    # Both language halves can share a header: store positional names
+    return df.set_axis([f"c{i}" for i in range(df.shape[1])], axis=1)
+
+
+def _new_log(headers, time_format, frame, times):
+    return AppendLog(
+        headers=headers, time_format=time_format, frame=frame, hwm=times.max(),
+        upto_hwm=len(frame), digest=prefix_hash(frame),
+    )
+
+
+def _save(name, log, rows, reset):
+    """Write ``rows`` as the next Parquet part (all parts again after a reset)."""
+    if not columnar.available():
+        return
+    folder = _log_dir(name)
+    try:
+        if reset:
+            shutil.rmtree(folder, ignore_errors=True)
+            log.parts = 0
+        folder.mkdir(parents=True, exist_ok=True)
+        if len(rows):
+            _positional(rows).to_parquet(folder / f"part-{log.parts:05d}.parquet", index=False)
+            log.parts += 1
+        state = {
+            "format": FORMAT, "headers": log.headers, "time_format": log.time_format,
+            "hwm": log.hwm.isoformat(), "upto_hwm": log.upto_hwm, "digest": str(log.digest),
+            "parts": log.parts,
+        }
+        tmp = folder / "state.json.tmp"
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        tmp.replace(folder / "state.json")
+    except (OSError, ValueError):
+        shutil.rmtree(folder, ignore_errors=True)     # the log on disk is only an accelerator
+
+
+def _load(name):
+    folder = _log_dir(name)
+    try:
+        state = json.loads((folder / "state.json").read_text(encoding="utf-8"))
+        if state["format"] != FORMAT or not columnar.available():
+            return None
+        parts = [pd.read_parquet(folder / f"part-{i:05d}.parquet") for i in range(state["parts"])]
+    except (OSError, ValueError, KeyError):
+        return None
+    frame = pd.concat(parts, ignore_index=True).set_axis(state["headers"], axis=1)
+    return AppendLog(
+        headers=state["headers"], time_format=state["time_format"], frame=frame,
+        hwm=pd.Timestamp(state["hwm"]), upto_hwm=state["upto_hwm"], digest=int(state["digest"]),
+        parts=state["parts"],
+    )
+
+
+def _new_rows(log, export):
+    """Rows of ``export`` after the log's HWM, or None if the export is not an append."""
+    if log is None or list(export.columns) != log.headers or TIMESTAMP not in export.columns:
+        return None
+    times, _ = parse_timestamps(export[TIMESTAMP], (log.time_format,))
+    if times is None:
+        return None
+    known = (times <= log.hwm).to_numpy()
+    if known.sum() != log.upto_hwm:
+        return None
+    if prefix_hash(export[known]) != log.digest:
+        return None     # a row at or before the HWM was edited in place
+    return export[~known], times[~known]
+
+
+def ingest(name, version, export):
+    """Fold ``export`` (the whole sheet, as parsed) into the log of ``name``.
+
+    Returns every row so far; ``mark`` records ``version``.
+    """
+    with _lock:
+        lock = _log_locks.setdefault(name, threading.Lock())
+    with lock:
+        return _ingest(name, version, export)
+
+
+def _ingest(name, version, export):
+    headers = list(export.columns)
+    with _lock:
+        log = _logs.get(name)
+    if log is None:
+        log = _load(name)
+    found = _new_rows(log, export)
+    if found is not None:
+        rows, times = found
+        reset = False
+        if len(rows):
+            log.frame = append_rows(log.frame, rows)
+            log.hwm = times.max()
+            log.upto_hwm = len(log.frame)
+            log.digest = _combine(log.digest, prefix_hash(rows))
+        log.appended = (log.appended + [len(rows)])[-10:]
+    else:
+        rows, reset = export.reset_index(drop=True), True
+        times, fmt = parse_timestamps(export[TIMESTAMP]) if TIMESTAMP in export.columns else (None, None)
+        if times is None or not len(export):
+            # Cannot order the rows: no log, the export is always taken whole
+            with _lock:
+                _logs.pop(name, None)
+            mark(name, version, len(export), reset=True)
+            return export
+        log = _new_log(headers, fmt, rows, times)
+        log.appended = [len(rows)]
+    if reset or len(rows):
+        _save(name, log, rows, reset)
+    with _lock:
+        _logs[name] = log
+    mark(name, version, len(log.frame), reset=reset)
+    return log.frame
+
+
+def last_appended(name):
+    """Rows added by the last few ingests of ``name`` (oldest first), or []."""
+    log = _logs.get(name)
+    return list(log.appended) if log else []
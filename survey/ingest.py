@@ -0,0 +1,89 @@
+# ---------------------------------------------------------
+# Ingest: compact dtypes for respondent-level data
+# ---------------------------------------------------------
+"""Normalize a freshly parsed survey frame to compact dtypes.
+
+* Likert items become ``int8`` (``Int8`` when some answers are missing).
+  Items holding fractional answers, like the ``2.5`` values in Khalida's
+  export, cannot be coded as levels; they are kept as ``float32`` and
+  listed in the report so they are never silently rounded.
+* Age Group / Status / Gender / Race (Ethnicity) / Area Type become
+  categoricals, so group-bys run on small integer codes.
+
+``normalize`` returns the new frame and an ``IngestReport`` with the
+memory saved; ``python -m survey ingest`` prints it for every dataset.
+"""
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from survey.likert import DEMOGRAPHICS, likert_columns
+
+# Fatin's export calls the Race column "Ethnicity"
+DEMOGRAPHIC_COLUMNS = DEMOGRAPHICS + ["Ethnicity"]
+
+
+@dataclass
+class IngestReport:
+    name: str
+    rows: int
+    bytes_before: int
+    bytes_after: int
+    fractional: dict = field(default_factory=dict)   # item -> number of fractional answers
+    dtypes: dict = field(default_factory=dict)       # column -> new dtype
+
+    @property
+    def saved_bytes(self):
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def saved_pct(self):
+        return self.saved_bytes / self.bytes_before * 100 if self.bytes_before else 0.0
+
+    def __str__(self):
+        lines = [
+            f"{self.name}: {self.rows} rows, {self.bytes_before:,} -> {self.bytes_after:,} bytes "
+            f"({self.saved_pct:.1f}% saved)"
+        ]
+        for col, n in self.fractional.items():
+            lines.append(f"  fractional answers kept as float32: {col} ({n} rows)")
+        return "\n".join(lines)
+
+
+def _likert_dtype(series):
+    values = series.to_numpy(dtype=float, na_value=np.nan)
+    missing = np.isnan(values)
+    answered = values[~missing]
+    fractional = int((answered != np.round(answered)).sum())
+    if fractional or (answered.size and np.abs(answered).max() > 127):
+        return "float32", fractional
+    return ("Int8" if missing.any() else "int8"), 0
+
+
+def normalize(df, name=None):
+    """Return ``(compact_frame, IngestReport)`` for a respondent-level frame."""
+    before = int(df.memory_usage(deep=True).sum())
+    items = set(likert_columns(df.columns))
+    out = {}
+    fractional = {}
+    for col in df.columns:
+        series = df[col]
+        if col in items and pd.api.types.is_numeric_dtype(series):
+            dtype, n_fractional = _likert_dtype(series)
+            if n_fractional:
+                fractional[col] = n_fractional
+            series = series.astype(dtype)
+        elif col in DEMOGRAPHIC_COLUMNS and not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype("category")
+        out[col] = series
+    frame = pd.DataFrame(out, index=df.index)
+    report = IngestReport(
+        name=name or "",
+        rows=len(frame),
+        bytes_before=before,
+        bytes_after=int(frame.memory_usage(deep=True).sum()),
+        fractional=fractional,
+        dtypes={col: str(dtype) for col, dtype in frame.dtypes.items()},
+    )
+    return frame, report
@@ -0,0 +1,107 @@
+# ---------------------------------------------------------
+# Likert response counting
+# ---------------------------------------------------------
+"""Count SD/D/N/A/SA answers for every item x group in one pass.
+
+The pages used to loop over every area and every item and build two
+boolean masks over the whole frame per cell.  Here each item column is
+read once: the group code and the Likert level are folded into a single
+bin index and counted with ``np.bincount``, so the cost is one linear
+scan per item no matter how many groups there are.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+LEVELS = (1, 2, 3, 4, 5)
+LEVEL_LABELS = ("SD", "D", "N", "A", "SA")
+
+# Demographic columns shared by every cleaned dataset
+DEMOGRAPHICS = ["Age Group", "Status", "Gender", "Race", "Area Type"]
+
+LevelCounts = namedtuple("LevelCounts", ["groups", "items", "counts"])
+LevelCounts.__doc__ = """Counts array of shape (groups, items, levels), dtype int64."""
+
+
+def likert_columns(columns):
+    """Likert items among ``columns``, in their original order."""
+    return [
+        col for col in columns
+        if "Factor" in col or "Effect" in col or "Step" in col
+        or "Impact" in col or "Measure" in col  # Fatin's export naming
+        or col == "Students Not Sharing Vehicles"
+    ]
+
+
+def classify_item(col, other="Other"):
+    if "Factor" in col:
+        return "Factor"
+    elif "Effect" in col or "Impact" in col:
+        return "Effect"
+    elif "Step" in col or "Measure" in col:
+        return "Step"
+    return other
+
+
+def level_counts(df, items, by=None):
+    """Count every Likert level for every item within every group of ``by``.
+
+    Groups keep their order of first appearance (like ``Series.unique``).
+    Missing answers and values outside 1-5 (e.g. the 2.5 averages in the
+    Khalida export) are not counted.
+    """
+    if by is None:
+        codes = np.zeros(len(df), dtype=np.int64)
+        groups = pd.Index([None])
+    else:
+        codes, groups = pd.factorize(df[by])
+    counts = count_levels(df, items, codes, len(groups))
+    return LevelCounts(groups, list(items), counts)
+
+
+def count_levels(df, items, codes, n_groups):
+    """(n_groups, items, levels) counts for rows already labelled with group ``codes``.
+
+    Rows with a negative code are skipped.
+    """
+    n_levels = len(LEVELS)
+    codes = np.asarray(codes, dtype=np.int64)
+    grouped = codes >= 0
+    counts = np.empty((n_groups, len(items), n_levels), dtype=np.int64)
+    for j, col in enumerate(items):
+        values = item_values(df, col)
+        keep = grouped & np.isin(values, LEVELS)
+        bins = codes[keep] * n_levels + (values[keep].astype(np.int64) - LEVELS[0])
+        counts[:, j, :] = np.bincount(bins, minlength=n_groups * n_levels).reshape(n_groups, n_levels)
+    return counts
+
+
+def item_values(df, col):
+    """Answers of one Likert item as float64, non-numeric entries as NaN."""
+    return pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def disagreement_table(df, items, by=None, other="Other"):
+    """Long table of Strongly Disagree (1) / Disagree (2) counts per item and group.
+
+    Columns: ``by`` (when grouped), Likert Item, SD, D, Total, Category.
+    """
+    return disagreement_frame(level_counts(df, items, by), by, other)
+
+
+def disagreement_frame(result, by=None, other="Other"):
+    """``disagreement_table`` built from an existing ``LevelCounts``."""
+    n_groups, n_items, _ = result.counts.shape
+    sd = result.counts[:, :, 0].ravel()
+    d = result.counts[:, :, 1].ravel()
+    table = pd.DataFrame({
+        "Likert Item": np.tile(result.items, n_groups),
+        "SD": sd,
+        "D": d,
+        "Total": sd + d,
+        "Category": np.tile([classify_item(col, other) for col in result.items], n_groups),
+    })
+    if by is not None:
+        table.insert(0, by, np.repeat(result.groups.to_numpy(), n_items))
+    return table
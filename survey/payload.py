@@ -0,0 +1,133 @@
+# ---------------------------------------------------------
+# Payload accounting: bytes sent to the browser per rerun
+# ---------------------------------------------------------
+"""Serialized size of every chart and table a page sends.
+
+Pages show charts and tables through ``plotly_chart``, ``dataframe`` and
+``table`` here instead of the ``st`` functions of the same name; the
+arguments are passed on to Streamlit unchanged.  While a ``survey.perf``
+run is active in the calling thread, each call is timed as a span and its
+size recorded on the run; other threads and headless code go straight
+through.  Sizes are measured, not estimated: a figure is serialized with
+``plotly.io.to_json`` as Streamlit does, and a frame or Styler is
+marshalled into the same Arrow proto Streamlit sends (Arrow IPC bytes plus
+the Styler's CSS and display values).  That serializes every element a
+second time; the copy is not part of the element's span.
+
+At the end of a rerun ``check`` warns on the page when the total exceeds
+``BUDGET_BYTES`` (``SURVEY_PAYLOAD_BUDGET`` environment variable, e.g.
+``750000`` or ``750k``).  Totals are also part of every metrics-log line
+(see ``survey.perf``).
+"""
+import os
+import re
+from dataclasses import dataclass
+
+from survey import perf
+
+DEFAULT_BUDGET = "1m"
+
+
+def parse_size(text):
+    """``"750k"`` / ``"2m"`` / ``"123456"`` -> bytes."""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([kmg]?)b?\s*", str(text).lower())
+    if not match:
+        raise ValueError(f"not a size: {text!r}")
+    number, unit = match.groups()
+    return int(float(number) * {"": 1, "k": 1e3, "m": 1e6, "g": 1e9}[unit])
+
+
+BUDGET_BYTES = parse_size(os.environ.get("SURVEY_PAYLOAD_BUDGET", DEFAULT_BUDGET))
+
+
+@dataclass
+class Payload:
+    element: str        # plotly_chart / dataframe / table
+    label: str
+    bytes: int
+
+
+def figure_bytes(fig):
+    """Bytes of the figure spec ``st.plotly_chart`` sends."""
+    import plotly.io
+
+    return len(plotly.io.to_json(fig, validate=False).encode("utf-8"))
+
+
+def frame_bytes(data):
+    """Bytes of the Arrow proto ``st.dataframe`` / ``st.table`` send for ``data``."""
+    from streamlit.elements.arrow import marshall
+    from streamlit.proto.ArrowData_pb2 import ArrowData
+
+    proto = ArrowData()
+    uuid = getattr(data, "uuid", None)
+    marshall(proto, data, default_uuid="payload")
+    if uuid is None and hasattr(data, "uuid"):
+        data.uuid = None        # a Styler without one still gets Streamlit's own
+    return proto.ByteSize()
+
+
+def _label(element, data, index):
+    if element == "plotly_chart":
+        title = getattr(getattr(getattr(data, "layout", None), "title", None), "text", None)
+        if title:
+            return re.sub(r"<[^>]+>", "", title)
+    elif hasattr(data, "shape"):
+        return f"{element} #{index} {data.shape[0]}x{data.shape[1]}"
+    elif hasattr(data, "data"):     # Styler
+        return f"{element} #{index} {data.data.shape[0]}x{data.data.shape[1]} (styled)"
+    return f"{element} #{index}"
+
+
+def _show(element, measure, data, args, kwargs):
+    import streamlit as st
+
+    method = getattr(st, element)
+    run = perf.current_run()
+    if run is None or data is None:
+        return method(data, *args, **kwargs)
+    label = _label(element, data, len(run.payloads) + 1)
+    try:
+        size = measure(data)
+    except Exception:       # accounting must never break a page
+        size = 0
+    run.payloads.append(Payload(element, label, size))
+    with perf.span(f"{element}: {label}"):
+        return method(data, *args, **kwargs)
+
+
+def plotly_chart(figure_or_data, *args, **kwargs):
+    """``st.plotly_chart``, with the figure's size recorded on the current run."""
+    return _show("plotly_chart", figure_bytes, figure_or_data, args, kwargs)
+
+
+def dataframe(data=None, *args, **kwargs):
+    """``st.dataframe``, with the frame's size recorded on the current run."""
+    return _show("dataframe", frame_bytes, data, args, kwargs)
+
+
+def table(data=None, *args, **kwargs):
+    """``st.table``, with the table's size recorded on the current run."""
+    return _show("table", frame_bytes, data, args, kwargs)
+
+
+def total(run):
+    return sum(p.bytes for p in run.payloads)
+
+
+def check(run, budget=None):
+    """Warn on the page when ``run`` sent more than ``budget`` bytes."""
+    import streamlit as st
+
+    budget = BUDGET_BYTES if budget is None else budget
+    sent = total(run)
+    if sent <= budget:
+        return False
+    largest = sorted(run.payloads, key=lambda p: p.bytes, reverse=True)[:3]
+    detail = ", ".join(f"{p.label} ({p.bytes / 1e3:,.0f} kB)" for p in largest)
+    st.warning(
+        f"This page sent {sent / 1e3:,.0f} kB of charts and tables "
+        f"(budget {budget / 1e3:,.0f} kB). Largest: {detail}.",
+        icon="📦",
+    )
+    return True
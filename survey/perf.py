@@ -0,0 +1,293 @@
+# ---------------------------------------------------------
+# Rerun timing: spans, page sections, metrics log
+# ---------------------------------------------------------
+"""Where a rerun spends its time.
+
+A *run* covers one execution of a page script.  The navigation entry point
+wraps ``navigation.run()`` in ``page_run``; inside it
+
+* ``section("2. Box plots")`` marks the start of a numbered page section
+  (the previous one ends there; no re-indenting of page code), and
+* ``with span("load khalida"):`` times any block, nested under the open
+  section.  The data layer wraps every load and derived build in a span.
+
+Outside a run both are no-ops, so the same code runs headless.  The bytes
+of every chart and table sent during a run are recorded on it too (see
+``survey.payload``).
+
+With the ``SURVEY_METRICS_LOG`` environment variable set to a file path,
+every finished run is appended to it as one JSON line (size-rotated) for
+scraping; unset, nothing is written.  Adding
+``?perf=1`` to the page URL shows the last ``HISTORY`` runs of the session
+in the sidebar.
+
+For function-level detail, ``?profile=1`` (or the panel's "Profile next
+rerun" button) runs the next rerun of the current page under cProfile: the
+stats are written to ``PROFILE_DIR`` (open with ``pstats`` or snakeviz)
+and the ``TOP_N`` functions by cumulative time are shown under the page.
+Only the session's own script thread is profiled, with caching and
+rendering included.
+"""
+import cProfile
+import json
+import logging
+import os
+import pstats
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+# Opt-in: every rerun of every session would otherwise grow a file on disk
+METRICS_LOG = Path(os.environ["SURVEY_METRICS_LOG"]) if os.environ.get("SURVEY_METRICS_LOG") else None
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUPS = 3
+HISTORY = 20
+QUERY_PARAM = "perf"
+PROFILE_PARAM = "profile"
+PROFILE_DIR = ROOT / ".survey_cache" / "profiles"
+TOP_N = 25
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_logger = logging.getLogger("survey.metrics")
+_logger.propagate = False
+
+
+@dataclass
+class Span:
+    name: str
+    start: float        # seconds since the run started
+    seconds: float
+    depth: int          # 0 = page section, 1+ = nested spans
+
+
+@dataclass
+class Run:
+    page: str
+    started: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    seconds: float = 0.0
+    spans: list = field(default_factory=list)
+    payloads: list = field(default_factory=list)      # survey.payload.Payload per chart/table
+    _t0: float = field(default_factory=time.perf_counter, repr=False)
+    _open: list = field(default_factory=list, repr=False)     # [(name, start, depth)]
+
+    def sections(self):
+        """``{section: seconds}`` for the top-level sections, in page order."""
+        return {s.name: s.seconds for s in self.spans if s.depth == 0}
+
+    def as_record(self):
+        return {
+            "time": self.started.isoformat(timespec="seconds"),
+            "page": self.page,
+            "total_ms": round(self.seconds * 1000, 2),
+            "payload_bytes": sum(p.bytes for p in self.payloads),
+            "spans": [
+                {"name": s.name, "depth": s.depth, "ms": round(s.seconds * 1000, 2)}
+                for s in self.spans
+            ],
+        }
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def _close(run, depth):
+    """End every open span at ``depth`` or deeper."""
+    now = time.perf_counter() - run._t0
+    while run._open and run._open[-1][2] >= depth:
+        name, start, d = run._open.pop()
+        run.spans.append(Span(name, start, now - start, d))
+
+
+@contextmanager
+def span(name):
+    run = current_run()
+    if run is None:
+        yield
+        return
+    depth = len(run._open)
+    run._open.append((name, time.perf_counter() - run._t0, depth))
+    try:
+        yield
+    finally:
+        _close(run, depth)
+
+
+def section(name):
+    """Start page section ``name``, ending the previous one."""
+    run = current_run()
+    if run is None:
+        return
+    _close(run, 0)
+    run._open.append((name, time.perf_counter() - run._t0, 0))
+
+
+@contextmanager
+def rerun(page):
+    """Time one script run of ``page``; the finished ``Run`` is logged."""
+    run = Run(page)
+    outer, _local.run = current_run(), run
+    try:
+        yield run
+    finally:
+        _close(run, 0)
+        run.seconds = time.perf_counter() - run._t0
+        run.spans.sort(key=lambda s: s.start)
+        _local.run = outer
+        write_metrics(run)
+
+
+def write_metrics(run):
+    """Append ``run`` to ``METRICS_LOG`` (no-op when the log is off)."""
+    if METRICS_LOG is None:
+        return
+    with _log_lock:
+        if not _logger.handlers:
+            try:
+                METRICS_LOG.parent.mkdir(parents=True, exist_ok=True)
+                handler = RotatingFileHandler(
+                    METRICS_LOG, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+                )
+            except OSError:
+                handler = logging.NullHandler()     # read-only deployment: keep the panel only
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _logger.addHandler(handler)
+            _logger.setLevel(logging.INFO)
+    _logger.info(json.dumps(run.as_record()))
+
+
+# ---- cProfile ---------------------------------------------------------------------
+def start_profile():
+    """Enabled profiler for the calling thread, or None if one is already active."""
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:          # another profiler (e.g. a debugger) is running
+        return None
+    return profiler
+
+
+def write_profile(profiler, page):
+    """Dump ``profiler`` to ``PROFILE_DIR`` and return the file path."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", page).strip("-").lower() or "page"
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    path = PROFILE_DIR / f"{slug}-{stamp}.prof"
+    profiler.dump_stats(path)
+    return path
+
+
+def hot_functions(profiler, top=TOP_N):
+    """The ``top`` functions by cumulative time, as a DataFrame."""
+    import pandas as pd
+
+    stats = pstats.Stats(profiler).stats
+    rows = [
+        {
+            "function": name,
+            "location": f"{Path(filename).name}:{line}" if line else filename,
+            "calls": calls,
+            "own_ms": own * 1000,
+            "cumulative_ms": cumulative * 1000,
+        }
+        for (filename, line, name), (_, calls, own, cumulative, _) in stats.items()
+    ]
+    frame = pd.DataFrame(rows)
+    if frame.empty:
+        return frame
+    return frame.sort_values("cumulative_ms", ascending=False).head(top).round(2)
+
+
+# ---- Streamlit -------------------------------------------------------------------
+def _request_profile():
+    import streamlit as st
+
+    st.session_state["survey_profile_next"] = True
+
+
+@contextmanager
+def page_run(page):
+    """``rerun`` plus per-session history, payload budget, the sidebar panel and profiling."""
+    import streamlit as st
+
+    from survey import payload
+
+    history = st.session_state.setdefault("survey_perf_runs", deque(maxlen=HISTORY))
+    profiler = None
+    if st.session_state.pop("survey_profile_next", False) or PROFILE_PARAM in st.query_params:
+        # One-shot: the parameter is dropped so the following reruns run normally
+        st.query_params.pop(PROFILE_PARAM, None)
+        profiler = start_profile()
+    try:
+        with rerun(page) as run:
+            history.append(run)
+            yield run
+    finally:
+        # Also after st.stop(), which ends the script with an exception
+        payload.check(run)
+        if profiler is not None:
+            profiler.disable()
+            profile_report(profiler, page)
+        if st.query_params.get(QUERY_PARAM) in ("1", "true"):
+            panel(history)
+
+
+def profile_report(profiler, page):
+    import streamlit as st
+
+    try:
+        path = write_profile(profiler, page)
+    except OSError:
+        path = None
+    with st.expander(f"🔬 cProfile of this rerun: {page}", expanded=True):
+        if path is not None:
+            st.caption(f"Stats written to {path} (pstats / snakeviz format)")
+            st.download_button("Download .prof", path.read_bytes(), file_name=path.name)
+        st.dataframe(hot_functions(profiler), hide_index=True)
+
+
+def panel(runs):
+    """Sidebar table of recent runs and the section breakdown of the last one."""
+    import pandas as pd
+    import streamlit as st
+
+    if not runs:
+        return
+    last = runs[-1]
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        sent = sum(p.bytes for p in last.payloads)
+        st.caption(f"{last.page}: {last.seconds * 1000:.0f} ms, {sent / 1e3:,.0f} kB sent")
+        st.button("Profile next rerun", on_click=_request_profile)
+        st.dataframe(
+            pd.DataFrame(
+                {"span": ["· " * s.depth + s.name for s in last.spans],
+                 "ms": [round(s.seconds * 1000, 1) for s in last.spans]}
+            ),
+            hide_index=True,
+        )
+        if last.payloads:
+            st.dataframe(
+                pd.DataFrame(
+                    {"element": [p.label for p in last.payloads],
+                     "kB": [round(p.bytes / 1e3, 1) for p in last.payloads]}
+                ),
+                hide_index=True,
+            )
+        st.dataframe(
+            pd.DataFrame(
+                [{"time": r.started.strftime("%H:%M:%S"), "page": r.page,
+                  "ms": round(r.seconds * 1000, 1),
+                  "kB": round(sum(p.bytes for p in r.payloads) / 1e3, 1),
+                  "slowest": max(r.sections(), key=r.sections().get, default="")}
+                 for r in reversed(runs)]
+            ),
+            hide_index=True,
+        )
@@ -0,0 +1,164 @@
+# ---------------------------------------------------------
+# Background refresh: poll the sources, rebuild, publish
+# ---------------------------------------------------------
+"""Keep the data fresh without making a session wait for it.
+
+``start`` launches one daemon thread per server process.  Every
+``INTERVAL`` seconds (``SURVEY_REFRESH_SECONDS`` environment variable;
+0 turns the thread off) it
+
+1. checks every source: a conditional GET for remote ones (a ``304`` when
+   nothing changed, see ``survey.fetch``), the file version for local ones;
+2. for the sources that changed and the datasets built from them, loads
+   the new data and rebuilds every derived object sessions have used
+   (``datasets.rebuild``) inside a ``datasets.Stage``.  Sessions keep
+   being served the published version meanwhile, and never take the
+   scheduler's locks;
+3. publishes the stage in one swap, so every session's next rerun sees the
+   new version with everything already built.
+
+Local files are pinned to their version at start, so an edited CSV is
+also picked up by the thread rather than by whichever rerun comes first.
+A failed check or rebuild keeps the published version.  What was found
+changed stays pending and is staged again at the next tick: by then the
+snapshot and the append log already hold the new data, so a remote source
+would otherwise answer ``304`` and never be published.
+"""
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from survey import datasets, fetch
+
+INTERVAL = float(os.environ.get("SURVEY_REFRESH_SECONDS", 300))
+
+_logger = logging.getLogger("survey.scheduler")
+_start_lock = threading.Lock()
+_thread = None
+
+
+@dataclass
+class Status:
+    interval: float
+    polls: int = 0
+    last_poll: float = None         # time.time() of the last finished check
+    last_publish: float = None
+    published: dict = field(default_factory=dict)   # name -> version, last publish
+    prepared: int = 0               # frames + derived objects rebuilt for it
+    seconds: float = 0.0            # time the last rebuild took
+    error: str = None               # last failure, cleared by the next good poll
+
+
+def changed_sources(changed=None):
+    """``{name: version}`` for sources whose data differs from the published version.
+
+    Found sources are added to ``changed`` as they are found (and it is
+    returned), so a failure part-way keeps those.
+    """
+    changed = {} if changed is None else changed
+    for name, source in datasets.SOURCES.items():
+        if source.built_from:
+            continue        # follows its source
+        location = datasets.resolve(name)
+        if isinstance(location, Path):
+            version = datasets.live_version(name)
+            if version != datasets.dataset_version(name):
+                changed[name] = version
+        else:
+            try:
+                result = fetch.fetch(location)
+            except fetch.FetchError:
+                continue    # unreachable and never fetched: nothing newer to publish
+            if result.status == "downloaded":
+                changed[name] = f"fetched-{time.time_ns()}"
+    return changed
+
+
+def dependents(names):
+    """``names`` plus every dataset built from one of them."""
+    names = set(names)
+    return names | {n for n, s in datasets.SOURCES.items() if s.built_from in names}
+
+
+class RefreshThread(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(name="survey-refresh", daemon=True)
+        self.interval = interval
+        self.status = Status(interval)
+        self.stopped = threading.Event()
+        self.pending = {}       # name -> version found changed but not yet published
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Check every source once; rebuild and publish what changed."""
+        try:
+            changed = changed_sources(self.pending)
+            if changed:
+                start = time.perf_counter()
+                stage = datasets.Stage(changed)
+                with datasets.staging(stage):
+                    prepared = datasets.rebuild(dependents(changed))
+                datasets.publish(stage)
+                self.pending = {}
+                self.status.seconds = time.perf_counter() - start
+                self.status.prepared = prepared
+                self.status.published = changed
+                self.status.last_publish = time.time()
+                _logger.info("published %s (%d objects, %.2fs)", sorted(changed), prepared, self.status.seconds)
+            self.status.error = None
+        except Exception as exc:        # keep serving the published data; self.pending is retried
+            self.status.error = f"{type(exc).__name__}: {exc}"
+            _logger.exception("refresh failed")
+        finally:
+            self.status.polls += 1
+            self.status.last_poll = time.time()
+
+
+def start(interval=None):
+    """Start the refresh thread once per process; returns it (None when disabled)."""
+    global _thread
+    interval = INTERVAL if interval is None else interval
+    with _start_lock:
+        if _thread is None and interval > 0:
+            # Pin local files to what sessions see now; changes go through the thread
+            local = {
+                name: datasets.live_version(name)
+                for name, source in datasets.SOURCES.items()
+                if not source.built_from and isinstance(datasets.resolve(name), Path)
+            }
+            datasets.publish(datasets.Stage(local))
+            _thread = RefreshThread(interval)
+            _thread.start()
+        return _thread
+
+
+def stop():
+    global _thread
+    with _start_lock:
+        if _thread is not None:
+            _thread.stopped.set()
+            _thread = None
+
+
+def status():
+    return _thread.status if _thread is not None else None
+
+
+def describe():
+    """One line for the sidebar: when the data was last checked and updated."""
+    current = status()
+    if current is None:
+        return "Background data refresh is off."
+
+    def clock(t):
+        return time.strftime("%H:%M", time.localtime(t)) if t else "not yet"
+
+    every = f"{current.interval / 60:g} min" if current.interval >= 60 else f"{current.interval:g} s"
+    text = f"Data checked {clock(current.last_poll)}, updated {clock(current.last_publish)} (every {every})"
+    return f"{text}; last check failed: {current.error}" if current.error else text
@@ -0,0 +1,160 @@
+# ---------------------------------------------------------
+# Shared survey matrix: one copy-on-write memory map per version
+# ---------------------------------------------------------
+"""Respondent-level frames backed by memory-mapped files shared by every process.
+
+Inside one server process the sessions already share a single frame (see
+``survey.datasets``), but each server process still holds its own parsed
+copy.  ``write`` stores a normalized frame once per data version in
+``SHARED_DIR`` as
+
+* one column-major ``.npy`` matrix per value dtype: the Likert items
+  (``int8``, ``float32`` for fractional exports) and the demographic
+  category codes (``int8``), so each column is one contiguous slice;
+* for nullable ``Int8`` items (a form export with unanswered questions)
+  the values go in the ``int8`` matrix and the missing-answer masks in a
+  ``bool`` matrix, one column each;
+* a JSON sidecar with the column order and the categories.
+
+``read`` maps those files copy-on-write (``np.load(mmap_mode="c")``) and
+wraps the slices in a DataFrame without copying.  The pages come from the
+OS page cache, which every session of every process mapping the same
+file shares.  A page that writes to its frame gets a private copy from
+pandas' copy-on-write; should pandas write in place (the page holds the
+last reference), the touched memory pages become private to the process
+and the file never changes.
+
+Files are named after a version token that means the same thing in every
+process (the file version of a local CSV, the content hash of the form
+export), written under a temporary name and renamed, and never changed
+afterwards.  Frames with other dtypes (text columns) are not shared:
+``share`` logs which column prevented it and returns the frame as it is.
+"""
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+from survey import columnar
+
+SHARED_DIR = columnar.CACHE_DIR / "shared"
+FORMAT = 2      # bump when the stored layout changes so old files are ignored
+MASKED = {"Int": pd.arrays.IntegerArray, "Float": pd.arrays.FloatingArray}
+
+_logger = logging.getLogger("survey.shared")
+
+
+def _stem(name, key):
+    return f"{name}-{key}-f{FORMAT}"
+
+
+def _layout(df):
+    """``(groups, columns)``: value arrays per dtype and how to rebuild each column.
+
+    Raises ``TypeError`` naming the first column that cannot be stored.
+    """
+    groups, columns = {}, []
+
+    def add(values):
+        arrays = groups.setdefault(values.dtype.str, [])
+        arrays.append(values)
+        return values.dtype.str, len(arrays) - 1
+
+    for name, col in df.items():
+        dtype = col.dtype
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories.tolist()
+            if not all(isinstance(c, (str, int, float)) for c in categories):
+                raise TypeError(f"column {name!r} has categories that are not str/int/float")
+            values = col.cat.codes.to_numpy()
+            spec = {"categories": categories, "ordered": bool(dtype.ordered)}
+        elif isinstance(dtype, np.dtype) and dtype.kind in "iufb":
+            values, spec = col.to_numpy(), {}
+        elif isinstance(col.array, tuple(MASKED.values())):
+            # Nullable numbers: the values (0 where missing) and the mask
+            kind = next(k for k, cls in MASKED.items() if isinstance(col.array, cls))
+            values = col.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+            mask_group, mask_index = add(col.isna().to_numpy())
+            spec = {"masked": kind, "mask_group": mask_group, "mask": mask_index}
+        else:
+            raise TypeError(f"column {name!r} has dtype {dtype}")
+        group, index = add(values)
+        columns.append({"name": name, "group": group, "index": index, **spec})
+    return groups, columns
+
+
+def write(name, key, df):
+    """Store ``df`` as the shared copy of ``name`` at ``key``; True when the files exist.
+
+    Older versions of ``name`` are removed.  Failures (read-only checkout,
+    unsupported dtypes) only mean the frame is not shared.
+    """
+    stem = _stem(name, key)
+    meta_path = SHARED_DIR / f"{stem}.json"
+    if meta_path.exists():
+        return True
+    try:
+        groups, columns = _layout(df)
+    except TypeError as exc:
+        _logger.warning("%s is not shared across processes: %s", name, exc)
+        return False
+    tmp = f".tmp-{os.getpid()}"
+    try:
+        SHARED_DIR.mkdir(parents=True, exist_ok=True)
+        files = {}
+        for group, arrays in groups.items():
+            path = SHARED_DIR / f"{stem}-{np.dtype(group).name}.npy"
+            with open(path.with_suffix(tmp), "wb") as f:
+                np.save(f, np.asfortranarray(np.column_stack(arrays)))
+            path.with_suffix(tmp).replace(path)
+            files[group] = path.name
+        meta = {"format": FORMAT, "rows": len(df), "files": files, "columns": columns}
+        meta_path.with_suffix(tmp).write_text(json.dumps(meta), encoding="utf-8")
+        meta_path.with_suffix(tmp).replace(meta_path)     # the JSON is written last
+    except OSError:
+        return False
+    for old in SHARED_DIR.glob(f"{name}-*"):
+        if not old.name.startswith(stem):
+            try:
+                old.unlink()    # processes that mapped it keep their pages
+            except OSError:
+                pass
+    return True
+
+
+def read(name, key, columns=None):
+    """Zero-copy, copy-on-write frame for ``name`` at ``key`` (only ``columns``), or None."""
+    meta_path = SHARED_DIR / f"{_stem(name, key)}.json"
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        specs = {c["name"]: c for c in meta["columns"]}
+        wanted = [specs[c] for c in columns] if columns is not None else meta["columns"]
+        used = {c["group"] for c in wanted} | {c["mask_group"] for c in wanted if "masked" in c}
+        matrices = {
+            group: np.load(SHARED_DIR / meta["files"][group], mmap_mode="c").view(np.ndarray)
+            for group in used
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    data = {}
+    for spec in wanted:
+        values = matrices[spec["group"]][:, spec["index"]]
+        if "categories" in spec:
+            dtype = pd.CategoricalDtype(spec["categories"], ordered=spec["ordered"])
+            values = pd.Categorical.from_codes(values, dtype=dtype, validate=False)
+        elif "masked" in spec:
+            mask = matrices[spec["mask_group"]][:, spec["mask"]]
+            values = MASKED[spec["masked"]](values, mask)
+        data[spec["name"]] = pd.Series(values, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+def share(name, key, df):
+    """The shared, mapped equivalent of ``df`` (written first if needed), else ``df``."""
+    if write(name, key, df):
+        frame = read(name, key)
+        if frame is not None:
+            return frame
+    return df
@@ -0,0 +1,101 @@
+# ---------------------------------------------------------
+# Import-time report and startup budget per page
+# ---------------------------------------------------------
+"""What each page costs to import on a cold server.
+
+Every page's import statements (top level or not, e.g. Ain's mid-file
+``import plotly.graph_objects``) are replayed in a fresh interpreter under
+``python -X importtime``, after importing streamlit and pandas, which the
+server has loaded before any page runs.  The report lists the time spent
+on the page's own imports and the most expensive top-level modules, and
+flags pages over the budget.
+
+    python -m survey imports            # pages in GoogleFormData.py + app.py
+    python -m survey imports --budget 0.3 page/Ain.py
+"""
+import ast
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+ENTRY = "GoogleFormData.py"     # st.navigation entry point
+EXTRA_SCRIPTS = ["app.py"]      # Google Form page, run on its own
+BASELINE = ["streamlit", "pandas"]
+BUDGET_SECONDS = 0.5
+MARKER = "--survey-page-imports--"
+
+
+@dataclass
+class ImportReport:
+    script: str
+    seconds: float
+    modules: list = field(default_factory=list)     # [(module, seconds)], most expensive first
+    budget: float = BUDGET_SECONDS
+
+    @property
+    def over_budget(self):
+        return self.seconds > self.budget
+
+    def __str__(self):
+        flag = "OVER" if self.over_budget else "ok"
+        top = ", ".join(f"{name} {sec:.3f}s" for name, sec in self.modules[:5])
+        return f"{self.script:<22} {self.seconds:6.3f}s  {flag:<4}  {top}"
+
+
+def navigation_pages(entry=ENTRY):
+    """Script paths passed to ``st.Page`` in the navigation entry point."""
+    tree = ast.parse((ROOT / entry).read_text(encoding="utf-8"))
+    pages = []
+    for node in ast.walk(tree):
+        if (
+            isinstance(node, ast.Call)
+            and getattr(node.func, "attr", None) == "Page"
+            and node.args
+            and isinstance(node.args[0], ast.Constant)
+        ):
+            pages.append(node.args[0].value)
+    return pages
+
+
+def import_statements(script):
+    """Source of every import statement in ``script``, in order."""
+    source = (ROOT / script).read_text(encoding="utf-8")
+    tree = ast.parse(source)
+    return [
+        ast.get_source_segment(source, node)
+        for node in ast.walk(tree)
+        if isinstance(node, (ast.Import, ast.ImportFrom))
+    ]
+
+
+def measure(script, budget=BUDGET_SECONDS):
+    """Import cost of ``script`` on top of the server baseline, in a fresh interpreter."""
+    code = "\n".join(
+        [f"import {name}" for name in BASELINE]
+        + [f"import sys; sys.stderr.write({MARKER!r} + '\\n')"]
+        + import_statements(script)
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True,
+    )
+    if proc.returncode:
+        raise RuntimeError(f"importing {script} failed:\n{proc.stderr.strip().splitlines()[-1]}")
+    lines = proc.stderr.split(MARKER, 1)[-1].splitlines()
+    modules = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  "):
+            continue        # nested import, already counted in its parent
+        modules.append((name.strip(), int(cumulative) / 1e6))
+    modules.sort(key=lambda item: item[1], reverse=True)
+    return ImportReport(script, sum(sec for _, sec in modules), modules, budget)
+
+
+def report(scripts=None, budget=BUDGET_SECONDS):
+    scripts = scripts or [ENTRY] + navigation_pages() + EXTRA_SCRIPTS
+    return [measure(script, budget) for script in scripts]
@@ -0,0 +1,49 @@
+# ---------------------------------------------------------
+# Table styling without matplotlib
+# ---------------------------------------------------------
+"""``Styler.background_gradient`` replacement built on plotly colour scales.
+
+pandas' own ``background_gradient`` imports matplotlib (~1 s on a cold
+server) just to look up a colormap.  The ColorBrewer scales it was used
+with (Reds, Oranges, Purples, YlOrRd, ...) ship with plotly, which every
+page already loads, so the gradient is computed here instead.
+"""
+import numpy as np
+import pandas as pd
+
+# Same default as pandas: dark backgrounds get white text
+TEXT_COLOR_THRESHOLD = 0.408
+
+
+def _luminance(rgb):
+    def channel(c):
+        c = c / 255
+        return c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4
+    r, g, b = (channel(c) for c in rgb)
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def gradient_css(data, cmap):
+    """CSS strings (same shape as ``data``) shading numeric values along ``cmap``."""
+    from plotly import colors
+
+    scale = getattr(colors.sequential, cmap)
+    values = np.asarray(data, dtype=float)
+    lo, hi = np.nanmin(values), np.nanmax(values)
+    norm = (values - lo) / (hi - lo) if hi > lo else np.zeros_like(values)
+    flat = norm.ravel()
+    css = np.full(flat.shape, "", dtype=object)
+    ok = ~np.isnan(flat)
+    for i, color in zip(np.flatnonzero(ok), colors.sample_colorscale(scale, flat[ok].tolist())):
+        rgb = colors.unlabel_rgb(color)
+        text = "#f1f1f1" if _luminance(rgb) < TEXT_COLOR_THRESHOLD else "#000000"
+        css[i] = f"background-color: {color}; color: {text};"
+    css = css.reshape(values.shape)
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(css, index=data.index, columns=data.columns)
+    return pd.Series(css, index=data.index)
+
+
+def background_gradient(styler, cmap, subset=None, axis=0):
+    """Drop-in for ``styler.background_gradient(cmap=..., subset=..., axis=...)``."""
+    return styler.apply(gradient_css, cmap=cmap, subset=subset, axis=axis)
@@ -0,0 +1,208 @@
+# ---------------------------------------------------------
+# Synthetic respondents that look like the real survey
+# ---------------------------------------------------------
+"""Gaussian-copula generator for load testing and capacity planning.
+
+Fitted on a respondent-level frame (by default ``cleaned_data.csv``):
+
+* demographics are drawn from the observed demographic combinations, so
+  their joint skew (e.g. mostly 18-25 year old Malay students) is kept;
+* every Likert item has its own answer distribution per stratum (Area Type
+  by default), smoothed towards the item's overall distribution so rare
+  strata do not collapse to a single answer;
+* the dependence between items comes from a latent Gaussian (an ordinal
+  copula): a latent vector is drawn per respondent and cut at the
+  stratum's thresholds.  Cutting a Gaussian into five levels weakens its
+  correlations, so the latent matrix is calibrated until the normal-score
+  correlations of the generated answers match the real ones.
+
+Sampling works chunk by chunk, so memory is bounded by ``chunksize``
+whatever the number of respondents:
+
+    python -m survey synth 5e6 wave.parquet           # columnar, zstd
+    python -m survey synth 1e6 wave.csv --source cleaned --seed 7
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from survey import columnar
+from survey.datasets import derived
+from survey.ingest import DEMOGRAPHIC_COLUMNS
+from survey.likert import likert_columns
+
+STRATA = "Area Type"
+SMOOTHING = 5.0          # pseudo-respondents of the overall distribution per stratum
+CALIBRATION_ROUNDS = 4
+CALIBRATION_SIZE = 20_000
+CHUNKSIZE = 200_000
+_EPS = 1e-9
+
+
+def _normal_quantile(p):
+    inv = NormalDist().inv_cdf
+    return np.array([inv(min(max(x, _EPS), 1 - _EPS)) for x in np.ravel(p)]).reshape(np.shape(p))
+
+
+def _normal_scores(values, levels):
+    """Normal score of each answer from its mid-rank (ties share one score)."""
+    counts = np.array([(values == v).sum() for v in levels], dtype=float)
+    n = counts.sum()
+    mid = (np.cumsum(counts) - counts / 2) / n
+    scores = np.full(values.shape, np.nan)
+    for level, score in zip(levels, _normal_quantile(mid)):
+        scores[values == level] = score
+    return scores
+
+
+def _nearest_correlation(r):
+    """Clip negative eigenvalues and rescale to a unit diagonal."""
+    r = np.nan_to_num((r + r.T) / 2)
+    np.fill_diagonal(r, 1.0)
+    w, v = np.linalg.eigh(r)
+    r = (v * np.clip(w, 1e-6, None)) @ v.T
+    d = np.sqrt(np.diag(r))
+    return r / np.outer(d, d)
+
+
+class SurveyModel:
+    def __init__(self, columns, items, levels, dims, combos, combo_p, strata, thresholds, corr, dtypes):
+        self.columns = list(columns)         # output column order
+        self.items = list(items)
+        self.levels = levels                 # item -> sorted answer values
+        self.dims = list(dims)
+        self.combos = combos                 # (n_combos, n_dims) object array
+        self.combo_p = combo_p
+        self.strata = strata                 # index of the stratum dimension, or None
+        self.thresholds = thresholds         # item -> (n_strata, n_levels - 1) latent cut points
+        self.corr = corr
+        self.dtypes = dtypes                 # column -> output dtype
+        self._chol = np.linalg.cholesky(corr) if len(self.items) else np.zeros((0, 0))
+
+    @classmethod
+    def from_frame(cls, df, strata=STRATA, smoothing=SMOOTHING, rounds=CALIBRATION_ROUNDS, seed=0):
+        items = likert_columns(df.columns)
+        dims = [c for c in DEMOGRAPHIC_COLUMNS if c in df.columns]
+        dtypes = {}
+        for col in df.columns:
+            dtype = df[col].dtype
+            if col in dims:
+                values = sorted(df[col].dropna().astype(str).unique())
+                dtype = pd.CategoricalDtype(values)
+            elif str(dtype) == "Int8":
+                dtype = np.dtype("int8")        # generated answers are never missing
+            dtypes[col] = dtype
+
+        demo = df[dims].astype(object).where(df[dims].notna(), None)
+        combo_counts = demo.value_counts(dropna=False, sort=False)
+        combos = np.array(list(combo_counts.index), dtype=object).reshape(len(combo_counts), len(dims))
+        combo_p = combo_counts.to_numpy(dtype=float) / combo_counts.sum()
+
+        strata_pos = dims.index(strata) if strata in dims else None
+        if strata_pos is None:
+            stratum_codes = np.zeros(len(df), dtype=np.int64)
+            n_strata = 1
+        else:
+            stratum_values = pd.Categorical(demo[strata], categories=cls._strata_values(combos, strata_pos))
+            stratum_codes = stratum_values.codes.astype(np.int64)
+            n_strata = len(stratum_values.categories)
+
+        levels, thresholds, scores = {}, {}, []
+        for col in items:
+            values = df[col].to_numpy(dtype=float, na_value=np.nan)
+            lv = np.unique(values[~np.isnan(values)])
+            levels[col] = lv
+            overall = np.array([(values == v).sum() for v in lv], dtype=float)
+            overall_p = overall / overall.sum()
+            cuts = np.empty((n_strata, len(lv) - 1))
+            for s in range(n_strata):
+                in_s = values[stratum_codes == s]
+                counts = np.array([(in_s == v).sum() for v in lv], dtype=float)
+                p = (counts + smoothing * overall_p) / (counts.sum() + smoothing)
+                cuts[s] = _normal_quantile(np.cumsum(p)[:-1])
+            thresholds[col] = cuts
+            scores.append(_normal_scores(values, lv))
+
+        if items:
+            target = _nearest_correlation(pd.DataFrame(np.column_stack(scores)).corr().to_numpy())
+        else:
+            target = np.zeros((0, 0))
+        model = cls(df.columns, items, levels, dims, combos, combo_p, strata_pos, thresholds, target, dtypes)
+        if items:
+            model._calibrate(target, rounds, seed)
+        return model
+
+    def _score_corr(self, frame):
+        scores = [
+            _normal_scores(frame[col].to_numpy(dtype=float), self.levels[col]) for col in self.items
+        ]
+        return np.nan_to_num(pd.DataFrame(np.column_stack(scores)).corr().to_numpy())
+
+    def _calibrate(self, target, rounds, seed):
+        """Move the latent correlation until generated answers reproduce ``target``."""
+        rng = np.random.default_rng(seed)
+        for _ in range(rounds):
+            achieved = self._score_corr(self.sample(CALIBRATION_SIZE, rng))
+            self.corr = _nearest_correlation(self.corr + (target - achieved))
+            self._chol = np.linalg.cholesky(self.corr)
+
+    @staticmethod
+    def _strata_values(combos, pos):
+        return sorted({v for v in combos[:, pos] if v is not None})
+
+    def sample(self, n, seed=None):
+        """One frame of ``n`` synthetic respondents."""
+        rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+        picks = rng.choice(len(self.combo_p), size=n, p=self.combo_p)
+        out = {}
+        for j, dim in enumerate(self.dims):
+            out[dim] = pd.Categorical(self.combos[picks, j], dtype=self.dtypes[dim])
+        if self.strata is None:
+            stratum = np.zeros(n, dtype=np.int64)
+        else:
+            categories = self._strata_values(self.combos, self.strata)
+            stratum = pd.Categorical(self.combos[picks, self.strata], categories=categories).codes
+            stratum = np.where(stratum < 0, 0, stratum)     # missing stratum: first one's cut points
+
+        latent = rng.standard_normal((n, len(self.items))) @ self._chol.T
+        for j, col in enumerate(self.items):
+            cuts = self.thresholds[col][stratum]                        # (n, L - 1)
+            index = (latent[:, [j]] > cuts).sum(axis=1)
+            out[col] = self.levels[col][index].astype(self.dtypes[col])
+        return pd.DataFrame(out, columns=self.columns)
+
+    def generate(self, n, chunksize=CHUNKSIZE, seed=None):
+        """Frames of at most ``chunksize`` respondents, ``n`` in total."""
+        rng = np.random.default_rng(seed)
+        for start in range(0, n, chunksize):
+            yield self.sample(min(chunksize, n - start), rng)
+
+
+def write(model, n, path, chunksize=CHUNKSIZE, seed=None):
+    """Stream ``n`` respondents to ``path`` (.csv, or .parquet in the columnar format)."""
+    path = str(path)
+    chunks = model.generate(n, chunksize, seed)
+    if path.endswith(".parquet"):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for chunk in chunks:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema, compression=columnar.COMPRESSION)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+        return path
+    for i, chunk in enumerate(chunks):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False)
+    return path
+
+
+def get_model(name="cleaned"):
+    """Generator fitted on dataset ``name``, per data version."""
+    return derived(name, "synthetic", SurveyModel.from_frame)
@@ -0,0 +1,82 @@
+# ---------------------------------------------------------
+# Server-side paginated dataset viewer
+# ---------------------------------------------------------
+"""Browse a large frame without shipping it to the browser.
+
+``st.dataframe(df)`` serialises every row on every rerun.  ``dataset_viewer``
+keeps the frame on the server: sorting and filtering run here (a stable
+sort and a vectorized match over one column) and only the visible
+page of rows is sent, so the payload is ``page_size`` rows whatever the
+size of the export.  ``window`` is the same logic without Streamlit.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZES = (25, 50, 100, 250)
+NO_SORT = "(original order)"
+NO_FILTER = "(no filter)"
+
+
+def matching_rows(df, column=None, query=""):
+    """Row positions whose ``column`` contains ``query`` (case-insensitive)."""
+    if not column or not query:
+        return np.arange(len(df))
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Match the few category labels once, then compare codes
+        hits = values.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+        mask = np.isin(values.cat.codes.to_numpy(), np.flatnonzero(hits))
+    else:
+        mask = values.astype(str).str.contains(query, case=False, regex=False).to_numpy()
+    return np.flatnonzero(mask)
+
+
+def ordered_rows(df, sort=None, ascending=True, column=None, query=""):
+    """Positions of the matching rows, in display order (missing sort keys last)."""
+    rows = matching_rows(df, column, query)
+    if sort is None:
+        return rows
+    keys = df[sort].take(rows).reset_index(drop=True)
+    # Stable in both directions; missing keys are never compared with values
+    order = keys.sort_values(ascending=ascending, na_position="last", kind="stable").index
+    return rows[order.to_numpy()]
+
+
+def window(df, sort=None, ascending=True, column=None, query="", page=1, page_size=PAGE_SIZES[1]):
+    """``(rows of the requested page, number of matching rows)``."""
+    rows = ordered_rows(df, sort, ascending, column, query)
+    start = (page - 1) * page_size
+    return df.take(rows[start:start + page_size]), len(rows)
+
+
+def dataset_viewer(df, key, page_size=PAGE_SIZES[1]):
+    """Sort / filter / page controls and the visible rows of ``df``."""
+    import streamlit as st
+
+    from survey import payload
+
+    columns = [str(c) for c in df.columns]
+    c1, c2, c3, c4 = st.columns([3, 1, 3, 3])
+    sort = c1.selectbox("Sort by", [NO_SORT] + columns, key=f"{key}_sort")
+    descending = c2.toggle("Descending", key=f"{key}_desc")
+    column = c3.selectbox("Filter column", [NO_FILTER] + columns, key=f"{key}_col")
+    query = c4.text_input("Contains", key=f"{key}_query", disabled=column == NO_FILTER)
+
+    sort = None if sort == NO_SORT else df.columns[columns.index(sort)]
+    column = None if column == NO_FILTER else df.columns[columns.index(column)]
+    rows = ordered_rows(df, sort, not descending, column, query)
+
+    size = st.session_state.setdefault(f"{key}_size", page_size)
+    n_pages = max(1, math.ceil(len(rows) / size))
+    page_key = f"{key}_page"
+    # A narrower filter can leave the stored page past the end
+    st.session_state[page_key] = min(st.session_state.get(page_key, 1), n_pages)
+    start = (st.session_state[page_key] - 1) * size
+    payload.dataframe(df.take(rows[start:start + size]), hide_index=True)
+
+    p1, p2, p3 = st.columns([2, 2, 6])
+    p1.number_input("Page", 1, n_pages, key=page_key)
+    p2.selectbox("Rows per page", sorted(set(PAGE_SIZES) | {page_size}), key=f"{key}_size")
+    p3.caption(f"{len(rows):,} of {len(df):,} rows match · page {st.session_state[page_key]} of {n_pages}")
@@ -0,0 +1,181 @@
+# ---------------------------------------------------------
+# Startup warm-up: load every dataset and aggregate at once
+# ---------------------------------------------------------
+"""Prepare every page's data before its first visitor asks for it.
+
+Without this each dataset is loaded by whichever page runs first, one
+after the other, and the first visitor of every page pays for its
+download, parse and aggregates.  ``start`` (called by both entry scripts)
+submits one task per page and dataset to a thread pool, once per server
+process, and returns at once.  A task makes the same shared-layer calls
+as its page (``load_dataset``, ``get_cube``, ``get_correlation_stats``,
+...), so the frames and derived objects land in the caches the page reads
+from, and the refresh scheduler rebuilds them afterwards.
+
+All sources load concurrently, so a cold start costs about as long as the
+slowest source rather than the sum of them.  A page that runs before its
+tasks finish simply waits on the dataset's lock for the load already in
+flight; nothing is read twice.  ``describe`` gives the sidebar line and
+``python -m survey warmup`` runs it in the foreground with timings.
+
+The column sets come from ``survey.columns``, which the pages import too.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from survey import columns, load_dataset
+from survey.correlation import get_correlation_stats
+from survey.cube import get_cube
+from survey.filters import get_filter_index
+from survey.form import get_responses
+from survey.regression import get_regressions
+
+_logger = logging.getLogger("survey.warmup")
+_start_lock = threading.Lock()
+_current = None
+
+
+def _responses():
+    get_responses()
+
+
+def _cleaned():
+    load_dataset("cleaned")
+    get_cube("cleaned")
+
+
+def _ain_summary():
+    load_dataset("ain_summary")
+
+
+def _izzati():
+    load_dataset("izzati", columns=columns.IZZATI_COLUMNS)
+    get_cube("izzati", columns=columns.IZZATI_COLUMNS)
+    get_correlation_stats("izzati", columns.IZZATI_FACTORS, columns.EFFECTS, columns=columns.IZZATI_COLUMNS)
+
+
+def _khalida():
+    page_cols = columns.KHALIDA_COLUMNS
+    load_dataset("khalida", columns=page_cols)
+    get_cube("khalida", columns=page_cols)
+    get_filter_index("khalida", columns.KHALIDA_FILTERS, projection=page_cols)
+    get_correlation_stats("khalida", columns.KHALIDA_CAUSES, columns.EFFECTS, columns=page_cols)
+
+
+def _fatin():
+    data = load_dataset("fatin")
+    get_cube("fatin")
+    factors = columns.fatin_factors(data.columns)
+    impacts = columns.fatin_impacts(data.columns)
+    if factors and impacts:
+        get_regressions("fatin", factors, impacts)
+        get_correlation_stats("fatin", factors, impacts)
+
+
+# page script -> [(dataset, prepare)], in the order the page uses them
+PAGES = {
+    "app.py": [("form_responses", _responses), ("cleaned", _cleaned)],
+    "page/Ain.py": [("ain_summary", _ain_summary)],
+    "page/Izzati.py": [("izzati", _izzati)],
+    "page/Fathin.py": [("fatin", _fatin)],
+    "page/Khalida.py": [("khalida", _khalida)],
+}
+
+
+@dataclass
+class Task:
+    page: str
+    dataset: str
+    prepare: object = field(repr=False)
+    state: str = "pending"      # "pending", "running", "ready" or "failed"
+    seconds: float = 0.0
+    error: str = None
+
+    def run(self):
+        self.state = "running"
+        start = time.perf_counter()
+        try:
+            self.prepare()
+        except Exception as exc:    # the page shows its own error when it runs
+            self.state, self.error = "failed", f"{type(exc).__name__}: {exc}"
+            _logger.warning("warm-up of %s for %s failed: %s", self.dataset, self.page, self.error)
+        else:
+            self.state = "ready"
+        finally:
+            self.seconds = time.perf_counter() - start
+
+
+@dataclass
+class Warmup:
+    tasks: list
+    started: float = field(default_factory=time.perf_counter)
+    seconds: float = None       # wall time until every task finished
+
+    @property
+    def done(self):
+        return self.seconds is not None
+
+    def ready(self, page=None):
+        """Whether every task (of ``page``) finished, failed or not."""
+        return all(t.state in ("ready", "failed") for t in self.tasks if page in (None, t.page))
+
+    def failed(self):
+        return [t for t in self.tasks if t.state == "failed"]
+
+    def report(self):
+        """One line per task, slowest first."""
+        lines = []
+        for t in sorted(self.tasks, key=lambda t: t.seconds, reverse=True):
+            line = f"{t.page:<16} {t.dataset:<15} {t.state:<8} {t.seconds:6.2f}s"
+            lines.append(f"{line}  {t.error}" if t.error else line)
+        return lines
+
+
+def _tasks(pages):
+    return [Task(page, dataset, prepare) for page in pages for dataset, prepare in PAGES[page]]
+
+
+def run(pages=None):
+    """Run the warm-up for ``pages`` (default: all) and wait for it; returns the ``Warmup``."""
+    warmup = Warmup(_tasks(pages or PAGES))
+    _run(warmup)
+    return warmup
+
+
+def _run(warmup):
+    # One thread per task: a slow source must not queue the others behind it
+    with ThreadPoolExecutor(max_workers=len(warmup.tasks), thread_name_prefix="survey-warmup") as pool:
+        for task in warmup.tasks:
+            pool.submit(task.run)
+    warmup.seconds = time.perf_counter() - warmup.started
+    _logger.info("warm-up finished in %.2fs (%d failed)", warmup.seconds, len(warmup.failed()))
+
+
+def start():
+    """Start the warm-up once per process, in the background; returns its ``Warmup``."""
+    global _current
+    with _start_lock:
+        if _current is None:
+            _current = Warmup(_tasks(PAGES))
+            threading.Thread(target=_run, args=(_current,), name="survey-warmup", daemon=True).start()
+        return _current
+
+
+def status():
+    return _current
+
+
+def describe():
+    """One line for the sidebar: how far the warm-up got."""
+    current = status()
+    if current is None:
+        return "Data warm-up has not run."
+    finished = sum(t.state in ("ready", "failed") for t in current.tasks)
+    if not current.done:
+        return f"Preparing data: {finished}/{len(current.tasks)} ready"
+    text = f"Data ready in {current.seconds:.1f} s"
+    failed = sorted({t.dataset for t in current.failed()})
+    return f"{text}; could not prepare: {', '.join(failed)}" if failed else text
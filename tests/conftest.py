@@ -0,0 +1,88 @@
+"""Shared fixtures: the committed CSVs, a local stand-in for the remote CSV origins, and a private cache."""
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from survey import cleaning, columnar, datasets, fetch, incremental, shared  # noqa: E402
+
+
+class Origin:
+    """A CSV origin whose body and ETag the test changes; honours If-None-Match."""
+
+    def __init__(self):
+        self.body = b"a,b\n1,2\n"
+        self.etag = '"v1"'
+        self.requests = []      # (If-None-Match sent, status returned)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _handler(self):
+        origin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                sent = self.headers.get("If-None-Match")
+                fresh = sent is not None and sent == origin.etag
+                # Recorded before replying: the client may look as soon as it has the response
+                origin.requests.append((sent, 304 if fresh else 200))
+                if fresh:
+                    self.send_response(304)
+                    self.end_headers()
+                else:
+                    self.send_response(200)
+                    self.send_header("ETag", origin.etag)
+                    self.send_header("Content-Length", str(len(origin.body)))
+                    self.end_headers()
+                    self.wfile.write(origin.body)
+
+        return Handler
+
+    def url(self, path="data.csv"):
+        return f"http://127.0.0.1:{self.server.server_port}/{path}"
+
+    def publish(self, body, etag):
+        self.body, self.etag = body, etag
+
+    def stop(self):
+        """Shut the server down; later requests get connection refused."""
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    """Every cache directory and in-memory cache of the data layer, private to the test."""
+    monkeypatch.setattr(columnar, "CACHE_DIR", tmp_path)
+    monkeypatch.setattr(fetch, "CACHE_DIR", tmp_path / "http")
+    monkeypatch.setattr(fetch, "_status", {})
+    monkeypatch.setattr(incremental, "_logs", {})
+    monkeypatch.setattr(incremental, "_ends", {})
+    monkeypatch.setattr(shared, "SHARED_DIR", tmp_path / "shared")
+    monkeypatch.setattr(cleaning, "_cache", {})
+    for name in ("_frames", "_derived", "_generation", "_published", "_built", "_recipes", "_fallbacks"):
+        monkeypatch.setattr(datasets, name, {})
+    return tmp_path
+
+
+@pytest.fixture
+def origin():
+    server = Origin()
+    server.thread.start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def committed():
+    """Read one of the CSVs committed at the repository root, as pandas parses it."""
+    return lambda filename: pd.read_csv(ROOT / filename)
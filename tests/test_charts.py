@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from survey import columns
+from survey.charts import _quantile, answer_counts, box_summary
+
+
+def interp(sorted_values, p):
+    """plotly.js ``Lib.interp``, behind the default ``quartilemethod="linear"``."""
+    n = p * len(sorted_values) - 0.5
+    if n < 0:
+        return sorted_values[0]
+    if n > len(sorted_values) - 1:
+        return sorted_values[-1]
+    frac = n % 1
+    return frac * sorted_values[int(np.ceil(n))] + (1 - frac) * sorted_values[int(np.floor(n))]
+
+
+def plotly_box(answers):
+    """Quartiles and whiskers as plotly.js ``box/calc`` derives them from raw points."""
+    v = np.sort(np.asarray(answers, dtype=float))
+    q1, median, q3 = (interp(v, p) for p in (0.25, 0.5, 0.75))
+    lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+    return {
+        "q1": q1, "median": median, "q3": q3,
+        "lowerfence": min(q1, v[v >= lower].min()), "upperfence": max(q3, v[v <= upper].max()),
+    }
+
+
+def test_quantile_follows_plotly_for_every_size():
+    rng = np.random.default_rng(0)
+    for n in range(1, 40):
+        answers = rng.integers(1, 6, n).astype(float)
+        values, counts = np.unique(answers, return_counts=True)
+        for p in (0.25, 0.5, 0.75):
+            assert np.isclose(_quantile(values, counts, p), interp(np.sort(answers), p)), (n, p)
+
+
+def test_box_summary_matches_plotly_on_the_khalida_export(committed):
+    # Fractional answers (2.5) included
+    df = committed("traffic_survey(khalida).csv")
+    for by in columns.KHALIDA_FILTERS:
+        for value in columns.KHALIDA_CAUSES + columns.EFFECTS:
+            summary = box_summary(answer_counts(df, by, value))
+            for group, answers in df.groupby(by)[value]:
+                expected = plotly_box(answers.dropna())
+                got = summary.loc[group]
+                for key, want in expected.items():
+                    assert np.isclose(got[key], want), (by, value, group, key)
+                assert got["n"] == answers.count()
+                assert np.isclose(got["mean"], answers.mean())
+
+
+def test_answer_counts_one_column_per_answer():
+    df = pd.DataFrame({"g": ["a", "a", "b"], "v": [2.5, 1.0, 2.5]})
+    counts = answer_counts(df, "g", "v")
+    assert list(counts.columns) == [1.0, 2.5]
+    assert counts.loc["a"].tolist() == [1, 1]
+
+
+def test_whiskers_never_end_inside_the_box():
+    # q1 interpolates to 4 while the lowest answer within 1.5 IQR is 5
+    answers = [1, 5, 5, 5, 5]
+    summary = box_summary(answer_counts(pd.DataFrame({"g": "a", "v": answers}), "g", "v")).loc["a"]
+    expected = plotly_box(answers)
+    assert (summary["lowerfence"], summary["upperfence"]) == (expected["lowerfence"], expected["upperfence"])
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from survey import cleaning, form
+from test_form import export
+
+FIELDS = list(form.QUESTIONS)
+
+
+def raw_export(committed):
+    """The cleaned answers as a raw export, plus one incomplete and one repeated submission."""
+    cleaned = committed("cleaned_data.csv")
+    malay = np.random.default_rng(0).random(len(cleaned)) < 0.3
+    raw = export(cleaned, malay)
+    incomplete = raw.iloc[[5]].assign(**{"Narrow Road Factor": np.nan, "Faktor Jalan Sempit": np.nan})
+    raw = pd.concat([raw.iloc[:50], incomplete, raw.iloc[[10]], raw.iloc[50:]], ignore_index=True)
+    return cleaned, raw
+
+
+def same_rows(frame, expected):
+    assert list(frame.columns) == FIELDS
+    assert (frame.astype(str).to_numpy() == expected[FIELDS].astype(str).to_numpy()).all()
+
+
+def test_clean_reproduces_the_committed_csv(cache, committed):
+    cleaned, raw = raw_export(committed)
+    frame, report = cleaning.clean(raw)
+    same_rows(frame, cleaned)
+    assert (report.raw_rows, report.responses, report.incomplete, report.duplicates, report.rows) == (
+        len(cleaned) + 2, len(cleaned) + 2, 1, 1, len(cleaned))
+    assert sum(report.languages.values()) == len(cleaned)
+
+
+def test_extend_equals_a_full_build(cache, committed):
+    _, raw = raw_export(committed)
+    full, full_report = cleaning.clean(raw)
+
+    first, first_report = cleaning.build(raw.iloc[:70])
+    grown, report = cleaning.extend(first, first_report, raw.iloc[70:])
+    pd.testing.assert_frame_equal(grown, full)
+    for field in ("raw_rows", "responses", "incomplete", "duplicates", "rows", "languages"):
+        assert getattr(report, field) == getattr(full_report, field), field
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from survey import columns
+from survey.correlation import CorrelationStats
+
+
+def test_spearman_matches_pandas_and_scipy(committed):
+    # Izzati's heatmap: df.corr(method="spearman") over factors x effects
+    df = committed("cleaned_data (Izzati).csv")
+    rows, cols = columns.IZZATI_FACTORS, columns.EFFECTS
+    got = CorrelationStats.from_frame(df, rows, cols).spearman()
+    expected = df[rows + cols].corr(method="spearman").loc[rows, cols]
+    pd.testing.assert_frame_equal(got, expected, check_names=False, atol=1e-12)
+
+    rho = stats.spearmanr(df[rows[0]], df[cols[0]]).statistic
+    assert np.isclose(got.iloc[0, 0], rho)
+
+
+def test_pearson_matches_pandas_within_a_subgroup(committed):
+    # Khalida's heatmap: Pearson over the rows left by the filters
+    df = committed("traffic_survey(khalida).csv")
+    rows, cols = columns.KHALIDA_CAUSES, columns.EFFECTS
+    corr = CorrelationStats.from_frame(df, rows, cols)
+    for where in ({}, {"Gender": "Female"}, {"Area Type": ["Urban areas", "Rural areas"]}):
+        mask = pd.Series(True, index=df.index)
+        for col, value in where.items():
+            mask &= df[col].isin(value if isinstance(value, list) else [value])
+        expected = df.loc[mask, rows + cols].corr().loc[rows, cols]
+        pd.testing.assert_frame_equal(corr.pearson(where), expected, check_names=False, atol=1e-12)
+
+
+def test_missing_answers_use_pairwise_complete_rows(committed):
+    df = committed("cleaned_data (Izzati).csv")
+    rows, cols = columns.IZZATI_FACTORS, columns.EFFECTS
+    holes = df.astype({c: float for c in rows + cols})
+    rng = np.random.default_rng(0)
+    for col in rows + cols:
+        holes.loc[rng.random(len(holes)) < 0.1, col] = np.nan
+    corr = CorrelationStats.from_frame(holes, rows, cols)
+    for method, got in (("pearson", corr.pearson()), ("spearman", corr.spearman())):
+        expected = holes[rows + cols].corr(method=method).loc[rows, cols]
+        pd.testing.assert_frame_equal(got, expected, check_names=False, atol=1e-12)
+
+
+def test_update_equals_a_full_build(committed):
+    df = committed("cleaned_data (Izzati).csv")
+    rows, cols = columns.IZZATI_FACTORS, columns.EFFECTS
+    whole = CorrelationStats.from_frame(df, rows, cols)
+    grown = CorrelationStats.from_frame(df.iloc[:20], rows, cols).update(df.iloc[20:])
+    pd.testing.assert_frame_equal(grown.pearson(), whole.pearson(), atol=1e-12)
+    pd.testing.assert_frame_equal(grown.spearman(), whole.spearman(), atol=1e-12)
+
+
+def test_large_frames_are_folded_in_chunks(committed, monkeypatch):
+    df = committed("cleaned_data (Izzati).csv")
+    rows, cols = columns.IZZATI_FACTORS, columns.EFFECTS
+    whole = CorrelationStats.from_frame(df, rows, cols)
+    monkeypatch.setattr("survey.correlation.CHUNK_ROWS", 7)
+    chunked = CorrelationStats.from_frame(df, rows, cols)
+    pd.testing.assert_frame_equal(chunked.pearson(), whole.pearson(), atol=1e-12)
+    pd.testing.assert_frame_equal(chunked.spearman(), whole.spearman(), atol=1e-12)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from survey.cube import LikertCube
+from survey.likert import likert_columns
+
+
+def disagreement_loop(df, items, by):
+    """The pages' original per-area, per-item SD/D count."""
+    rows = []
+    for group in df[by].unique():
+        for col in items:
+            sd = df[(df[by] == group) & (df[col] == 1)].shape[0]
+            d = df[(df[by] == group) & (df[col] == 2)].shape[0]
+            rows.append({by: group, "Likert Item": col, "SD": sd, "D": d, "Total": sd + d})
+    return pd.DataFrame(rows)
+
+
+def test_means_and_percent_agree_match_pandas(committed):
+    df = committed("cleaned_data.csv")
+    items = likert_columns(df.columns)
+    cube = LikertCube.from_frame(df)
+
+    pd.testing.assert_frame_equal(cube.mean(by="Area Type"), df.groupby("Area Type")[items].mean(), check_names=False)
+    agree = df[items].isin([4, 5]).groupby(df["Status"]).mean() * 100
+    pd.testing.assert_frame_equal(cube.percent_agree(by="Status"), agree, check_names=False)
+    pd.testing.assert_series_equal(cube.mean(), df[items].mean())
+    assert cube.size(where={"Gender": "Male"}) == (df["Gender"] == "Male").sum()
+
+
+def test_disagreement_table_matches_the_page_loop(committed):
+    df = committed("cleaned_data.csv")
+    items = likert_columns(df.columns)
+    table = LikertCube.from_frame(df).disagreement_table(items, by="Area Type")
+    expected = disagreement_loop(df, items, "Area Type")
+    key = ["Area Type", "Likert Item"]
+    got = table.set_index(key).sort_index()[["SD", "D", "Total"]]
+    pd.testing.assert_frame_equal(got, expected.set_index(key).sort_index(), check_dtype=False)
+
+
+def test_fractional_answers_keep_exact_means(committed):
+    # Khalida's export holds averaged answers such as 2.5
+    df = committed("traffic_survey(khalida).csv")
+    items = likert_columns(df.columns)
+    assert (df[items] % 1 != 0).any().any()
+    cube = LikertCube.from_frame(df)
+    pd.testing.assert_frame_equal(cube.mean(by="Gender"), df.groupby("Gender")[items].mean(), check_names=False)
+
+
+def test_concat_of_chunks_equals_the_whole(committed):
+    df = committed("cleaned_data.csv")
+    whole = LikertCube.from_frame(df)
+    merged = LikertCube.concat([LikertCube.from_frame(df.iloc[:40]), LikertCube.from_frame(df.iloc[40:])])
+    assert np.array_equal(merged.counts, whole.counts)
+    assert np.array_equal(merged.sizes, whole.sizes)
+    pd.testing.assert_frame_equal(merged.mean(by="Race"), whole.mean(by="Race"))
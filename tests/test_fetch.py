@@ -0,0 +1,54 @@
+import time
+
+import pytest
+
+from survey import fetch
+
+
+def test_download_then_not_modified_then_new_etag(cache, origin):
+    url = origin.url()
+    first = fetch.fetch(url)
+    assert first.status == "downloaded"
+    assert first.path.read_bytes() == b"a,b\n1,2\n"
+
+    second = fetch.fetch(url)
+    assert second.status == "not-modified"
+    assert origin.requests[-1] == ('"v1"', 304)
+    assert second.path.read_bytes() == b"a,b\n1,2\n"
+
+    origin.publish(b"a,b\n1,2\n3,4\n", '"v2"')
+    third = fetch.fetch(url)
+    assert third.status == "downloaded"
+    assert origin.requests[-1] == ('"v1"', 200)
+    assert list(fetch.read_csv(url)["a"]) == [1, 3]
+
+
+def test_unreachable_origin_serves_stale_snapshot(cache, origin):
+    url = origin.url()
+    fetch.fetch(url)
+    saved = fetch.last_fetch(url).fetched_at
+    origin.stop()
+
+    result = fetch.fetch(url, timeout=(1, 1))
+    assert result.stale
+    assert result.error
+    assert result.fetched_at == saved
+    assert list(fetch.read_csv(url)["b"]) == [2]
+
+
+def test_unreachable_origin_without_snapshot_raises(cache, origin):
+    url = origin.url()
+    origin.stop()
+    with pytest.raises(fetch.FetchError):
+        fetch.fetch(url, timeout=(1, 1))
+
+
+def test_max_age_reuses_a_recent_confirmation(cache, origin):
+    url = origin.url()
+    fetch.fetch(url)
+    fetch.fetch(url, max_age=60)
+    assert len(origin.requests) == 1
+
+    fetch.last_fetch(url).fetched_at = time.time() - 120
+    fetch.fetch(url, max_age=60)
+    assert len(origin.requests) == 2
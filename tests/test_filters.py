@@ -0,0 +1,28 @@
+from itertools import product
+
+import pandas as pd
+
+from survey.filters import ALL, FilterIndex
+
+FILTERS = ["Gender", "Status", "Area Type"]
+
+
+def test_every_filter_combination_matches_boolean_masks(committed):
+    df = committed("traffic_survey(khalida).csv")
+    index = FilterIndex(df, FILTERS)
+    choices = [[ALL] + index.options[col] for col in FILTERS]
+    for values in product(*choices):
+        where = dict(zip(FILTERS, values))
+        mask = pd.Series(True, index=df.index)
+        for col, value in where.items():
+            if value != ALL:
+                mask &= df[col] == value
+        pd.testing.assert_frame_equal(index.view(where), df[mask])
+        assert index.count(where) == mask.sum()
+
+
+def test_no_active_filter_returns_the_frame_itself(committed):
+    df = committed("traffic_survey(khalida).csv")
+    index = FilterIndex(df, FILTERS)
+    assert index.view({col: ALL for col in FILTERS}) is df
+    assert len(index.view({"Gender": "Nobody"})) == 0
@@ -0,0 +1,126 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from survey import form
+
+# The export's columns as the original app.py mapped them by position:
+# three meta columns, the English questions (0-29), the Malay ones (30-59)
+LANGUAGE_QUESTION = "What language do you prefer?\n  Apakah bahasa pilihan anda?  "
+ENGLISH = [
+    "Age Group", "Status", "Gender", "Race", "Area Type",
+    "Rainy Weather Factor", "Increasing Population Factor", "Undisciplined Driver Factor",
+    "Damaged Road Factor", "Students Not Sharing Vehicles", "Leaving Work Late Factor",
+    "Narrow Road Factor", "Single Gate Factor", "Lack of Pedestrian Bridge Factor",
+    "Lack of Parking Space Factor", "Late Drop-off/Pick-up Factor", "Construction/Roadworks Factor",
+    "Unintended Road Accidents Effect", "Time Wastage Effect", "Pressure on Road Users Effect",
+    "Students Late to School Effect", "Environmental Pollution Effect", "Fuel Wastage Effect",
+    "Pedestrian Bridge Step", "Widening Road Step", "Vehicle Sharing Step", "Two Gates Step",
+    "Arrive Early Step", "Traffic Officers Step", "Special Drop-off Area Step",
+]
+MALAY = [
+    "Kumpulan Umur", "Status", "Jantina", "Bangsa", "Jenis Kawasan",
+    "Faktor Cuaca Hujan", "Faktor Peningkatan Populasi", "Faktor Pemandu Tidak Berdisiplin",
+    "Faktor Kerosakan Jalan", "Faktor Pelajar Tidak Berkongsi Kenderaan",
+    "Faktor Bertolak Lewat ke Tempat Kerja", "Faktor Jalan Sempit", "Faktor Satu Pintu Masuk/Keluar",
+    "Faktor Kekurangan Jejambat Pejalan Kaki", "Faktor Kekurangan Ruang Parkir",
+    "Faktor Ibu Bapa Lewat Hantar/Ambil Anak", "Faktor Pembinaan / Kerja Jalan",
+    "Kesan Kemalangan Jalan Raya", "Kesan Pembaziran Masa", "Kesan Tekanan pada Pengguna Jalan",
+    "Kesan Pelajar Lewat ke Sekolah", "Kesan Pencemaran Alam Sekitar", "Kesan Pembaziran Bahan Api",
+    "Langkah Jejambat Pejalan Kaki", "Langkah Melebarkan Jalan", "Langkah Berkongsi Kenderaan",
+    "Langkah Dua Pintu Masuk/Keluar", "Langkah Tiba Awal ke Sekolah",
+    "Langkah Menempatkan Pegawai Trafik", "Langkah Kawasan Khas Hantar/Tunggu Anak",
+]
+IN_MALAY = {
+    "Female": "Perempuan", "Male": "Lelaki", "Malay": "Melayu", "Chinese": "Cina", "Others": "Lain-lain",
+    "Urban areas": "Kawasan bandar", "Rural areas": "Kawasan luar bandar",
+    "Suburban areas": "Kawasan pinggir bandar", "University Student": "Pelajar Universiti",
+    "Parents": "Ibu bapa", "Teacher": "Guru", "Resident / Road User": "Penduduk / Pengguna jalan raya",
+    "Student ( Primary / Secondary)": "Pelajar (Sekolah Rendah / Menengah)",
+    "18 – 25 years old": "18 - 25 tahun", "26 – 35 years old": "26 - 35 tahun",
+    "36 – 45 years old": "36 - 45 tahun", "46 – 55 years old": "46 - 55 tahun",
+    "Below 18 years old": "Bawah 18 tahun", "Above 55 years old": "Atas 55 tahun",
+}
+
+
+def export(cleaned, malay):
+    """The raw sheet as pandas reads it back, ``malay`` respondents in the Malay half."""
+    answers = cleaned[list(form.QUESTIONS)].astype(object)
+    english = answers.copy().set_axis(ENGLISH, axis=1)
+    english.loc[malay] = None
+    in_malay = answers.replace(IN_MALAY).set_axis(MALAY, axis=1)
+    in_malay.loc[~malay] = None
+    meta = pd.DataFrame({
+        "Timestamp": pd.date_range("2025-11-01", periods=len(answers), freq="h").strftime("%d/%m/%Y %H:%M:%S"),
+        "Score": None,
+        LANGUAGE_QUESTION: np.where(malay, "Bahasa Melayu", "English"),
+    })
+    raw = pd.concat([meta, english, in_malay], axis=1)
+    return pd.read_csv(io.StringIO(raw.to_csv(index=False)))
+
+
+@pytest.fixture
+def raw(committed):
+    cleaned = committed("cleaned_data.csv")
+    malay = np.random.default_rng(0).random(len(cleaned)) < 0.3
+    return cleaned, malay, export(cleaned, malay)
+
+
+def test_unify_recovers_the_cleaned_answers(raw):
+    cleaned, malay, frame = raw
+    assert "Status.1" in frame.columns
+    unified = form.unify(frame)
+    expected = cleaned[list(form.QUESTIONS)]
+    got = unified[list(form.QUESTIONS)].astype({name: "int64" for name in form.LIKERT_FIELDS})
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
+    assert (unified["Language"] == np.where(malay, "Malay", "English")).all()
+
+
+def test_matching_does_not_depend_on_column_order(raw):
+    _, _, frame = raw
+    # Any order, as long as the English "Status" stays ahead of the Malay one
+    rest = [c for c in frame.columns if c not in ("Status", "Status.1")]
+    order = list(np.random.default_rng(1).permutation(rest))
+    shuffled = frame[order[:20] + ["Status"] + order[20:40] + ["Status.1"] + order[40:]]
+    pd.testing.assert_frame_equal(form.unify(shuffled), form.unify(frame))
+
+
+def test_headers_match_despite_case_punctuation_and_typos():
+    columns = [c.upper() for c in ENGLISH] + [c.replace("/", " / ") for c in MALAY]
+    columns[5] = "Rainy Wether Factor"
+    mapping = form.match_headers(columns)
+    assert mapping["English"][5] == "Rainy Weather Factor"
+    assert mapping["Malay"][30 + 16] == "Construction/Roadworks Factor"
+    assert sorted(mapping["English"]) == list(range(30))
+
+
+def test_missing_question_raises(raw):
+    _, _, frame = raw
+    with pytest.raises(form.HeaderError, match="no header for Malay 'Narrow Road Factor'"):
+        form.unify(frame.drop(columns="Faktor Jalan Sempit"))
+
+
+def test_question_with_two_headers_raises():
+    columns = ENGLISH + MALAY + ["Narrow Road Factor"]
+    with pytest.raises(form.HeaderError, match="'Narrow Road Factor' matches more than one header"):
+        form.match_headers(columns)
+
+
+def test_header_near_two_questions_raises(monkeypatch):
+    questions = dict(form.QUESTIONS, **{"Wide Road Step": ("Widening Roads Step", "Langkah Jalan Lebar")})
+    monkeypatch.setattr(form, "QUESTIONS", questions)
+    form._match.cache_clear()
+    try:
+        with pytest.raises(form.HeaderError, match="header 'Widening Roadz Step' matches more than one question"):
+            form.match_headers(ENGLISH + MALAY + ["Widening Roadz Step", "Langkah Jalan Lebar"])
+    finally:
+        form._match.cache_clear()
+
+
+def test_table_texts_are_not_near_each_other():
+    texts = [form.normalise(t) for texts in form.QUESTIONS.values() for t in texts]
+    for text in set(texts):
+        others = [t for t in set(texts) if t != text]
+        assert not form.get_close_matches(text, others, cutoff=form.NEAR), text
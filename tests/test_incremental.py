@@ -0,0 +1,85 @@
+import threading
+
+import pandas as pd
+
+from survey import incremental
+
+NAME = "export"
+
+
+def export(n, start=0):
+    times = pd.date_range("2025-11-01", periods=n, freq="h") + pd.Timedelta(hours=start)
+    return pd.DataFrame({
+        "Timestamp": times.strftime("%d/%m/%Y %H:%M:%S"),
+        "Age": [f"{18 + i % 40}" for i in range(start, start + n)],
+        "Answer": [f"{1 + i % 5} - agree" for i in range(start, start + n)],
+    })
+
+
+def assert_same(frame, expected):
+    pd.testing.assert_frame_equal(frame.reset_index(drop=True), expected.reset_index(drop=True), check_dtype=False)
+
+
+def restart():
+    incremental._logs.clear()
+    incremental._ends.clear()
+
+
+def test_new_rows_are_appended(cache):
+    full = export(30)
+    incremental.ingest(NAME, "v1", full.iloc[:20])
+    frame = incremental.ingest(NAME, "v2", full)
+    assert_same(frame, full)
+    assert incremental.last_appended(NAME) == [20, 10]
+    assert len(incremental.since(NAME, "v1", frame)) == 10
+
+
+def test_log_survives_a_restart(cache):
+    full = export(30)
+    incremental.ingest(NAME, "v1", full.iloc[:20])
+    restart()
+    frame = incremental.ingest(NAME, "v2", full)
+    assert_same(frame, full)
+    assert incremental.last_appended(NAME) == [10]
+
+
+def test_edit_before_the_hwm_resets_the_log(cache):
+    full = export(30)
+    incremental.ingest(NAME, "v1", full)
+    edited = full.copy()
+    edited.loc[3, "Answer"] = "1 - disagree"       # same Timestamp, new answer
+    frame = incremental.ingest(NAME, "v2", edited)
+    assert_same(frame, edited)
+    assert incremental.since(NAME, "v1", frame) is None     # derived objects rebuild
+
+    # The stale row is not resurrected from the on-disk log either
+    restart()
+    assert_same(incremental.ingest(NAME, "v3", edited), edited)
+
+
+def test_edit_together_with_new_rows(cache):
+    full = export(30)
+    incremental.ingest(NAME, "v1", full.iloc[:20])
+    edited = full.copy()
+    edited.loc[5, "Age"] = "99"
+    assert_same(incremental.ingest(NAME, "v2", edited), edited)
+    assert incremental.last_appended(NAME) == [30]
+
+
+def test_concurrent_ingests_of_one_source(cache):
+    full = export(2000)
+    incremental.ingest(NAME, "v0", full.iloc[:1000])
+    results, barrier = {}, threading.Barrier(8)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = incremental.ingest(NAME, f"v{i + 1}", full)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for frame in results.values():
+        assert_same(frame, full)
+    assert sorted(incremental.last_appended(NAME)) == [0] * 7 + [1000, 1000]
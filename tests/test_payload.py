@@ -0,0 +1,25 @@
+from streamlit.testing.v1 import AppTest
+
+
+def page():
+    import pandas as pd
+    import plotly.express as px
+    import streamlit as st
+
+    from survey import payload, perf
+
+    frame = pd.DataFrame({"Item": ["Narrow Road Factor", "Rainy Weather Factor"] * 50, "Mean": range(100)})
+    with perf.rerun("page") as run:
+        payload.plotly_chart(px.bar(frame, x="Item", y="Mean", title="Means"))
+        payload.dataframe(frame)
+        payload.table(frame.head(5).style.highlight_max(subset=["Mean"]))
+    st.session_state["sent"] = [p.bytes for p in run.payloads]
+
+
+def test_recorded_bytes_are_the_bytes_streamlit_sends():
+    app = AppTest.from_function(page).run()
+    assert not app.exception
+    chart, frame, table = app.session_state["sent"]
+    assert chart == len(app.get("plotly_chart")[0].proto.spec.encode("utf-8"))
+    assert frame == app.dataframe[0].proto.arrow_data.ByteSize()
+    assert table == app.table[0].proto.arrow_data.ByteSize()
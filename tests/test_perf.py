@@ -0,0 +1,25 @@
+import json
+
+from survey import perf
+
+
+def test_metrics_log_is_off_by_default(monkeypatch):
+    monkeypatch.setattr(perf, "METRICS_LOG", None)
+    monkeypatch.setattr(perf._logger, "handlers", [])
+    with perf.rerun("page/Khalida.py"):
+        pass
+    assert perf._logger.handlers == []
+
+
+def test_metrics_log_gets_one_line_per_run(monkeypatch, tmp_path):
+    log = tmp_path / "metrics.log"
+    monkeypatch.setattr(perf, "METRICS_LOG", log)
+    monkeypatch.setattr(perf._logger, "handlers", [])
+    for _ in range(2):
+        with perf.rerun("page/Khalida.py"):
+            with perf.span("load"):
+                pass
+    for handler in perf._logger.handlers:
+        handler.close()
+    records = [json.loads(line) for line in log.read_text().splitlines()]
+    assert [r["page"] for r in records] == ["page/Khalida.py"] * 2
@@ -0,0 +1,29 @@
+import numpy as np
+import statsmodels.api as sm
+from scipy import stats
+
+from survey import columns
+from survey.regression import _fit, t_quantile
+
+
+def test_fits_match_statsmodels_ols(committed):
+    df = committed("project_dataSV(Fatin).csv")
+    xs, ys = columns.fatin_factors(df.columns), columns.fatin_impacts(df.columns)
+    table = _fit(df, xs, ys)
+    assert len(table) == len(xs) * len(ys)
+    for (x, y), row in table.iterrows():
+        model = sm.OLS(df[y], sm.add_constant(df[x])).fit()
+        low, high = model.conf_int().loc[x]
+        assert np.isclose(row["intercept"], model.params["const"])
+        assert np.isclose(row["slope"], model.params[x])
+        assert np.isclose(row["r2"], model.rsquared)
+        assert np.isclose(row["slope_low"], low, rtol=1e-3)
+        assert np.isclose(row["slope_high"], high, rtol=1e-3)
+        assert row["n"] == len(df)
+        assert (row["x_min"], row["x_max"]) == (df[x].min(), df[x].max())
+
+
+def test_t_quantile_matches_scipy():
+    assert np.isclose(t_quantile(0.975, 3), stats.t.ppf(0.975, 3), rtol=2e-3)
+    dof = np.array([5, 10, 30, 81, 1000])
+    assert np.allclose(t_quantile(0.975, dof), stats.t.ppf(0.975, dof), rtol=2e-4)
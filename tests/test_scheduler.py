@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+
+from survey import cleaning, datasets, scheduler
+from test_form import export
+
+
+@pytest.fixture
+def remote(cache, origin, monkeypatch):
+    """A single remote dataset served by ``origin``."""
+    source = datasets.Source("remote", url=origin.url(), typed=False)
+    monkeypatch.setattr(datasets, "SOURCES", {"remote": source})
+    return origin
+
+
+@pytest.fixture
+def form(cache, origin, committed, monkeypatch):
+    """The form export served by ``origin`` (first 70 responses) and the cleaned dataset built from it."""
+    cleaned = committed("cleaned_data.csv")
+    raw = export(cleaned, np.random.default_rng(0).random(len(cleaned)) < 0.3)
+    origin.publish(raw.iloc[:70].to_csv(index=False).encode(), '"v1"')
+    monkeypatch.setattr(datasets, "SOURCES", {
+        "form_responses": datasets.Source("form_responses", url=origin.url(), typed=False, appends=True),
+        "cleaned": datasets.Source("cleaned", "cleaned_data.csv", built_from="form_responses"),
+    })
+    return origin, raw
+
+
+def stage_changes():
+    """Rebuild what changed into a stage, as the refresh thread does, without publishing it."""
+    changed = scheduler.changed_sources()
+    stage = datasets.Stage(changed)
+    with datasets.staging(stage):
+        datasets.rebuild(scheduler.dependents(changed))
+    return stage
+
+
+def rows():
+    return list(datasets.load_dataset("remote")["a"])
+
+
+def test_publishes_a_changed_source(remote):
+    assert rows() == [1]
+    thread = scheduler.RefreshThread(interval=60)
+    remote.publish(b"a,b\n1,2\n3,4\n", '"v2"')
+    thread.poll()
+    assert thread.status.error is None
+    assert set(thread.status.published) == {"remote"}
+    assert rows() == [1, 3]
+
+    thread.poll()       # 304: nothing to publish
+    assert rows() == [1, 3]
+
+
+def test_failed_rebuild_is_retried_next_tick(remote, monkeypatch):
+    assert rows() == [1]
+    thread = scheduler.RefreshThread(interval=60)
+    remote.publish(b"a,b\n1,2\n3,4\n", '"v2"')
+
+    rebuild = datasets.rebuild
+
+    def failing(names):
+        raise RuntimeError("rebuild failed")
+
+    monkeypatch.setattr(datasets, "rebuild", failing)
+    thread.poll()
+    assert "rebuild failed" in thread.status.error
+    assert rows() == [1]        # sessions keep the published data
+    assert "remote" in thread.pending
+
+    monkeypatch.setattr(datasets, "rebuild", rebuild)
+    thread.poll()               # the origin now answers 304
+    assert remote.requests[-1][1] == 304
+    assert thread.status.error is None
+    assert thread.pending == {}
+    assert rows() == [1, 3]
+
+
+def test_cleaning_report_follows_the_published_version(form):
+    origin, raw = form
+    assert len(datasets.load_dataset("cleaned")) == 70
+    published = cleaning.last_report()
+
+    origin.publish(raw.to_csv(index=False).encode(), '"v2"')
+    stage = stage_changes()
+    with datasets.staging(stage):
+        assert cleaning.last_report().rows == len(raw)
+    assert cleaning.last_report() is published
+    assert len(datasets.load_dataset("cleaned")) == 70
+
+    datasets.publish(stage)
+    assert cleaning.last_report().rows == len(raw)
+    assert len(datasets.load_dataset("cleaned")) == len(raw)
+
+
+def test_dropped_stage_leaves_no_state_behind(form):
+    origin, raw = form
+    datasets.load_dataset("cleaned")
+    published = cleaning.last_report()
+
+    broken = raw.rename(columns={"Jantina": "Identiti"})
+    origin.publish(broken.to_csv(index=False).encode(), '"v2"')
+    stage = stage_changes()       # falls back to the committed file, never published
+    with datasets.staging(stage):
+        assert datasets.build_fallback("cleaned") is not None
+    assert datasets.build_fallback("cleaned") is None
+    assert cleaning.last_report() is published
+
+    origin.publish(raw.to_csv(index=False).encode(), '"v3"')
+    datasets.publish(stage_changes())
+    _, expected = cleaning.clean(raw)
+    report = cleaning.last_report()
+    assert datasets.build_fallback("cleaned") is None
+    assert (report.rows, report.responses, report.languages) == (expected.rows, expected.responses, expected.languages)
+    assert len(datasets.load_dataset("cleaned")) == len(raw)
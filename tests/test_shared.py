@@ -0,0 +1,50 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from survey import ingest, shared
+
+
+def with_missing_answers(df):
+    """``df`` with some answers left blank, as a live export has them."""
+    holes = df.copy()
+    rng = np.random.default_rng(0)
+    for col in ["Rainy Weather Factor", "Time Wastage Effect", "Two Gates Step"]:
+        holes[col] = holes[col].astype(float).mask(rng.random(len(holes)) < 0.2)
+    return holes
+
+
+def test_frame_with_missing_answers_is_shared(cache, committed):
+    frame, _ = ingest.normalize(with_missing_answers(committed("cleaned_data.csv")), "cleaned")
+    assert str(frame["Rainy Weather Factor"].dtype) == "Int8"
+
+    mapped = shared.share("cleaned", "v1", frame)
+    assert mapped is not frame
+    pd.testing.assert_frame_equal(mapped, frame)
+    assert mapped["Rainy Weather Factor"].isna().sum() == frame["Rainy Weather Factor"].isna().sum()
+
+    subset = shared.read("cleaned", "v1", ["Time Wastage Effect", "Gender"])
+    pd.testing.assert_frame_equal(subset, frame[["Time Wastage Effect", "Gender"]])
+
+
+def test_writes_to_a_mapped_frame_stay_private(cache, committed):
+    frame, _ = ingest.normalize(with_missing_answers(committed("cleaned_data.csv")), "cleaned")
+    # A page's shallow copy, here without the cache's reference, so pandas writes in place
+    page = shared.share("cleaned", "v1", frame).copy(deep=False)
+    page.loc[0, "Rainy Weather Factor"] = pd.NA
+    page.loc[1, "Two Gates Step"] = 1
+    assert page.loc[1, "Two Gates Step"] == 1
+    pd.testing.assert_frame_equal(shared.read("cleaned", "v1"), frame)
+
+
+def test_nullable_floats_round_trip(cache):
+    frame = pd.DataFrame({"a": pd.array([1.5, None, 2.5], dtype="Float32"), "b": np.arange(3, dtype="int8")})
+    pd.testing.assert_frame_equal(shared.share("x", "v1", frame), frame)
+
+
+def test_unsupported_columns_are_logged(cache, caplog):
+    frame = pd.DataFrame({"a": np.arange(3, dtype="int8"), "note": ["x", "y", None]})
+    with caplog.at_level(logging.WARNING, logger="survey.shared"):
+        assert shared.share("x", "v1", frame) is frame
+    assert "x is not shared" in caplog.text and "'note'" in caplog.text
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from survey.viewer import window
+
+
+def expected_page(df, sort, ascending, column, query, page, page_size):
+    rows = df
+    if column and query:
+        rows = rows[rows[column].astype(str).str.contains(query, case=False, regex=False)]
+    if sort is not None:
+        rows = rows.sort_values(sort, ascending=ascending, kind="stable", na_position="last")
+    start = (page - 1) * page_size
+    return rows.iloc[start:start + page_size], len(rows)
+
+
+def check(df, sort=None, ascending=True, column=None, query="", page=1, page_size=25):
+    got, total = window(df, sort, ascending, column, query, page, page_size)
+    expected, expected_total = expected_page(df, sort, ascending, column, query, page, page_size)
+    pd.testing.assert_frame_equal(got, expected)
+    assert total == expected_total
+
+
+def test_pages_match_a_stable_pandas_sort(committed):
+    df = committed("cleaned_data.csv")
+    for sort in (None, "Area Type", "Rainy Weather Factor"):
+        for ascending in (True, False):
+            for page in (1, 3, 5):
+                check(df, sort, ascending, page=page)
+    check(df, "Time Wastage Effect", False, column="Status", query="student", page=2, page_size=10)
+    check(df, column="Area Type", query="URBAN")
+
+
+def test_categorical_columns_filter_by_label(committed):
+    df = committed("cleaned_data.csv")
+    categorical = df.astype({"Area Type": "category", "Status": "category"})
+    for query in ("rural", "areas", "nothing"):
+        got, total = window(categorical, column="Area Type", query=query, page_size=200)
+        expected, expected_total = expected_page(df, None, True, "Area Type", query, 1, 200)
+        assert total == expected_total
+        assert got.index.tolist() == expected.index.tolist()
+
+
+def test_missing_keys_sort_last_in_both_directions(committed):
+    df = committed("cleaned_data.csv")
+    holes = df.astype({"Race": object, "Rainy Weather Factor": float})
+    holes.loc[::7, ["Race", "Rainy Weather Factor"]] = np.nan
+    for sort in ("Race", "Rainy Weather Factor"):
+        for ascending in (True, False):
+            check(holes, sort, ascending, page_size=200)
+            last, _ = window(holes, sort, ascending, page_size=200)
+            assert last[sort].iloc[-1:].isna().all()